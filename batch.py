@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Procesamiento por lotes, sin interfaz, de varios libros mensuales.
+
+Cada ejecución crea una carpeta propia dentro de BATCH_OUTPUT_FOLDER con una carpeta
+de salida por libro, así que los meses no comparten archivos PTO/MET ni libro
+intercalado. Las hojas de todos los libros (meses × estaciones) se reparten en un
+único pool de procesos con un límite global de procesos; cada mes se cierra (libro
+consolidado, RUIDO TOTAL y plantilla final) en cuanto terminan todas sus hojas. El
+resultado de cada mes y de cada estación queda en manifest.json.
+
+Uso:
+    python batch.py "Input/Met_*.xlsx" [--salida PTOS_lotes] [--procesos N]
+                    [--hojas EMRI1 EMRI2 ...] [--por-archivos]
+"""
+import os
+import sys
+import glob
+import json
+import time
+import signal
+import argparse
+import traceback
+import threading
+from datetime import datetime
+from data.constants import SHEETS_TO_PROCESS, MAX_WORKERS, CONSOLIDATED_OUTPUT, BATCH_OUTPUT_FOLDER
+from export.ruido_total import RuidoTotal
+from main import RegistroHojas, procesar_en_pool, generar_ruido_total
+
+# Versión del formato de manifest.json
+VERSION_MANIFIESTO = 1
+
+def buscar_libros(patrones):
+    """
+    Libros de entrada de uno o varios patrones glob
+
+    Args:
+        patrones: Lista de patrones (por ejemplo 'Input/Met_*.xlsx') o rutas
+
+    Returns:
+        Lista ordenada de rutas sin repetir (se omiten los temporales '~$' de Excel)
+    """
+    libros = set()
+    for patron in patrones:
+        for ruta in glob.glob(patron):
+            if os.path.isfile(ruta) and not os.path.basename(ruta).startswith("~$"):
+                libros.add(os.path.normpath(ruta))
+    return sorted(libros)
+
+def nueva_carpeta_ejecucion(raiz):
+    """Crea la carpeta de una ejecución, con la fecha y hora de inicio como nombre"""
+    base = os.path.join(raiz, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    carpeta, n = base, 1
+    while True:
+        try:
+            os.makedirs(carpeta)
+            return carpeta
+        except FileExistsError:
+            n += 1
+            carpeta = f"{base}_{n}"
+
+def nombres_salida(libros):
+    """Nombre de la carpeta de salida de cada libro (su nombre sin extensión, sin repetir)"""
+    nombres, usados = [], set()
+    for ruta in libros:
+        base = os.path.splitext(os.path.basename(ruta))[0]
+        nombre, n = base, 1
+        while nombre in usados:
+            n += 1
+            nombre = f"{base}_{n}"
+        usados.add(nombre)
+        nombres.append(nombre)
+    return nombres
+
+def _marca_tiempo(segundos=None):
+    return datetime.fromtimestamp(time.time() if segundos is None else segundos).isoformat(timespec="seconds")
+
+class CorridaMensual:
+    """Procesamiento de un libro dentro de un lote: hojas, salida y estado para el manifiesto"""
+
+    def __init__(self, archivo_excel, carpeta, sheets, consolidado, progreso=None):
+        """
+        Args:
+            archivo_excel: Ruta del libro de entrada
+            carpeta: Carpeta de salida propia del libro
+            sheets: Hojas a procesar
+            consolidado: Salida consolidada (True) o por archivos (False)
+            progreso: Función opcional progreso(corrida, completadas, total, sheet, error)
+        """
+        self.archivo_excel = archivo_excel
+        self.carpeta = carpeta
+        self.consolidado = consolidado
+        self.ruido_total = RuidoTotal() if consolidado else None
+        self.registro = RegistroHojas(
+            sheets, consolidado, self.ruido_total,
+            None if progreso is None else lambda *args: progreso(self, *args),
+            carpeta
+        )
+        self.estado = "pendiente"
+        self.procesadas = []
+        self.error = None
+        self.fin = None
+        os.makedirs(carpeta, exist_ok=True)
+
+    def tareas(self, indice):
+        """Tareas de procesar_en_pool de las hojas del libro, con clave (indice, hoja)"""
+        return [
+            ((indice, sheet),
+             (sheet, self.registro.asignados[sheet], self.archivo_excel, self.archivo_excel,
+              not self.consolidado, self.carpeta))
+            for sheet in self.registro.sheets
+        ]
+
+    def cerrar(self, cancelada=False):
+        """
+        Cierra la salida del libro; si terminaron todas sus hojas genera RUIDO TOTAL y la
+        plantilla final
+
+        Args:
+            cancelada: El lote se canceló antes de terminar las hojas del libro
+        """
+        try:
+            self.procesadas, _ = self.registro.cerrar()
+            if cancelada:
+                self.estado = "cancelada"
+            elif not self.procesadas:
+                self.estado = "fallida"
+            else:
+                generar_ruido_total(self.carpeta, self.ruido_total)
+                self.estado = "con_errores" if self.registro.errores else "completada"
+        except Exception as e:
+            self.estado = "fallida"
+            self.error = f"{e}\n{traceback.format_exc()}"
+            print(f"Error al cerrar {self.archivo_excel}: {e}")
+        self.fin = time.time()
+
+    def manifiesto(self, raiz):
+        """
+        Entrada del libro en el manifiesto
+
+        Args:
+            raiz: Carpeta de la ejecución (las rutas de salida son relativas a ella)
+        """
+        puntos = dict(self.procesadas)
+        estaciones = []
+        for sheet in self.registro.sheets:
+            if sheet in puntos:
+                estaciones.append({"hoja": sheet, "estado": "procesada", "punto": puntos[sheet]})
+            elif sheet in self.registro.errores:
+                estaciones.append({"hoja": sheet, "estado": "error",
+                                   "error": self.registro.errores[sheet].splitlines()[0]})
+            else:
+                estaciones.append({"hoja": sheet, "estado": "cancelada" if self.estado == "cancelada" else "pendiente"})
+        try:
+            info = os.stat(self.archivo_excel)
+            entrada = {"bytes": info.st_size, "modificado": _marca_tiempo(info.st_mtime)}
+        except OSError:
+            entrada = {"bytes": None, "modificado": None}
+        salidas = sorted(os.listdir(self.carpeta)) if os.path.isdir(self.carpeta) else []
+        return {
+            "archivo": os.path.abspath(self.archivo_excel),
+            **entrada,
+            "carpeta": os.path.relpath(self.carpeta, raiz),
+            "estado": self.estado,
+            "fin": None if self.fin is None else _marca_tiempo(self.fin),
+            "procesadas": len(self.procesadas),
+            "errores": len(self.registro.errores),
+            "estaciones": estaciones,
+            "salidas": salidas,
+            "error": None if self.error is None else self.error.splitlines()[0]
+        }
+
+def escribir_manifiesto(ruta, datos):
+    """Escribe el manifiesto de forma atómica (archivo temporal y reemplazo)"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+def procesar_lote(patrones, salida=BATCH_OUTPUT_FOLDER, workers=MAX_WORKERS, sheets=SHEETS_TO_PROCESS,
+                  consolidado=CONSOLIDATED_OUTPUT, continuar=None):
+    """
+    Procesa varios libros mensuales con un único pool de procesos
+
+    Args:
+        patrones: Patrones glob o rutas de los libros de entrada
+        salida: Carpeta donde se crea la carpeta de la ejecución
+        workers: Máximo de procesos para todas las hojas de todos los libros (None = CPUs)
+        sheets: Hojas a procesar en cada libro
+        consolidado: Salida consolidada (True) o archivos PTO/MET por estación (False)
+        continuar: Función opcional que devuelve False para cancelar el lote
+
+    Returns:
+        Tupla (ruta de manifest.json, diccionario del manifiesto)
+    """
+    libros = buscar_libros(patrones)
+    if not libros:
+        raise FileNotFoundError(f"Ningún libro coincide con {', '.join(patrones)}")
+    workers = workers or os.cpu_count() or 1
+    carpeta = nueva_carpeta_ejecucion(salida)
+    ruta_manifiesto = os.path.join(carpeta, "manifest.json")
+    inicio = time.time()
+    total_hojas = len(libros) * len(sheets)
+    terminadas = 0
+
+    def progreso(corrida, completadas, total, sheet, error):
+        nonlocal terminadas
+        terminadas += 1
+        estado = "ok" if error is None else f"error: {error.splitlines()[0]}"
+        print(f"[{terminadas}/{total_hojas}] {os.path.basename(corrida.archivo_excel)} {sheet} "
+              f"({completadas}/{total}) {estado}", flush=True)
+
+    corridas = [
+        CorridaMensual(libro, os.path.join(carpeta, nombre), sheets, consolidado, progreso)
+        for libro, nombre in zip(libros, nombres_salida(libros))
+    ]
+
+    def manifiesto(estado, fin=None):
+        return {
+            "version": VERSION_MANIFIESTO,
+            "estado": estado,
+            "inicio": _marca_tiempo(inicio),
+            "fin": None if fin is None else _marca_tiempo(fin),
+            "segundos": None if fin is None else round(fin - inicio, 3),
+            "procesos": min(workers, total_hojas),
+            "consolidado": consolidado,
+            "hojas": list(sheets),
+            "corridas": [corrida.manifiesto(carpeta) for corrida in corridas]
+        }
+
+    escribir_manifiesto(ruta_manifiesto, manifiesto("en_curso"))
+
+    def registrar(clave, error, resultado):
+        corrida = corridas[clave[0]]
+        corrida.registro.registrar(clave[1], error, resultado)
+        if corrida.registro.completo():
+            corrida.cerrar()
+            print(f"{corrida.archivo_excel}: {corrida.estado} ({len(corrida.procesadas)} de "
+                  f"{len(corrida.registro.sheets)} hojas) -> {corrida.carpeta}", flush=True)
+            escribir_manifiesto(ruta_manifiesto, manifiesto("en_curso"))
+
+    # Las hojas se envían mes a mes, así que los primeros meses se cierran mientras
+    # los siguientes aún se procesan
+    tareas = [tarea for indice, corrida in enumerate(corridas) for tarea in corrida.tareas(indice)]
+    cancelado = procesar_en_pool(
+        tareas, workers, registrar, lambda: continuar is not None and not continuar(),
+        ignorar_interrupcion=True
+    )
+
+    for corrida in corridas:
+        if corrida.estado == "pendiente":
+            corrida.cerrar(cancelada=True)
+    if cancelado:
+        estado = "cancelada"
+    elif all(corrida.estado == "completada" for corrida in corridas):
+        estado = "completada"
+    else:
+        estado = "con_errores"
+    datos = manifiesto(estado, time.time())
+    escribir_manifiesto(ruta_manifiesto, datos)
+    return ruta_manifiesto, datos
+
+def main(argv=None):
+    """Línea de comandos del procesamiento por lotes"""
+    parser = argparse.ArgumentParser(description="Procesa varios libros mensuales en paralelo, sin interfaz.")
+    parser.add_argument("libros", nargs="+", help="Patrones glob o rutas de los libros (por ejemplo 'Input/Met_*.xlsx')")
+    parser.add_argument("--salida", default=BATCH_OUTPUT_FOLDER,
+                        help=f"Carpeta donde se crea la carpeta de la ejecución (por defecto {BATCH_OUTPUT_FOLDER})")
+    parser.add_argument("--procesos", type=int, default=MAX_WORKERS,
+                        help="Máximo de procesos para todas las hojas de todos los libros (por defecto MAX_WORKERS o CPUs)")
+    parser.add_argument("--hojas", nargs="+", default=SHEETS_TO_PROCESS,
+                        help="Hojas a procesar en cada libro (por defecto SHEETS_TO_PROCESS)")
+    parser.add_argument("--por-archivos", action="store_true",
+                        help="Archivos PTO/MET por estación en lugar del libro consolidado")
+    args = parser.parse_args(argv)
+
+    # Ctrl+C cancela el lote: las hojas en curso se detienen en su siguiente etapa y el
+    # manifiesto se escribe igualmente
+    interrumpido = threading.Event()
+
+    def interrumpir(signum, frame):
+        if interrumpido.is_set():
+            raise KeyboardInterrupt
+        print("Cancelando el lote (Ctrl+C de nuevo para salir sin esperar)...", flush=True)
+        interrumpido.set()
+
+    anterior = signal.signal(signal.SIGINT, interrumpir)
+    try:
+        ruta, datos = procesar_lote(
+            args.libros, args.salida, args.procesos, args.hojas,
+            CONSOLIDATED_OUTPUT and not args.por_archivos, lambda: not interrumpido.is_set()
+        )
+    except FileNotFoundError as e:
+        print(e)
+        return 2
+    finally:
+        signal.signal(signal.SIGINT, anterior)
+
+    print(f"Lote {datos['estado']} en {datos['segundos']:.1f} s. Manifiesto: {ruta}")
+    for corrida in datos["corridas"]:
+        print(f"  {os.path.basename(corrida['archivo'])}: {corrida['estado']}, "
+              f"{corrida['procesadas']} hojas procesadas, {corrida['errores']} con error")
+    return {"completada": 0, "cancelada": 130}.get(datos["estado"], 1)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Benchmarks del sistema de procesamiento acústico.
+
+Cada módulo se ejecuta con ``python -m benchmarks.<modulo>`` desde la raíz del
+proyecto y compara la implementación actual con la de referencia.
+"""
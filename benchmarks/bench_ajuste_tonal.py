@@ -0,0 +1,79 @@
+"""
+Validación y benchmark del ajuste tonal: ajuste_tonal fila por fila frente a
+ajuste_tonal_matriz sobre la matriz completa.
+
+Compara ambas rutas en las hojas EMRI de un libro Met_* real y en una matriz
+sintética que recorre todas las ramas (0/3/6 dB en cada rango de bandas).
+
+Uso:
+    python -m benchmarks.bench_ajuste_tonal [archivo_excel] [filas_sinteticas]
+"""
+import sys
+import time
+import numpy as np
+from data.constants import SHEETS_TO_PROCESS
+from utils.excel_session import WorkbookSession
+from processing.acoustic import ajuste_tonal, ajuste_tonal_matriz, Ponderacion_A_matriz
+from processing.data_handler import cargar_datos
+from benchmarks.bench_ponderacion import BANDAS
+
+def comparar(spectrum, niveles):
+    """
+    Ejecuta ambas rutas y cuenta las filas en las que difieren
+
+    Returns:
+        Tupla con (filas distintas, tiempo escalar, tiempo matricial)
+    """
+    inicio = time.perf_counter()
+    escalar = [ajuste_tonal(list(spectrum), row) for row in niveles]
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    kt, bandas = ajuste_tonal_matriz(spectrum, niveles)
+    t_matriz = time.perf_counter() - inicio
+
+    distintas = sum(
+        1 for (kt_ref, bandas_ref), kt_i, bandas_i in zip(escalar, kt, bandas)
+        if kt_ref != kt_i or bandas_ref != bandas_i
+    )
+    return distintas, t_escalar, t_matriz
+
+def niveles_sinteticos(filas, semilla=0):
+    """Matriz de niveles con tonos puros añadidos al azar para activar todas las ramas"""
+    rng = np.random.default_rng(semilla)
+    niveles = np.round(rng.normal(50, 3, size=(filas, len(BANDAS))), 1)
+    tonos = rng.random(niveles.shape) < 0.01
+    niveles[tonos] += np.round(rng.uniform(2, 15, size=tonos.sum()), 1)
+    niveles[rng.random(niveles.shape) < 0.001] = np.nan
+    return niveles
+
+def main(archivo_excel="Input/Met_Abr.xlsx", filas=20_000):
+    total_distintas = 0
+
+    with WorkbookSession(archivo_excel) as sesion:
+        for sheet in SHEETS_TO_PROCESS:
+            try:
+                _, _, TerciosOctava, _, _, _ = cargar_datos(archivo_excel, sheet, sesion)
+            except Exception as e:
+                print(f"{sheet}: omitida ({e})")
+                continue
+            spectrum = list(TerciosOctava.columns[1:])
+            ponderados = Ponderacion_A_matriz(spectrum, TerciosOctava.iloc[:, 1:].values)
+            distintas, t_escalar, t_matriz = comparar(spectrum, ponderados)
+            total_distintas += distintas
+            print(f"{sheet}: {len(ponderados)} filas, {distintas} distintas "
+                  f"(escalar {t_escalar:.3f} s, matriz {t_matriz:.4f} s)")
+
+    niveles = niveles_sinteticos(filas)
+    distintas, t_escalar, t_matriz = comparar(BANDAS, niveles)
+    total_distintas += distintas
+    kt, _ = ajuste_tonal_matriz(BANDAS, niveles)
+    print(f"Sintético: {filas} filas, {distintas} distintas, KT 0/3/6 = "
+          f"{np.bincount(kt, minlength=7)[[0, 3, 6]].tolist()}")
+    print(f"Escalar: {t_escalar:.3f} s, matriz: {t_matriz:.4f} s ({t_escalar / t_matriz:.0f}x)")
+    print(f"Total de filas distintas: {total_distintas}")
+    return total_distintas == 0
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "Input/Met_Abr.xlsx",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20_000)
@@ -0,0 +1,57 @@
+"""
+Benchmark de la agregación diaria: groupby con una lambda de promedio_logaritmico_ref
+por columna y período (como hacía procesar_diario) frente a promedios_logaritmicos_diarios,
+que calcula los días diurnos y nocturnos de todas las columnas en una sola llamada.
+
+Uso:
+    python -m benchmarks.bench_diario [dias] [intervalo]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from processing.statistics import promedio_logaritmico_ref, promedios_logaritmicos_diarios
+from utils.time_index import IndiceTemporal, PERIODO_DIURNO, PERIODO_NOCTURNO
+from benchmarks.bench_ponderacion import BANDAS
+from benchmarks import sintetico
+
+def main(dias=31, intervalo="1min"):
+    rng = np.random.default_rng(0)
+    periodos = sintetico.periodos(dias, intervalo, "2025-03-01 07:00")
+    columnas = [str(banda) for banda in BANDAS]
+    niveles = np.round(rng.normal(50, 8, size=(len(periodos), len(columnas))), 1)
+    niveles[rng.random(niveles.shape) < 0.01] = np.nan
+    df = pd.DataFrame(niveles, columns=columnas)
+    df.insert(0, 'Period start', periodos)
+    indice = IndiceTemporal(periodos)
+    codigos = indice.periodo
+
+    inicio = time.perf_counter()
+    referencia = {}
+    for codigo in (PERIODO_DIURNO, PERIODO_NOCTURNO):
+        periodo = df[codigos == codigo].copy()
+        periodo['Fechas'] = periodo['Period start'].dt.date
+        referencia[codigo] = periodo.groupby('Fechas').agg(
+            {col: lambda x: promedio_logaritmico_ref(x.dropna()) for col in columnas}
+        )
+    t_groupby = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    agregados = promedios_logaritmicos_diarios(indice.dia, niveles, codigos)
+    t_matriz = time.perf_counter() - inicio
+
+    identicos = all(
+        np.array_equal(referencia[codigo].to_numpy(), agregados[codigo][1], equal_nan=True)
+        and list(referencia[codigo].index) == list(agregados[codigo][0].astype(object))
+        for codigo in (PERIODO_DIURNO, PERIODO_NOCTURNO)
+    )
+
+    print(f"Filas: {len(periodos)} ({dias} días, intervalo {intervalo}), columnas: {len(columnas)}")
+    print(f"groupby con lambda:              {t_groupby:.3f} s")
+    print(f"promedios_logaritmicos_diarios:  {t_matriz:.4f} s ({t_groupby / t_matriz:.0f}x)")
+    print(f"Resultados idénticos: {identicos}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 31,
+         sys.argv[2] if len(sys.argv) > 2 else "1min")
@@ -0,0 +1,76 @@
+"""
+Benchmark de s_k² y s_k de los resúmenes: el cálculo anterior con iterrows, que
+filtraba los intervalos por tipo de día en cada fila y devolvía texto '.2e', frente a
+calcular_estadisticos, que agrupa las desviaciones de Dominical/Ordinario/Total en
+una sola ordenación y devuelve float64.
+
+Uso:
+    python -m benchmarks.bench_estadisticos [dias] [intervalo] [repeticiones]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from processing.statistics import calcular_estadisticos
+from utils.file_utils import formatear_cientificos
+from utils.time_index import tipos_dia
+from benchmarks.sintetico import periodos
+
+def estadisticos_por_fila(resumen, datos_total):
+    """Cálculo anterior de calcular_estadisticos, una fila del resumen cada vez"""
+    resultados = []
+    for _, row in resumen.iterrows():
+        tipo_dia = row['TipoDia']
+        N_mk = row['Conteo']
+        LRASeq_k = row['LRASeq_k']
+        if tipo_dia == 'Total':
+            datos_filtrados = datos_total
+        else:
+            datos_filtrados = datos_total[datos_total['TipoDia'] == tipo_dia]
+        diferencias = (10**(0.1 * datos_filtrados['LRASeq,i']) - 10**(0.1 * LRASeq_k))**2
+        s_k2 = diferencias.sum() / (N_mk - 1)
+        s_k = (s_k2**0.5) / (N_mk**0.5)
+        resultados.append({'TipoDia': tipo_dia, 's_k^2': format(s_k2, '.2e'), 's_k': format(s_k, '.2e')})
+    return pd.DataFrame(resultados)
+
+def datos_sinteticos(dias, intervalo, rng):
+    """Intervalos de un período con su tipo de día y el resumen con la forma de generar_resumenes"""
+    inicios = periodos(dias, intervalo, "2025-03-01")
+    datos_total = pd.DataFrame({
+        'TipoDia': tipos_dia(inicios.date),
+        'LRASeq,i': np.where(rng.random(len(inicios)) < 0.02, np.nan, rng.uniform(45, 80, len(inicios)))
+    })
+    filas = [('Dominical', datos_total['TipoDia'] == 'Dominical'), ('Ordinario', datos_total['TipoDia'] == 'Ordinario'),
+             ('Total', slice(None))]
+    resumen = pd.DataFrame({
+        'TipoDia': [tipo for tipo, _ in filas],
+        'Conteo': [int(datos_total.loc[mascara, 'LRASeq,i'].notna().sum()) for _, mascara in filas],
+        'LRASeq_k': [round(10 * np.log10(np.nanmean(10**(0.1 * datos_total.loc[mascara, 'LRASeq,i']))), 1)
+                     for _, mascara in filas]
+    })
+    return resumen, datos_total
+
+def main(dias=31, intervalo="1min", repeticiones=5, semilla=0):
+    resumen, datos_total = datos_sinteticos(dias, intervalo, np.random.default_rng(semilla))
+    print(f"Intervalos: {len(datos_total)} ({dias} días, intervalo {intervalo})")
+
+    t_fila = t_grupo = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        referencia = estadisticos_por_fila(resumen, datos_total)
+        t_fila = min(t_fila, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        resultado = calcular_estadisticos(resumen, datos_total)
+        t_grupo = min(t_grupo, time.perf_counter() - inicio)
+
+    identicos = referencia.equals(formatear_cientificos(resultado))
+    print(f"iterrows:             {t_fila * 1000:8.2f} ms")
+    print(f"calcular_estadisticos: {t_grupo * 1000:7.2f} ms ({t_fila / t_grupo:.1f}x)")
+    print(f"Tipos: {resultado['s_k^2'].dtype}, texto exportado idéntico: {identicos}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 31,
+         sys.argv[2] if len(sys.argv) > 2 else "1min",
+         int(sys.argv[3]) if len(sys.argv) > 3 else 5)
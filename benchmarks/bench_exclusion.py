@@ -0,0 +1,71 @@
+"""
+Benchmark de la exclusión meteorológica: el filtro anterior por coincidencia exacta de
+'Period start' con las horas de lluvia (isin) frente a weather_exclusion_mask, que
+asigna cada intervalo a su hora MET con searchsorted y descarta la hora completa.
+
+Con intervalos horarios ambos descartan las mismas filas; con intervalos menores el
+filtro anterior solo descartaba el primer intervalo de cada hora con lluvia.
+
+Uso:
+    python -m benchmarks.bench_exclusion [dias] [intervalo]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from utils.date_utils import corregir_fechas, fechas_reales
+from processing.meteorology import weather_exclusion_mask
+from benchmarks.sintetico import periodos
+
+def caso_borde():
+    """
+    Lluvia solo en la hora real de las 06:00 de un día, al cierre del día de medición:
+    se descartan sus 60 minutos (la corrección deja 06:00-06:58 en el día anterior y
+    06:59 en el mismo) y ningún otro
+
+    Returns:
+        True si se descartan exactamente esos intervalos para cada hora probada
+    """
+    horas = pd.date_range("2025-04-01", periods=5 * 24, freq="h")
+    reales = pd.Series(periodos(3, "1min", "2025-04-01 07:00"))
+    inicios = corregir_fechas(reales)
+    correcto = True
+    for lluvia in pd.to_datetime(["2025-04-02 06:00", "2025-04-03 06:00"]):
+        met = pd.DataFrame({"PREC": np.where(horas == lluvia, 2.0, 0.0)}, index=corregir_fechas(horas))
+        met.index.name = "Fecha_Hora"
+        excluidos, _ = weather_exclusion_mask(inicios, met, {"PREC": 0.5})
+        esperado = ((reales >= lluvia) & (reales < lluvia + pd.Timedelta("1h"))).to_numpy()
+        correcto &= np.array_equal(excluidos, esperado)
+    return correcto
+
+def main(dias=31, intervalo="1min", semilla=0):
+    rng = np.random.default_rng(semilla)
+    horas = corregir_fechas(pd.date_range("2025-03-01", periods=(dias + 1) * 24, freq="h"))
+    met = pd.DataFrame({"PREC": np.where(rng.random(len(horas)) < 0.05, 2.0, 0.0)}, index=horas)
+    met.index.name = "Fecha_Hora"
+    inicios = pd.Series(corregir_fechas(periodos(dias, intervalo, "2025-03-01 07:00")))
+    print(f"Intervalos: {len(inicios)} ({dias} días, intervalo {intervalo}), horas con lluvia: {int((met['PREC'] > 0.5).sum())}")
+
+    inicio = time.perf_counter()
+    anterior = inicios.isin(met[met["PREC"] > 0.5].index).to_numpy()
+    t_isin = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    excluidos, por_variable = weather_exclusion_mask(inicios, met, {"PREC": 0.5})
+    t_join = time.perf_counter() - inicio
+
+    # Referencia: todos los intervalos cuya hora real (truncada) tiene lluvia
+    horas_lluvia = set(fechas_reales(met.index[met["PREC"] > 0.5]))
+    referencia = fechas_reales(inicios).dt.floor("h").isin(horas_lluvia).to_numpy()
+
+    print(f"isin:                   {t_isin * 1000:7.1f} ms, {int(anterior.sum())} intervalos descartados")
+    print(f"weather_exclusion_mask: {t_join * 1000:7.1f} ms, {int(excluidos.sum())} intervalos descartados {por_variable}")
+    correcto = np.array_equal(excluidos, referencia)
+    print(f"Horas completas descartadas: {correcto}")
+    borde = caso_borde()
+    print(f"Hora de las 06:00 al cierre del día: {borde}")
+    return correcto and borde
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 31,
+         sys.argv[2] if len(sys.argv) > 2 else "1min")
@@ -0,0 +1,130 @@
+"""
+Benchmark de la exportación a la plantilla: escritura celda por celda con
+is_merged_cell y un Alignment nuevo por celda, frente a escribir_bloques con el
+conjunto de celdas combinadas precalculado y estilos compartidos.
+
+Ambas rutas escriben los mismos datos sintéticos sobre Plantilla/Plantilla_Macro.xlsx
+y se comparan valores, alineación, relleno y anchos de columna.
+
+Uso:
+    python -m benchmarks.bench_exportacion [filas] [plantilla]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment
+from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
+from utils.file_utils import formatear_cientificos, round_dataframe, is_merged_cell
+from export.excel import escribir_bloques, export_to_template, COLORES_CUMPLIMIENTO
+
+START_COLUMNS = [1, 9, 29, 49, 67, 85]
+
+def generar_datasets(filas, dias=31, semilla=0):
+    """
+    Genera DataFrames con la forma de los bloques que se exportan por estación
+
+    Args:
+        filas: Número de intervalos de la tabla procesada
+        dias: Número de días de las tablas diarias
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        Lista con (TablaProcesada, diurno_grouped, nocturno_grouped, resumen_diurno, resumen_nocturno, dia_noche)
+    """
+    rng = np.random.default_rng(semilla)
+    niveles = lambda n: rng.normal(55, 8, size=n)
+    resultados = np.array(['Pasa', 'No pasa', 'Pasa condicional', 'No pasa condicional'])
+
+    tabla = pd.DataFrame({
+        'Period start': pd.date_range('2024-03-01', periods=filas, freq='h'),
+        'LASeq,i': niveles(filas), 'LAIeq,i': niveles(filas), 'KI,i': rng.integers(0, 7, filas),
+        'KT,i': rng.choice([0, 3, 6], filas), 'Bandas': rng.choice(['Baja', 'Media', 'Alta', '-'], filas),
+        'LRASeq,i': niveles(filas), 'TipoDia': rng.choice(['Ordinario', 'Dominical'], filas)
+    })
+
+    def diario():
+        datos = {'Fecha': pd.date_range('2024-03-01', periods=dias, freq='D').date,
+                 'TipoDia': rng.choice(['Ordinario', 'Dominical'], dias)}
+        for i in range(15):
+            datos[f'col{i}'] = niveles(dias)
+        datos['Límite'] = np.full(dias, 65)
+        datos['Cumplimiento'] = rng.choice(resultados, dias)
+        datos['Nota'] = np.full(dias, None)
+        return pd.DataFrame(datos)
+
+    def resumen():
+        datos = {'TipoDia': ['Dominical', 'Ordinario', 'Total']}
+        for i in range(14):
+            datos[f'col{i}'] = niveles(3)
+        datos['s_k^2'] = rng.random(3)
+        datos['s_k'] = rng.random(3)
+        datos['Cumplimiento'] = rng.choice(resultados, 3)
+        return pd.DataFrame(datos)
+
+    dia_noche = pd.DataFrame({'TipoDia': ['Dominical', 'Ordinario', 'Total'], 'Nm,dn': [48, 168, 216],
+                              'LASeq': niveles(3), 'LRASeq': niveles(3), 'LAIeq': niveles(3)})
+    return [tabla, diario(), diario(), resumen(), resumen(), dia_noche]
+
+def escribir_por_celda(ws, datasets, start_columns):
+    """Ruta anterior: is_merged_cell y un Alignment nuevo por cada celda"""
+    column_widths = {}
+    for df, col_start in zip(datasets, start_columns):
+        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=10):
+            for c_idx, value in enumerate(row, start=col_start):
+                if not is_merged_cell(ws, r_idx, c_idx):
+                    cell = ws.cell(row=r_idx, column=c_idx, value=value)
+                    cell.alignment = Alignment(horizontal='center', vertical='center')
+                    if isinstance(value, str) and value.lower() in COLORES_CUMPLIMIENTO:
+                        cell.fill = COLORES_CUMPLIMIENTO[value.lower()]
+                    column_letter = get_column_letter(c_idx)
+                    column_widths[column_letter] = max(column_widths.get(column_letter, 0), len(str(value)) + 7)
+    return column_widths
+
+def diferencias(ws_a, ws_b):
+    """Cuenta las celdas con distinto valor, alineación o relleno entre dos hojas"""
+    total = 0
+    # Los estilos de celda son StyleProxy; se comparan sus copias para no comparar proxies
+    for fila_a, fila_b in zip(ws_a.iter_rows(), ws_b.iter_rows()):
+        for a, b in zip(fila_a, fila_b):
+            if (a.value != b.value and not (a.value != a.value and b.value != b.value)) \
+                    or a.alignment.copy() != b.alignment.copy() or a.fill.copy() != b.fill.copy():
+                total += 1
+    return total + abs(ws_a.max_row - ws_b.max_row) + abs(ws_a.max_column - ws_b.max_column)
+
+def main(filas=20_000, plantilla="Plantilla/Plantilla_Macro.xlsx"):
+    datasets = [round_dataframe(formatear_cientificos(df)) for df in generar_datasets(filas)]
+
+    wb_ref = load_workbook(plantilla)
+    inicio = time.perf_counter()
+    anchos_ref = escribir_por_celda(wb_ref["Hoja1"], datasets, START_COLUMNS)
+    t_celda = time.perf_counter() - inicio
+
+    wb_nuevo = load_workbook(plantilla)
+    inicio = time.perf_counter()
+    anchos_nuevo = escribir_bloques(wb_nuevo["Hoja1"], datasets, START_COLUMNS)
+    t_bloques = time.perf_counter() - inicio
+
+    distintas = diferencias(wb_ref["Hoja1"], wb_nuevo["Hoja1"])
+    anchos_iguales = anchos_ref == anchos_nuevo
+
+    # Exportación completa (carga de plantilla, escritura y guardado)
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        export_to_template(*generar_datasets(filas), plantilla, os.path.join(carpeta, "PTO.xlsx"), "EMRI")
+        t_total = time.perf_counter() - inicio
+
+    print(f"Filas: {filas}, celdas escritas: {sum(df.size for df in datasets)}")
+    print(f"Celda por celda:  {t_celda:.3f} s")
+    print(f"Por bloques:      {t_bloques:.3f} s ({t_celda / t_bloques:.1f}x)")
+    print(f"Exportación completa con guardado: {t_total:.3f} s")
+    print(f"Celdas distintas: {distintas}, anchos iguales: {anchos_iguales}")
+    return distintas == 0 and anchos_iguales
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+         sys.argv[2] if len(sys.argv) > 2 else "Plantilla/Plantilla_Macro.xlsx")
@@ -0,0 +1,39 @@
+"""
+Benchmark de la corrección al día de medición: corregir_fecha_hora aplicada fila
+por fila (tres veces por hoja, como hacía cargar_datos) frente a corregir_fechas
+sobre la columna completa una sola vez.
+
+Uso:
+    python -m benchmarks.bench_fechas [dias] [intervalo]
+"""
+import sys
+import time
+import pandas as pd
+from utils.date_utils import corregir_fecha_hora, corregir_fechas
+from benchmarks.sintetico import periodos
+
+def main(dias=31, intervalo="1min"):
+    # Un mes de datos a partir de las 07:00, con un NaT para cubrir celdas vacías
+    fechas = pd.Series(periodos(dias, intervalo, "2025-03-01 07:00"), name="Period start")
+    fechas.iloc[len(fechas) // 2] = pd.NaT
+
+    inicio = time.perf_counter()
+    for _ in range(3):  # TerciosOctava, dfASlow y dfAImpulse
+        referencia = fechas.apply(corregir_fecha_hora)
+    t_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorial = corregir_fechas(fechas)
+    t_vector = time.perf_counter() - inicio
+
+    identicos = referencia.equals(vectorial)
+
+    print(f"Filas: {len(fechas)} ({dias} días, intervalo {intervalo})")
+    print(f"Fila por fila (x3): {t_filas:.3f} s")
+    print(f"Vectorial (x1):     {t_vector:.5f} s ({t_filas / t_vector:.0f}x)")
+    print(f"Resultados idénticos: {identicos}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 31,
+         sys.argv[2] if len(sys.argv) > 2 else "1min")
@@ -0,0 +1,84 @@
+"""
+Benchmark de la incertidumbre expandida de un mes de estaciones: el cálculo anterior
+por celda (DataFrames de una fila, crear_dataframe y t.ppf por valor) frente a
+calcular_incertidumbres_lote, que resuelve todas las combinaciones estación x
+período x tipo de día en una sola operación vectorizada.
+
+Uso:
+    python -m benchmarks.bench_incertidumbre [estaciones] [repeticiones]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import t
+from processing.uncertainty import crear_dataframe, calcular_incertidumbre, calcular_veff
+from processing.uncertainty_handler import calcular_incertidumbres_lote
+from utils.file_utils import valores_cientificos
+
+def incertidumbres_por_celda(resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno):
+    """Cálculo anterior de calcular_incertidumbres, una celda cada vez"""
+    alpha = 0.05
+    instru = pd.DataFrame({'uslm': [0.5], 'uresol': [round(0.1 / np.sqrt(12), 3)]})
+    Ubi = pd.DataFrame({"uloc": [0]})
+    IncExp = []
+    for resumen, MET_resumen in [(resumen_diurno, MET_resumen_diurno), (resumen_nocturno, MET_resumen_nocturno)]:
+        sens = pd.DataFrame({
+            "umic,T": [MET_resumen["∆"].iloc[0] * np.abs(-0.007)],
+            "umic,P": [MET_resumen["∆"].iloc[2] * np.abs(-0.010)],
+            "umic,H*": [0.1]
+        })
+        columnas = {}
+        for tipo, sufijo in [('Dominical', ',dom'), ('Ordinario', ',Ord'), ('Total', '')]:
+            Tipo_A = crear_dataframe(tipo, resumen)
+            IncComb = pd.Series([calcular_incertidumbre(Ubi, sens, instru, Tipo_A)])
+            veff = calcular_veff(IncComb, Tipo_A, instru, sens, Ubi)
+            columnas[f"K{sufijo}"] = [t.ppf(1 - alpha / 2, veff)]
+            columnas[f"U{sufijo}"] = [t.ppf(1 - alpha / 2, veff) * IncComb.iloc[0]]
+        IncExp.append(pd.DataFrame(columnas))
+    return tuple(IncExp)
+
+def estaciones_sinteticas(n, rng):
+    """Resúmenes diurno/nocturno y meteorológicos con la forma de los de procesar_hoja"""
+    estaciones = []
+    for _ in range(n):
+        datos = []
+        for conteo in (300, 200):
+            conteos = [conteo // 7, conteo - conteo // 7, conteo]
+            datos.append(pd.DataFrame({
+                'TipoDia': ['Dominical', 'Ordinario', 'Total'],
+                'Conteo': conteos,
+                'LRASeq_k': np.round(rng.uniform(50, 75, 3), 1),
+                's_k': valores_cientificos(rng.uniform(1e4, 1e7, 3))
+            }))
+        for _ in range(2):
+            datos.append(pd.DataFrame({
+                'Variable': ['TEMP', 'HUM', 'PRES', 'PREC'],
+                '∆': np.round(rng.uniform([5, 20, 1, 0], [15, 60, 5, 10]), 2)
+            }))
+        estaciones.append(tuple(datos))
+    return estaciones
+
+def main(estaciones=27, repeticiones=5, semilla=0):
+    entradas = estaciones_sinteticas(estaciones, np.random.default_rng(semilla))
+    print(f"Estaciones: {estaciones} ({estaciones * 6} combinaciones estación x período x tipo de día)")
+
+    t_celda = t_lote = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        referencia = [incertidumbres_por_celda(*entrada) for entrada in entradas]
+        t_celda = min(t_celda, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        lote = calcular_incertidumbres_lote(entradas)
+        t_lote = min(t_lote, time.perf_counter() - inicio)
+
+    identicos = all(a.equals(b) for ref, res in zip(referencia, lote) for a, b in zip(ref, res))
+    print(f"Por celda:                   {t_celda * 1000:8.1f} ms")
+    print(f"calcular_incertidumbres_lote: {t_lote * 1000:7.1f} ms ({t_celda / t_lote:.0f}x)")
+    print(f"Resultados idénticos: {identicos}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 27,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,53 @@
+"""
+Benchmark del parseo de 'Period start': pd.to_datetime con formato explícito (como
+hacía cargar_datos) frente a parsear_periodos, con la columna como texto del equipo,
+como número de serie de Excel y como número de serie guardado en texto.
+
+Uso:
+    python -m benchmarks.bench_periodos [dias] [intervalo]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from utils.date_utils import FORMATO_PERIODO, ORIGEN_EXCEL, parsear_periodos
+from benchmarks import sintetico
+
+def main(dias=31, intervalo="1min"):
+    fechas = pd.Series(sintetico.periodos(dias, intervalo, "2025-03-01 07:00"))
+    serie = (fechas - pd.Timestamp(ORIGEN_EXCEL)) / pd.Timedelta("1D")
+    columnas = {
+        "texto": fechas.dt.strftime(FORMATO_PERIODO).astype(object),
+        "serie Excel": serie,
+        "serie en texto": serie.astype(str).astype(object)
+    }
+    print(f"Filas: {len(fechas)} ({dias} días, intervalo {intervalo})")
+
+    identicos = True
+    for nombre, columna in columnas.items():
+        inicio = time.perf_counter()
+        if nombre == "texto":
+            referencia = pd.to_datetime(columna, format=FORMATO_PERIODO)
+        else:
+            referencia = pd.to_datetime(pd.to_numeric(columna), unit="D", origin=pd.Timestamp(ORIGEN_EXCEL)).dt.round("s")
+        t_pandas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        periodos, malformadas = parsear_periodos(columna)
+        t_parser = time.perf_counter() - inicio
+
+        iguales = np.array_equal(periodos, referencia.to_numpy()) and not malformadas.any()
+        identicos &= iguales
+        print(f"{nombre:<15} pandas: {t_pandas * 1000:8.1f} ms   parsear_periodos: {t_parser * 1000:7.1f} ms "
+              f"({t_pandas / t_parser:4.1f}x)   idénticos: {iguales}")
+
+    # Filas mal formadas: se marcan en lugar de lanzar una excepción
+    columna = columnas["texto"].copy()
+    columna.iloc[[10, 20]] = ["31/02/2025 07:00:00 AM", "sin fecha"]
+    _, malformadas = parsear_periodos(columna)
+    print(f"Filas mal formadas detectadas: {np.flatnonzero(malformadas).tolist()}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 31,
+         sys.argv[2] if len(sys.argv) > 2 else "1min")
@@ -0,0 +1,241 @@
+"""
+Benchmark del flujo completo sobre un libro sintético (benchmarks.sintetico).
+
+Mide el tiempo de cada etapa de main.procesar_hoja envolviendo las funciones
+que la componen (carga, meteorología, ponderación A, ajuste tonal, agregación
+diaria, estadísticos, incertidumbre, cumplimiento y exportación), más la
+combinación del libro de salida y RUIDO TOTAL, en los dos modos de salida
+(archivos por estación y libro consolidado). Las estaciones se procesan en el
+mismo proceso para que los tiempos de cada etapa sean comparables.
+
+Los resultados se guardan en JSON y, con --comparar, se comparan con los de
+una versión anterior para detectar regresiones.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--estaciones N] [--dias N] [--intervalo 1h]
+        [--repeticiones N] [--salida archivo.json] [--comparar anterior.json] [--tolerancia 0.2]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from contextlib import contextmanager, redirect_stdout
+import main
+from processing import data_handler
+from export.excel import LibroConsolidado
+from export.ruido_total import RuidoTotal
+from benchmarks.sintetico import generar_libro
+
+# Etapa -> funciones (objeto, atributo) cuyo tiempo se acumula en ella
+ETAPAS = {
+    "carga": [(main, "cargar_datos")],
+    "meteorologia": [(main, "process_and_export_weather_data")],
+    "ponderacion": [(data_handler, "Ponderacion_A_matriz")],
+    "ajuste_tonal": [(data_handler, "ajuste_tonal_matriz")],
+    "tabla": [(main, "crear_tabla_procesada")],
+    "diario": [(main, "filtrar_por_periodos"), (main, "procesar_diario"), (main, "finalizar_agrupados")],
+    "estadisticos": [(main, "generar_resumenes"), (main, "calcular_estadisticos"),
+                     (main, "actualizar_resumen"), (main, "calcular_L_Raseq_dn")],
+    "incertidumbre": [(main, "calcular_incertidumbres")],
+    "cumplimiento": [(main, "asignar_limites"), (main, "asignar_limites_diarios"),
+                     (main, "procesar_compliance_diurno"), (main, "procesar_compliance_nocturno")],
+    "exportacion": [(main, "export_to_template"), (LibroConsolidado, "agregar_estacion")],
+    "combinacion": [(main, "combine_excel_files"), (LibroConsolidado, "guardar")],
+    "ruido_total": [(main, "procesar_excel_simple"), (RuidoTotal, "exportar")]
+}
+
+# Diferencias menores a este tiempo (s) no se consideran regresiones
+TIEMPO_MINIMO = 0.05
+
+@contextmanager
+def medir_etapas(tiempos):
+    """
+    Envuelve las funciones de ETAPAS para acumular su tiempo en tiempos[etapa]
+
+    Args:
+        tiempos: Diccionario etapa -> segundos que se va llenando
+    """
+    originales = []
+
+    def envolver(etapa, funcion):
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                tiempos[etapa] = tiempos.get(etapa, 0.0) + time.perf_counter() - inicio
+        return envoltura
+
+    try:
+        for etapa, funciones in ETAPAS.items():
+            tiempos[etapa] = 0.0
+            for objeto, atributo in funciones:
+                funcion = getattr(objeto, atributo)
+                originales.append((objeto, atributo, funcion))
+                setattr(objeto, atributo, envolver(etapa, funcion))
+        yield tiempos
+    finally:
+        for objeto, atributo, funcion in reversed(originales):
+            setattr(objeto, atributo, funcion)
+
+def ejecutar_modo(archivo_excel, sheets, consolidado, carpeta, plantilla):
+    """
+    Ejecuta el flujo completo en una carpeta de trabajo propia
+
+    Args:
+        archivo_excel: Ruta absoluta del libro de entrada
+        sheets: Hojas EMRI a procesar
+        consolidado: Salida en un libro consolidado (True) o por archivos (False)
+        carpeta: Carpeta de trabajo vacía (salidas y caché de hojas)
+        plantilla: Ruta absoluta de la plantilla
+
+    Returns:
+        Diccionario con el tiempo total, los tiempos por etapa y las hojas con error
+    """
+    directorio = os.getcwd()
+    template_path = main.TEMPLATE_PATH
+    tiempos = {}
+    os.makedirs(os.path.join(carpeta, main.OUTPUT_FOLDER), exist_ok=True)
+    os.chdir(carpeta)
+    main.TEMPLATE_PATH = plantilla
+    try:
+        with medir_etapas(tiempos), redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            ruido_total = RuidoTotal() if consolidado else None
+            procesadas, errores = main.procesar_hojas(
+                sheets, archivo_excel, archivo_excel, workers=1,
+                consolidado=consolidado, ruido_total=ruido_total
+            )
+            if ruido_total is not None:
+                ruido_total.exportar(main.OUTPUT_FOLDER)
+            else:
+                main.combine_excel_files(main.OUTPUT_FOLDER)
+                main.procesar_excel_simple(os.path.join(main.OUTPUT_FOLDER, "Excel_Intercalado.xlsx"), main.OUTPUT_FOLDER)
+            total = time.perf_counter() - inicio
+    finally:
+        main.TEMPLATE_PATH = template_path
+        os.chdir(directorio)
+
+    tiempos["otros"] = max(total - sum(tiempos.values()), 0.0)
+    return {
+        "total": total,
+        "etapas": tiempos,
+        "procesadas": len(procesadas),
+        "errores": {sheet: error.splitlines()[0] for sheet, error in errores.items()}
+    }
+
+def version_actual():
+    """Commit actual del repositorio, o None si no se puede obtener"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(actual, anterior, tolerancia):
+    """
+    Compara dos resultados y muestra la razón de tiempos de cada etapa
+
+    Args:
+        actual: Resultados de esta ejecución
+        anterior: Resultados cargados del JSON anterior
+        tolerancia: Aumento relativo permitido antes de considerar una regresión
+
+    Returns:
+        Lista de (modo, etapa, tiempo anterior, tiempo actual) con regresiones
+    """
+    if actual["parametros"] != anterior.get("parametros"):
+        print("Aviso: los parámetros del benchmark anterior son distintos")
+
+    regresiones = []
+    for modo, datos in actual["modos"].items():
+        previo = anterior.get("modos", {}).get(modo)
+        if previo is None:
+            continue
+        print(f"\n{modo} (anterior {anterior.get('version')} -> actual {actual.get('version')}):")
+        filas = list(datos["etapas"].items()) + [("total", datos["total"])]
+        for etapa, tiempo in filas:
+            antes = previo["total"] if etapa == "total" else previo["etapas"].get(etapa)
+            if antes is None:
+                continue
+            razon = tiempo / antes if antes > 0 else float("inf")
+            regresion = razon > 1 + tolerancia and tiempo - antes > TIEMPO_MINIMO
+            if regresion:
+                regresiones.append((modo, etapa, antes, tiempo))
+            print(f"  {etapa:<14} {antes:8.3f} s -> {tiempo:8.3f} s  ({razon:5.2f}x)"
+                  f"{'  REGRESIÓN' if regresion else ''}")
+    return regresiones
+
+def main_benchmark(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del procesamiento de estaciones")
+    parser.add_argument("--estaciones", type=int, default=4, help="Hojas EMRI del libro sintético")
+    parser.add_argument("--dias", type=int, default=30, help="Días de medición")
+    parser.add_argument("--intervalo", default="1h", help="Duración del intervalo de las hojas EMRI")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Se guarda el mínimo de cada etapa")
+    parser.add_argument("--modos", nargs="+", default=["archivos", "consolidado"],
+                        choices=["archivos", "consolidado"], help="Modos de salida a medir")
+    parser.add_argument("--salida", default="bench_pipeline.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Aumento relativo permitido")
+    args = parser.parse_args(argumentos)
+
+    plantilla = os.path.abspath(main.TEMPLATE_PATH)
+    resultados = {
+        "version": version_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parametros": {
+            "estaciones": args.estaciones, "dias": args.dias, "intervalo": args.intervalo,
+            "semilla": args.semilla, "repeticiones": args.repeticiones
+        },
+        "modos": {}
+    }
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo_excel = os.path.join(carpeta, "Met_Sintetico.xlsx")
+        inicio = time.perf_counter()
+        sheets = generar_libro(archivo_excel, args.estaciones, args.dias, args.intervalo, args.semilla)
+        print(f"Libro sintético: {len(sheets)} estaciones, {args.dias} días, intervalo {args.intervalo} "
+              f"({time.perf_counter() - inicio:.1f} s)")
+
+        for modo in args.modos:
+            mejor = None
+            for repeticion in range(args.repeticiones):
+                trabajo = os.path.join(carpeta, f"{modo}_{repeticion}")
+                medicion = ejecutar_modo(archivo_excel, sheets, modo == "consolidado", trabajo, plantilla)
+                if mejor is None:
+                    mejor = medicion
+                else:
+                    mejor["total"] = min(mejor["total"], medicion["total"])
+                    for etapa, tiempo in medicion["etapas"].items():
+                        mejor["etapas"][etapa] = min(mejor["etapas"][etapa], tiempo)
+            resultados["modos"][modo] = mejor
+
+            print(f"\n{modo}: {mejor['total']:.3f} s, {mejor['procesadas']} hojas procesadas")
+            for etapa, tiempo in mejor["etapas"].items():
+                print(f"  {etapa:<14} {tiempo:8.3f} s")
+            for sheet, error in mejor["errores"].items():
+                print(f"  Error en {sheet}: {error}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        regresiones = comparar(resultados, anterior, args.tolerancia)
+        print(f"\nRegresiones: {len(regresiones)}")
+        return not regresiones
+    return all(not datos["errores"] for datos in resultados["modos"].values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main_benchmark() else 1)
@@ -0,0 +1,62 @@
+"""
+Benchmark de la ponderación A: celda por celda (Ponderacion_A) frente a la
+versión vectorial (Ponderacion_A_matriz).
+
+Uso:
+    python -m benchmarks.bench_ponderacion [filas]
+"""
+import sys
+import time
+import numpy as np
+from processing.acoustic import Ponderacion_A, Ponderacion_A_matriz
+
+# Etiquetas de banda tal como quedan tras limpiar la fila 6 de las hojas EMRI
+BANDAS = ['6.3', '8', '10', '12.5', '16', '20', '25', '31.5', '40', '50', '63', '80', '100',
+          '125', '160', '200', '250', '315', '400', '500', '630', '800', '1k', '1.25k', '1.6k',
+          '2k', '2.5k', '3.15k', '4k', '5k', '6.3k', '8k', '10k', '12.5k', '16k', '20k']
+
+def generar_niveles(filas, semilla=0):
+    """
+    Genera una matriz sintética de niveles de tercio de octava (dB)
+
+    Args:
+        filas: Número de intervalos
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        Matriz (filas x bandas) con algunos valores NaN
+    """
+    rng = np.random.default_rng(semilla)
+    niveles = np.round(rng.normal(55, 8, size=(filas, len(BANDAS))), 1)
+    niveles[rng.random(niveles.shape) < 0.001] = np.nan
+    return niveles
+
+def ponderacion_por_celda(niveles):
+    """Ruta anterior: una llamada a Ponderacion_A por celda"""
+    return np.array([
+        [Ponderacion_A(freq, level) for freq, level in zip(BANDAS, row)]
+        for row in niveles
+    ])
+
+def main(filas=10_000):
+    niveles = generar_niveles(filas)
+
+    inicio = time.perf_counter()
+    referencia = ponderacion_por_celda(niveles)
+    t_celda = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorial = Ponderacion_A_matriz(BANDAS, niveles)
+    t_vector = time.perf_counter() - inicio
+
+    # Comparación bit a bit (NaN en las mismas posiciones)
+    identicos = np.array_equal(referencia.view(np.uint64), vectorial.view(np.uint64))
+
+    print(f"Filas: {filas} x {len(BANDAS)} bandas")
+    print(f"Celda por celda: {t_celda:.3f} s")
+    print(f"Vectorial:       {t_vector:.5f} s ({t_celda / t_vector:.0f}x)")
+    print(f"Resultados idénticos bit a bit: {identicos}")
+    return identicos
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
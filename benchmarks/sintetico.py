@@ -0,0 +1,179 @@
+"""
+Generador de libros sintéticos con la forma de los Met_*.xlsx de entrada.
+
+Cada hoja EMRI replica el encabezado del equipo (estación en la fila 4, tipo de
+datos en la fila 6 y estadísticos en la fila 8, datos desde la fila 9) con un
+grupo de 5 columnas (Leq, Lmin, Lmax, L90, L10) para Slow, Impulso y cada banda
+de tercio de octava. Las hojas TEMP, HUM, PRES y PREC tienen una columna por
+estación meteorológica de ESTACIONES_MET, nombradas como en los archivos reales.
+
+Uso:
+    python -m benchmarks.sintetico [ruta] [estaciones] [dias] [intervalo]
+"""
+import sys
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from data.constants import SHEETS_TO_PROCESS, ESTACIONES_MET
+from benchmarks.bench_ponderacion import BANDAS
+
+ESTADISTICOS = ['Leq', 'Lmin', 'Lmax', 'L90', 'L10']
+
+# Desplazamiento de cada estadístico respecto al Leq del intervalo (dB)
+DESPLAZAMIENTOS = np.array([0, -15, 20, -8, 3])
+
+def hojas_estaciones(estaciones):
+    """
+    Hojas EMRI a generar, tomadas en orden de SHEETS_TO_PROCESS
+
+    Args:
+        estaciones: Número de hojas EMRI
+
+    Returns:
+        Lista de nombres de hoja
+    """
+    if estaciones > len(SHEETS_TO_PROCESS):
+        raise ValueError(f"Se pueden generar como máximo {len(SHEETS_TO_PROCESS)} estaciones")
+    return SHEETS_TO_PROCESS[:estaciones]
+
+def periodos(dias, intervalo, inicio="2025-04-01 07:00"):
+    """
+    Instantes de inicio de cada intervalo de medición, de las 07:00 del primer día
+    a la hora anterior a las 07:00 del último, como en los archivos del equipo
+
+    Args:
+        dias: Número de días medidos
+        intervalo: Duración del intervalo (por ejemplo '1h' o '15min')
+        inicio: Primer instante
+
+    Returns:
+        DatetimeIndex con los inicios de intervalo
+    """
+    inicio = pd.Timestamp(inicio)
+    return pd.date_range(inicio, inicio + pd.Timedelta(days=dias), freq=intervalo, inclusive="left")
+
+def niveles_emri(filas, rng):
+    """
+    Niveles sintéticos de una estación: Slow, Impulso y bandas, con 5 estadísticos cada uno
+
+    Args:
+        filas: Número de intervalos
+        rng: Generador aleatorio de NumPy
+
+    Returns:
+        Matriz (filas x (2 + bandas) * 5) redondeada a 0.1 dB
+    """
+    # Espectro base decreciente con la frecuencia y tonos puros ocasionales
+    espectro = np.linspace(58, 38, len(BANDAS))
+    bandas = espectro + rng.normal(0, 3, size=(filas, len(BANDAS)))
+    tonos = rng.random(bandas.shape) < 0.01
+    bandas[tonos] += rng.uniform(2, 15, size=tonos.sum())
+
+    slow = rng.normal(62, 6, size=(filas, 1))
+    impulso = slow + rng.uniform(0.5, 5, size=(filas, 1))
+    leq = np.hstack([slow, impulso, bandas])
+
+    # Cada Leq se expande a sus 5 estadísticos contiguos
+    niveles = (leq[:, :, None] + DESPLAZAMIENTOS).reshape(filas, -1)
+    return np.round(niveles, 1)
+
+def escribir_hoja_emri(libro, sheet, instantes, niveles, formato_fecha):
+    """
+    Escribe una hoja EMRI con el encabezado del equipo
+
+    Args:
+        libro: xlsxwriter.Workbook en modo constant_memory
+        sheet: Nombre de la hoja (por ejemplo 'EMRI13')
+        instantes: Inicios de intervalo
+        niveles: Matriz devuelta por niveles_emri
+        formato_fecha: Formato de celda para las fechas
+    """
+    ws = libro.add_worksheet(sheet)
+    estacion = sheet.replace("EMRI", "EMRI_")
+    grupos = ["Slow", "Impulso"] + [f"1/3 Oct {banda}Hz" for banda in BANDAS]
+
+    ws.write_row(0, 0, ["Archivo", f"sintetico_{sheet}.CMG"])
+    ws.write_row(1, 0, ["Periodo", instantes.freqstr])
+    ws.write(2, 0, "Inicio")
+    ws.write_datetime(2, 1, instantes[0].to_pydatetime(), formato_fecha)
+    ws.write(3, 0, "Fin")
+    ws.write_datetime(3, 1, (instantes[-1] + instantes.freq).to_pydatetime(), formato_fecha)
+    ws.write_row(4, 0, ["Localización"] + [estacion] * len(grupos))
+    ws.write_row(5, 0, ["Ponderación", "A", "A"] + ["Lin"] * len(BANDAS))
+    ws.write_row(6, 0, ["Tipo de datos"] + grupos)
+    ws.write_row(7, 0, ["Unidad"] + ["dB"] * len(grupos))
+    ws.write_row(8, 0, ["Período de inicio"] + ESTADISTICOS * len(grupos))
+
+    for fila, (instante, valores) in enumerate(zip(instantes, niveles.tolist()), start=9):
+        ws.write_datetime(fila, 0, instante.to_pydatetime(), formato_fecha)
+        ws.write_row(fila, 1, valores)
+
+def variables_met(filas, columnas, rng):
+    """
+    Series meteorológicas sintéticas por estación
+
+    Args:
+        filas: Número de horas
+        columnas: Número de estaciones meteorológicas
+        rng: Generador aleatorio de NumPy
+
+    Returns:
+        Diccionario variable -> matriz (filas x columnas)
+    """
+    hora = np.arange(filas)[:, None] % 24
+    lluvia = rng.random((filas, columnas)) < 0.05
+    return {
+        "TEMP": np.round(14 + 5 * np.sin((hora - 9) / 24 * 2 * np.pi) + rng.normal(0, 1, (filas, columnas)), 2),
+        "HUM": np.round(rng.uniform(50, 95, (filas, columnas)), 2),
+        "PRES": np.round(rng.normal(752, 1, (filas, columnas)), 2),
+        "PREC": np.round(np.where(lluvia, rng.uniform(0.1, 5, (filas, columnas)), 0.0), 2)
+    }
+
+def generar_libro(ruta, estaciones=4, dias=30, intervalo="1h", semilla=0):
+    """
+    Genera un libro Met_*.xlsx sintético
+
+    Args:
+        ruta: Ruta del libro a crear
+        estaciones: Número de hojas EMRI (las primeras de SHEETS_TO_PROCESS)
+        dias: Días de medición
+        intervalo: Duración del intervalo de las hojas EMRI (las hojas MET son horarias)
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        Lista de hojas EMRI generadas
+    """
+    rng = np.random.default_rng(semilla)
+    sheets = hojas_estaciones(estaciones)
+    instantes = periodos(dias, intervalo)
+
+    # Las hojas MET cubren los días completos, de 00:00 del primer día a 23:00 del último
+    horas = pd.date_range(instantes[0].normalize(), periods=(dias + 1) * 24, freq="h")
+    nombres_met = sorted({nombre for nombre in ESTACIONES_MET.values() if nombre != "SDA"})
+    met = variables_met(len(horas), len(nombres_met), rng)
+
+    libro = xlsxwriter.Workbook(ruta, {"constant_memory": True})
+    formato_fecha = libro.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+    try:
+        for variable, valores in met.items():
+            ws = libro.add_worksheet(variable)
+            ws.write_row(0, 0, ["Fecha"] + [f'\ufeff"{nombre}"' for nombre in nombres_met])
+            for fila, (hora, fila_valores) in enumerate(zip(horas, valores.tolist()), start=1):
+                ws.write_datetime(fila, 0, hora.to_pydatetime(), formato_fecha)
+                ws.write_row(fila, 1, fila_valores)
+
+        for sheet in sheets:
+            escribir_hoja_emri(libro, sheet, instantes, niveles_emri(len(instantes), rng), formato_fecha)
+    finally:
+        libro.close()
+    return sheets
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "Input/Met_Sintetico.xlsx"
+    sheets = generar_libro(
+        ruta,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 30,
+        sys.argv[4] if len(sys.argv) > 4 else "1h"
+    )
+    print(f"Libro '{ruta}' generado con {len(sheets)} hojas EMRI: {', '.join(sheets)}")
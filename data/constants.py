@@ -32,6 +32,27 @@ ARCHIVO_EXCEL = "Input/Met_Mar.xlsx"
 # Carpeta de salida
 OUTPUT_FOLDER = 'PTOS_salida'
 
+# Carpeta de las ejecuciones por lotes (batch.py): cada ejecución crea una subcarpeta con
+# una carpeta de salida por libro y el manifiesto de la ejecución
+BATCH_OUTPUT_FOLDER = 'PTOS_lotes'
+
+# Plantilla de las hojas PTO
+TEMPLATE_PATH = "Plantilla/Plantilla_Macro.xlsx"
+
+# Escribir las hojas PTO y MET directamente en Excel_Intercalado.xlsx
+# (False = archivos PTO{n}/MET{n}.xlsx por estación combinados con combine_excel_files)
+CONSOLIDATED_OUTPUT = True
+
+# Procesos para procesar estaciones en paralelo (None = número de CPUs, 1 = secuencial)
+MAX_WORKERS = None
+
+# Caché en disco de hojas parseadas (se invalida al cambiar el libro de entrada)
+CACHE_FOLDER = '.cache_hojas'
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Hojas leídas que la pestaña de visualización de la interfaz guarda en memoria (LRU)
+VIZ_CACHE_SHEETS = 6
+
 # Diccionario de estaciones meteorológicas
 ESTACIONES_MET = {
     "EMRI_1": "EMRI 8 CE0331",
@@ -61,4 +82,17 @@ ESTACIONES_MET = {
     "EMRI_33": "EMRI 2 CE0337",
     "EMRI_34": "SDA",
     "EMRI_35": "SDA"
-}
\ No newline at end of file
+}
+# Lectura de las hojas EMRI por bloques de filas, para registros de alta resolución
+# que no caben en memoria (None = cargar la hoja completa)
+STREAMING_CHUNK_ROWS = None
+
+# Carpeta del estado acumulado por día de cada estación: con cada libro mensual solo se
+# reprocesan los días nuevos para los resúmenes (None = recalcular el mes completo)
+INCREMENTAL_STATE_FOLDER = None
+
+# Exclusión meteorológica: variable MET -> umbral. Se descartan todos los intervalos
+# acústicos de las horas MET en que alguna variable supera su umbral. Una variable que
+# no sea TEMP, HUM, PRES o PREC (por ejemplo 'VIENTO': 5.0) se lee de la hoja del libro
+# con ese nombre, si existe
+MET_EXCLUSION_THRESHOLDS = {'PREC': 0.5}
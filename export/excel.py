@@ -1,8 +1,92 @@
+from datetime import datetime
+import pandas as pd
 from openpyxl import load_workbook
-from openpyxl.styles import Font, Border, PatternFill, Alignment, Protection
+from openpyxl.styles import Font, Border, PatternFill, Alignment, Protection, Side, Color
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.utils import get_column_letter
-from utils.file_utils import round_dataframe, is_merged_cell
+from utils.file_utils import formatear_cientificos, round_dataframe, celdas_combinadas
+
+# Colores de celda según el resultado de cumplimiento
+COLORES_CUMPLIMIENTO = {
+    "pasa": PatternFill(start_color="C6EFC0", end_color="C6EFC0", fill_type="solid"),  # Verde
+    "no pasa": PatternFill(start_color="FFC7C0", end_color="FFC7C0", fill_type="solid"),  # Rojo
+    "pasa condicional": PatternFill(start_color="FFD490", end_color="FFD490", fill_type="solid")  # Amarillo
+}
+
+# Formato con que pandas.to_excel escribe las fechas y horas
+FORMATO_FECHA_HORA_PANDAS = 'YYYY-MM-DD HH:MM:SS'
+
+def escribir_bloques(ws, datasets, start_columns, fila_inicio=10):
+    """
+    Escribe cada DataFrame como un bloque de celdas centradas a partir de su columna,
+    omitiendo las celdas combinadas de la plantilla y coloreando los resultados de cumplimiento
+    
+    Args:
+        ws: Hoja de destino
+        datasets: Lista de DataFrames a escribir (sin nombres de columnas)
+        start_columns: Columna inicial de cada DataFrame
+        fila_inicio: Primera fila de datos
+        
+    Returns:
+        Diccionario letra de columna -> ancho necesario para su contenido
+    """
+    # Celdas combinadas de la plantilla (se calculan una sola vez) y estilo compartido
+    combinadas = celdas_combinadas(ws)
+    centrado = Alignment(horizontal='center', vertical='center')
+
+    column_widths = {}  # Diccionario para almacenar los anchos máximos de cada columna
+
+    for df, col_start in zip(datasets, start_columns):
+        anchos = [0] * df.shape[1]
+        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=fila_inicio):
+            for offset, value in enumerate(row):
+                c_idx = col_start + offset
+                if (r_idx, c_idx) in combinadas:  # Evitar celdas combinadas
+                    continue
+                cell = ws.cell(row=r_idx, column=c_idx, value=value)
+                cell.alignment = centrado
+
+                # Aplicar color de celda si la celda tiene color
+                if isinstance(value, str) and value.lower() in COLORES_CUMPLIMIENTO:
+                    cell.fill = COLORES_CUMPLIMIENTO[value.lower()]
+
+                # Ancho basado en la longitud del contenido con un margen extra
+                anchos[offset] = max(anchos[offset], len(str(value)) + 7)
+
+        # Acumular el ancho máximo de cada columna del bloque
+        for offset, ancho in enumerate(anchos):
+            if ancho:
+                column_letter = get_column_letter(col_start + offset)
+                column_widths[column_letter] = max(column_widths.get(column_letter, 0), ancho)
+
+    return column_widths
+
+def escribir_plantilla(ws, datasets, Estacion):
+    """
+    Llena una hoja con el formato de la plantilla con los resultados de una estación
+    
+    Args:
+        ws: Hoja copiada de la plantilla
+        datasets: Lista con (TablaProcesada, diurno_grouped, nocturno_grouped,
+                  resumen_diurno, resumen_nocturno, dia_noche)
+        Estacion: Nombre de la estación
+    """
+    # Agregar la variable Estacion en la celda B1
+    ws["B1"] = Estacion
+    ws["B1"].alignment = Alignment(horizontal='center', vertical='center')
+    ws["B1"].font = Font(bold=True)
+    ws["B1"].font = Font(color="FFFFFF") 
+
+    # s_k^2 y s_k en notación científica y el resto de los datos redondeados a 2 decimales
+    datasets = [round_dataframe(formatear_cientificos(df)) for df in datasets]
+
+    start_columns = [1, 9, 29, 49, 67, 85]  # Columnas específicas en la plantilla
+
+    column_widths = escribir_bloques(ws, datasets, start_columns)
+
+    # Aplicar los anchos de columna con margen extra
+    for col_letter, width in column_widths.items():
+        ws.column_dimensions[col_letter].width = width
 
 def export_to_template(TablaProcesada, diurno_grouped, nocturno_grouped, resumen_diurno, resumen_nocturno, dia_noche, template_path, output_path, Estacion):
     """
@@ -21,48 +105,112 @@ def export_to_template(TablaProcesada, diurno_grouped, nocturno_grouped, resumen
     """
     wb = load_workbook(template_path)
     ws = wb["Hoja1"]  # Seleccionar la hoja específica
-    
-    # Agregar la variable Estacion en la celda B1
-    ws["B1"] = Estacion
-    ws["B1"].alignment = Alignment(horizontal='center', vertical='center')
-    ws["B1"].font = Font(bold=True)
-    ws["B1"].font = Font(color="FFFFFF") 
 
-    # Redondear todos los datos a 2 decimales
     datasets = [TablaProcesada, diurno_grouped, nocturno_grouped, resumen_diurno, resumen_nocturno, dia_noche]
-    datasets = [round_dataframe(df) for df in datasets]
+    escribir_plantilla(ws, datasets, Estacion)
 
-    start_columns = [1, 9, 29, 49, 67, 85]  # Columnas específicas en la plantilla
+    wb.save(output_path)
+    print(f"Archivo '{output_path}' guardado con éxito.")
 
-    # Definir colores
-    colors = {
-        "pasa": PatternFill(start_color="C6EFC0", end_color="C6EFC0", fill_type="solid"),  # Verde
-        "no pasa": PatternFill(start_color="FFC7C0", end_color="FFC7C0", fill_type="solid"),  # Rojo
-        "pasa condicional": PatternFill(start_color="FFD490", end_color="FFD490", fill_type="solid")  # Amarillo
+def escribir_hoja_met(ws, final_df, summary_df):
+    """
+    Escribe los datos meteorológicos y su resumen en una hoja con el mismo formato
+    que produce pandas.to_excel (encabezados e índice en negrita con borde y fechas con
+    FORMATO_FECHA_HORA_PANDAS)
+    
+    Args:
+        ws: Hoja de destino
+        final_df: DataFrame con los datos meteorológicos indexado por Fecha_Hora
+        summary_df: DataFrame con el resumen (MAX, MIN, ∆) de cada variable
+    """
+    borde = Side(style='thin')
+    encabezado = {
+        "font": Font(name="Calibri", size=11, bold=True, color=Color(theme=1)),
+        "border": Border(left=borde, right=borde, top=borde, bottom=borde),
+        "alignment": Alignment(horizontal='center', vertical='top')
     }
 
-    column_widths = {}  # Diccionario para almacenar los anchos máximos de cada columna
+    def celda(fila, columna, valor):
+        cell = ws.cell(row=fila, column=columna, value=valor)
+        if isinstance(valor, datetime):
+            cell.number_format = FORMATO_FECHA_HORA_PANDAS
+        return cell
 
-    for df, col_start in zip(datasets, start_columns):
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=10):  # No incluir nombres de columnas
-            for c_idx, value in enumerate(row, start=col_start):
-                if not is_merged_cell(ws, r_idx, c_idx):  # Evitar celdas combinadas
-                    cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                    
-                    # Aplicar alineación centrada
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                    # Aplicar color de celda si la celda tiene color
-                    if isinstance(value, str) and value.lower() in colors:
-                        cell.fill = colors[value.lower()]  # Aplicar color según el valor
-
-                    # Ajustar el ancho de la columna basado en la longitud del contenido con un margen extra
-                    column_letter = get_column_letter(c_idx)
-                    column_widths[column_letter] = max(column_widths.get(column_letter, 0), len(str(value)) + 7)
+    def celda_encabezado(fila, columna, valor):
+        cell = celda(fila, columna, valor)
+        cell.font = encabezado["font"]
+        cell.border = encabezado["border"]
+        cell.alignment = encabezado["alignment"]
 
-    # Aplicar los anchos de columna con margen extra
-    for col_letter, width in column_widths.items():
-        ws.column_dimensions[col_letter].width = width
+    def valor_celda(valor):
+        # pandas escribe los NaN como celdas vacías
+        return None if pd.isna(valor) else valor
 
-    wb.save(output_path)
-    print(f"Archivo '{output_path}' guardado con éxito.")
\ No newline at end of file
+    # Datos con el índice en la primera columna
+    celda_encabezado(1, 1, final_df.index.name)
+    for offset, columna in enumerate(final_df.columns, start=2):
+        celda_encabezado(1, offset, columna)
+    for r_idx, (indice, fila) in enumerate(zip(final_df.index, final_df.itertuples(index=False)), start=2):
+        celda_encabezado(r_idx, 1, valor_celda(indice))
+        for c_idx, valor in enumerate(fila, start=2):
+            celda(r_idx, c_idx, valor_celda(valor))
+
+    # Resumen separado por una columna vacía
+    col_start = final_df.shape[1] + 3
+    for offset, columna in enumerate(summary_df.columns):
+        celda_encabezado(1, col_start + offset, columna)
+    for r_idx, fila in enumerate(summary_df.itertuples(index=False), start=2):
+        for offset, valor in enumerate(fila):
+            celda(r_idx, col_start + offset, valor_celda(valor))
+
+class LibroConsolidado:
+    """
+    Libro de salida (Excel_Intercalado.xlsx) en el que se escriben directamente las hojas
+    PTO y MET de cada estación, en lugar de generar archivos por estación y combinarlos
+    después con combine_excel_files.
+
+    Las hojas PTO se crean copiando la hoja de la plantilla dentro del mismo libro, así
+    conservan celdas combinadas, anchos y estilos sin copiarlos celda por celda.
+    """
+
+    def __init__(self, template_path, output_path):
+        """
+        Args:
+            template_path: Ruta a la plantilla Excel de las hojas PTO
+            output_path: Ruta del libro consolidado
+        """
+        self.output_path = output_path
+        self.wb = load_workbook(template_path)
+        self._plantilla = self.wb["Hoja1"]
+        self.puntos = 0
+
+    def agregar_estacion(self, resultado):
+        """
+        Agrega las hojas PTO{n} y MET{n} de una estación con el siguiente número de punto
+        
+        Args:
+            resultado: Diccionario devuelto por procesar_hoja con 'Estacion', 'datasets' y 'MET'
+            
+        Returns:
+            Número de punto asignado
+        """
+        self.puntos += 1
+        ws = self.wb.copy_worksheet(self._plantilla)
+        ws.title = f"PTO{self.puntos}"
+        escribir_plantilla(ws, resultado["datasets"], resultado["Estacion"])
+
+        # Igual que en la salida por archivos, no hay hoja MET si la estación no tiene datos
+        final_df, summary_df = resultado["MET"]
+        if final_df is not None:
+            escribir_hoja_met(self.wb.create_sheet(title=f"MET{self.puntos}"), final_df, summary_df)
+        return self.puntos
+
+    def guardar(self):
+        """Elimina las hojas de la plantilla y guarda el libro consolidado"""
+        for ws in list(self.wb.worksheets):
+            if not ws.title.startswith(("PTO", "MET")) or ws is self._plantilla:
+                self.wb.remove(ws)
+        if not self.wb.worksheets:
+            self.wb.create_sheet()
+        self.wb.save(self.output_path)
+        print(f"✅ Archivo combinado guardado en: {self.output_path}")
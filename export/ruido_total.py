@@ -13,18 +13,111 @@ import re
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from copy import copy
+from utils.file_utils import formatear_cientificos, round_dataframe
 
 
-def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
+# Nombres de columnas para los DataFrames en el orden correcto
+NOMBRES_COLUMNAS = ["LASeqk", "LAIeqk", "LRASeqk", "sk2", "sk", "TU", "k", "U", "E", "w", "AU", "z", "Rp*=Pc", "Rc", "Declaración"]
+
+# Filas de la hoja PTO con los resúmenes (Dominical, Ordinario y Total)
+FILAS_RESUMEN = [9, 10, 11]
+
+
+def ajustar_valores(valores):
     """
-    Procesa un archivo Excel con datos de ruido de múltiples estaciones y genera reportes formateados.
+    Reemplaza los NaN por None y ajusta la lista a la longitud de NOMBRES_COLUMNAS
     
     Args:
-        ruta_archivo (str): Ruta al archivo Excel a procesar
-        ruta_guardado (str, optional): Ruta donde guardar los resultados. Por defecto usa directorio actual.
+        valores (list): Valores de una fila de resumen
     
     Returns:
-        dict: Diccionario con los DataFrames generados
+        list: Valores ajustados
+    """
+    valores = [None if pd.isna(v) else v for v in valores]
+    if len(valores) < len(NOMBRES_COLUMNAS):
+        return valores + [None] * (len(NOMBRES_COLUMNAS) - len(valores))
+    return valores[:len(NOMBRES_COLUMNAS)]
+
+
+def identificar_estacion(nombre_estacion, hoja):
+    """
+    Obtiene el nombre y el número de una estación, con el nombre de la hoja como respaldo
+    
+    Args:
+        nombre_estacion (str): Nombre encontrado (por ejemplo 'EMRI_13') o None
+        hoja (str): Nombre de la hoja PTO de la estación
+    
+    Returns:
+        tuple: (nombre_estacion, num_estacion)
+    """
+    num_estacion = None
+    if nombre_estacion is not None:
+        nombre_estacion = str(nombre_estacion).strip()
+        # Extraer el número que sigue a EMRI_
+        match = re.search(r'EMRI_(\d+)', nombre_estacion)
+        if match:
+            num_estacion = int(match.group(1))
+            print(f"Encontrado {nombre_estacion} en columna con número {num_estacion}")
+    
+    # Si no se encuentra número, usar índice de la hoja
+    if nombre_estacion is None:
+        nombre_estacion = f"EMRI_{hoja[-1]}"
+        num_estacion = int(hoja[-1]) if hoja[-1].isdigit() else 0
+        print(f"Usando nombre genérico: {nombre_estacion}")
+    elif num_estacion is None:
+        # Si se encontró EMRI pero sin número, intentar extraerlo de la hoja
+        num_estacion = int(hoja[-1]) if hoja[-1].isdigit() else 0
+        print(f"Número no encontrado en EMRI, usando número de hoja: {num_estacion}")
+    
+    return nombre_estacion, num_estacion
+
+
+def construir_dataframes(datos_estaciones):
+    """
+    Crea los DataFrames de RUIDO TOTAL con las estaciones ordenadas por número
+    
+    Args:
+        datos_estaciones (list): Tuplas (nombre_estacion, num_estacion, datos_diurnos, datos_nocturnos),
+            donde los datos son diccionarios fila -> valores
+    
+    Returns:
+        dict: Diccionario con los DataFrames diurno_fila{n} y nocturno_fila{n}
+    """
+    # Ordenar las estaciones por el número extraído
+    datos_estaciones = sorted(datos_estaciones, key=lambda x: x[1])
+    
+    print("\nEstaciones ordenadas:")
+    for nombre, num, _, _ in datos_estaciones:
+        print(f"{nombre} (número {num})")
+    
+    dataframes = {}
+    
+    for fila in FILAS_RESUMEN:
+        # Crear listas para los DataFrames
+        nombres = [estacion[0] for estacion in datos_estaciones]
+        valores_diurnos = [estacion[2][fila] for estacion in datos_estaciones]
+        valores_nocturnos = [estacion[3][fila] for estacion in datos_estaciones]
+        
+        # DataFrame diurno
+        df_diurno = pd.DataFrame(valores_diurnos, columns=NOMBRES_COLUMNAS)
+        df_diurno.insert(0, 'Nombre', nombres)
+        dataframes[f'diurno_fila{fila}'] = df_diurno
+        
+        # DataFrame nocturno
+        df_nocturno = pd.DataFrame(valores_nocturnos, columns=NOMBRES_COLUMNAS)
+        df_nocturno.insert(0, 'Nombre', nombres)
+        dataframes[f'nocturno_fila{fila}'] = df_nocturno
+    
+    return dataframes
+
+
+def guardar_ruido_total(dataframes, ruta_guardado=None):
+    """
+    Guarda los DataFrames de RUIDO TOTAL con formato especial
+    
+    Args:
+        dataframes (dict): Diccionario devuelto por construir_dataframes
+        ruta_guardado (str, optional): Ruta donde guardar los resultados. Por defecto usa directorio actual.
     """
     # Si no se especifica ruta de guardado, usar el directorio actual
     if ruta_guardado is None:
@@ -34,6 +127,87 @@ def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
     if not os.path.exists(ruta_guardado):
         os.makedirs(ruta_guardado)
     
+    # Crear archivo Excel con formato especial
+    crear_excel_formato_especial(dataframes, ruta_guardado)
+    
+    # Verificar dimensiones de cada DataFrame
+    for nombre, df in dataframes.items():
+        print(f"DataFrame {nombre}: {df.shape[0]} filas x {df.shape[1]} columnas")
+
+
+class RuidoTotal:
+    """
+    Acumula los datos de RUIDO TOTAL a partir de los resúmenes diurno y nocturno de cada
+    estación a medida que se procesan, sin volver a leer Excel_Intercalado.xlsx.
+
+    Los valores son los mismos que procesar_excel_simple lee de las hojas PTO: las filas
+    Dominical, Ordinario y Total de cada resumen, de LASeq_k a Declaracion, redondeadas
+    a 2 decimales como se escriben en la plantilla.
+    """
+
+    def __init__(self):
+        self.datos_estaciones = []
+
+    @staticmethod
+    def _filas(resumen):
+        """Valores de las filas 9, 10 y 11 de la hoja PTO a partir de un resumen"""
+        valores = round_dataframe(formatear_cientificos(resumen)).iloc[:, 2:]
+        return {
+            fila: ajustar_valores(valores.iloc[idx].tolist()) if idx < len(valores) else [None] * len(NOMBRES_COLUMNAS)
+            for idx, fila in enumerate(FILAS_RESUMEN)
+        }
+
+    def agregar_estacion(self, hoja, Estacion, resumen_diurno, resumen_nocturno):
+        """
+        Agrega los datos de una estación
+        
+        Args:
+            hoja (str): Nombre de la hoja PTO de la estación (por ejemplo 'PTO3')
+            Estacion (str): Nombre de la estación
+            resumen_diurno (pd.DataFrame): Resumen diurno con cumplimiento
+            resumen_nocturno (pd.DataFrame): Resumen nocturno con cumplimiento
+        """
+        nombre_estacion = Estacion if Estacion is not None and "EMRI" in str(Estacion) else None
+        nombre_estacion, num_estacion = identificar_estacion(nombre_estacion, hoja)
+        self.datos_estaciones.append(
+            (nombre_estacion, num_estacion, self._filas(resumen_diurno), self._filas(resumen_nocturno))
+        )
+
+    def dataframes(self):
+        """
+        Returns:
+            dict: Diccionario con los DataFrames diurno_fila{n} y nocturno_fila{n}
+        """
+        return construir_dataframes(self.datos_estaciones)
+
+    def exportar(self, ruta_guardado=None):
+        """
+        Genera RUIDO TOTAL.xlsx con las estaciones acumuladas
+        
+        Args:
+            ruta_guardado (str, optional): Ruta donde guardar los resultados
+        
+        Returns:
+            dict: Diccionario con los DataFrames generados
+        """
+        dataframes = self.dataframes()
+        guardar_ruido_total(dataframes, ruta_guardado)
+        return dataframes
+
+
+def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
+    """
+    Procesa un archivo Excel con datos de ruido de múltiples estaciones y genera reportes formateados.
+    Se usa con libros ya generados; durante el procesamiento RuidoTotal obtiene los mismos datos
+    de los resúmenes en memoria.
+    
+    Args:
+        ruta_archivo (str): Ruta al archivo Excel a procesar
+        ruta_guardado (str, optional): Ruta donde guardar los resultados. Por defecto usa directorio actual.
+    
+    Returns:
+        dict: Diccionario con los DataFrames generados
+    """
     # Cargar el Excel
     xl = pd.ExcelFile(ruta_archivo)
     
@@ -42,9 +216,6 @@ def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
     
     print(f"Hojas PTO encontradas: {hojas_pto}")
     
-    # Nombres de columnas para los DataFrames en el orden correcto
-    nombres_columnas = ["LASeqk", "LAIeqk", "LRASeqk", "sk2", "sk", "TU", "k", "U", "E", "w", "AU", "z", "Rp*=Pc", "Rc", "Declaración"]
-    
     # Índices de columnas fijos
     col_ay_idx = 50  # Índice para AY
     col_bm_idx = 64  # Índice para BM
@@ -54,13 +225,11 @@ def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
     # Listas para almacenar los datos
     datos_estaciones = []  # Lista para almacenar tuplas (nombre_estacion, num_estacion, datos_diurnos, datos_nocturnos)
     
-    # Procesar cada hoja en paralelo
     for hoja in hojas_pto:
         df = pd.read_excel(xl, sheet_name=hoja)
         
         # Buscar EMRI en cualquier lugar
         nombre_estacion = None
-        num_estacion = None
         
         # Buscar en todas las filas y columnas (primeras filas para mayor eficiencia)
         for fila in range(min(10, len(df))):
@@ -68,112 +237,48 @@ def procesar_excel_simple(ruta_archivo, ruta_guardado=None):
                 if pd.notna(df.iloc[fila, col]):
                     valor = str(df.iloc[fila, col])
                     if "EMRI" in valor:
-                        nombre_estacion = valor.strip()
-                        # Extraer el número que sigue a EMRI_
-                        match = re.search(r'EMRI_(\d+)', valor)
-                        if match:
-                            num_estacion = int(match.group(1))
-                            print(f"Encontrado {nombre_estacion} en columna con número {num_estacion}")
+                        nombre_estacion = valor
                         break
             if nombre_estacion:
                 break
         
         # Revisar las columnas también
         if nombre_estacion is None:
-            for i, col_name in enumerate(df.columns):
+            for col_name in df.columns:
                 if "EMRI" in str(col_name):
                     nombre_estacion = str(col_name)
-                    match = re.search(r'EMRI_(\d+)', nombre_estacion)
-                    if match:
-                        num_estacion = int(match.group(1))
-                        print(f"Encontrado {nombre_estacion} en columna con número {num_estacion}")
                     break
         
-        # Si no se encuentra número, usar índice de la hoja
-        if nombre_estacion is None:
-            nombre_estacion = f"EMRI_{hoja[-1]}"
-            num_estacion = int(hoja[-1]) if hoja[-1].isdigit() else 0
-            print(f"Usando nombre genérico: {nombre_estacion}")
-        elif num_estacion is None:
-            # Si se encontró EMRI pero sin número, intentar extraerlo de la hoja
-            num_estacion = int(hoja[-1]) if hoja[-1].isdigit() else 0
-            print(f"Número no encontrado en EMRI, usando número de hoja: {num_estacion}")
+        nombre_estacion, num_estacion = identificar_estacion(nombre_estacion, hoja)
         
         # Extraer datos para filas 9, 10, 11
         datos_diurnos = {}
         datos_nocturnos = {}
         
-        for fila, idx in zip([9, 10, 11], [8, 9, 10]):
+        for fila, idx in zip(FILAS_RESUMEN, [8, 9, 10]):
             if idx < len(df):
                 # Datos diurnos (AY-BM)
                 if col_ay_idx < df.shape[1] and col_bm_idx < df.shape[1]:
-                    valores_diurnos = df.iloc[idx, col_ay_idx:col_bm_idx+1].values.tolist()
-                    valores_diurnos = [None if pd.isna(v) else v for v in valores_diurnos]
-                    # Ajustar longitud a nombres_columnas
-                    if len(valores_diurnos) < len(nombres_columnas):
-                        valores_diurnos += [None] * (len(nombres_columnas) - len(valores_diurnos))
-                    else:
-                        valores_diurnos = valores_diurnos[:len(nombres_columnas)]
-                    datos_diurnos[fila] = valores_diurnos
+                    datos_diurnos[fila] = ajustar_valores(df.iloc[idx, col_ay_idx:col_bm_idx+1].values.tolist())
                 else:
-                    datos_diurnos[fila] = [None] * len(nombres_columnas)
+                    datos_diurnos[fila] = [None] * len(NOMBRES_COLUMNAS)
                 
                 # Datos nocturnos (BQ-CE)
                 if col_bq_idx < df.shape[1] and col_ce_idx < df.shape[1]:
-                    valores_nocturnos = df.iloc[idx, col_bq_idx:col_ce_idx+1].values.tolist()
-                    valores_nocturnos = [None if pd.isna(v) else v for v in valores_nocturnos]
-                    # Ajustar longitud a nombres_columnas
-                    if len(valores_nocturnos) < len(nombres_columnas):
-                        valores_nocturnos += [None] * (len(nombres_columnas) - len(valores_nocturnos))
-                    else:
-                        valores_nocturnos = valores_nocturnos[:len(nombres_columnas)]
-                    datos_nocturnos[fila] = valores_nocturnos
+                    datos_nocturnos[fila] = ajustar_valores(df.iloc[idx, col_bq_idx:col_ce_idx+1].values.tolist())
                 else:
-                    datos_nocturnos[fila] = [None] * len(nombres_columnas)
+                    datos_nocturnos[fila] = [None] * len(NOMBRES_COLUMNAS)
             else:
-                datos_diurnos[fila] = [None] * len(nombres_columnas)
-                datos_nocturnos[fila] = [None] * len(nombres_columnas)
+                datos_diurnos[fila] = [None] * len(NOMBRES_COLUMNAS)
+                datos_nocturnos[fila] = [None] * len(NOMBRES_COLUMNAS)
             
             print(f"Fila {fila} extraída para {nombre_estacion}")
         
         # Guardar los datos de esta estación
         datos_estaciones.append((nombre_estacion, num_estacion, datos_diurnos, datos_nocturnos))
     
-    # Ordenar las estaciones por el número extraído
-    datos_estaciones.sort(key=lambda x: x[1])
-    
-    print("\nEstaciones ordenadas:")
-    for nombre, num, _, _ in datos_estaciones:
-        print(f"{nombre} (número {num})")
-    
-    # Ahora crear los DataFrames con las estaciones ordenadas
-    dataframes = {}
-    
-    for fila in [9, 10, 11]:
-        # Crear listas para los DataFrames
-        nombres = [estacion[0] for estacion in datos_estaciones]
-        valores_diurnos = [estacion[2][fila] for estacion in datos_estaciones]
-        valores_nocturnos = [estacion[3][fila] for estacion in datos_estaciones]
-        
-        # DataFrame diurno
-        df_diurno = pd.DataFrame(valores_diurnos, columns=nombres_columnas)
-        df_diurno.insert(0, 'Nombre', nombres)
-        nombre_diurno = f'diurno_fila{fila}'
-        dataframes[nombre_diurno] = df_diurno
-        
-
-        # DataFrame nocturno
-        df_nocturno = pd.DataFrame(valores_nocturnos, columns=nombres_columnas)
-        df_nocturno.insert(0, 'Nombre', nombres)
-        nombre_nocturno = f'nocturno_fila{fila}'
-        dataframes[nombre_nocturno] = df_nocturno    
-    # Crear archivo Excel con formato especial
-    crear_excel_formato_especial(dataframes, ruta_guardado)
-    
-    # Verificar dimensiones de cada DataFrame
-    for nombre, df in dataframes.items():
-        print(f"DataFrame {nombre}: {df.shape[0]} filas x {df.shape[1]} columnas")
-        
+    dataframes = construir_dataframes(datos_estaciones)
+    guardar_ruido_total(dataframes, ruta_guardado)
     return dataframes
 
 
@@ -4,24 +4,29 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
     QHBoxLayout, QPushButton, QLabel, QFileDialog, QComboBox, 
     QLineEdit, QFormLayout, QGroupBox, QTextEdit, QMessageBox,
-    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
+    QProgressBar, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
     QListWidget, QAbstractItemView, QCheckBox, QSplitter, QDialog,
-    QDialogButtonBox
+    QDialogButtonBox, QSpinBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer
 from PyQt5.QtGui import QFont, QIcon
+from gui.table_model import DataFrameTableModel, DataFrameFilterProxyModel
+from gui.viz_data import VisualizationDataService
+from gui.plotting import IntervalSeriesPlot, segmentos_periodo
 
 # Importando módulos del proyecto actual
 # Estas importaciones hay que ajustarlas según la estructura real
 # y considerar añadir la carpeta raíz al sys.path si es necesario
 try:
-    from data.constants import SHEETS_TO_PROCESS, ARCHIVO_EXCEL, OUTPUT_FOLDER
+    from data.constants import SHEETS_TO_PROCESS, ARCHIVO_EXCEL, OUTPUT_FOLDER, MAX_WORKERS, CONSOLIDATED_OUTPUT
     from utils.file_utils import combine_excel_files
+    from utils.progress import EstimadorETA, NOMBRES_ETAPAS, formatear_duracion
     from processing.acoustic import aplicar_Correccion
     from processing.meteorology import process_and_export_weather_data
     from processing.data_handler import (
@@ -35,7 +40,7 @@ try:
         procesar_compliance_nocturno, finalizar_agrupados
     )
     from export.excel import export_to_template
-    from export.ruido_total import (procesar_excel_simple, combinar_excels)
+    from export.ruido_total import (procesar_excel_simple, combinar_excels, RuidoTotal)
     
     PROJECT_MODULES_IMPORTED = True
 except ImportError as e:
@@ -56,6 +61,7 @@ class MatplotlibCanvas(FigureCanvas):
 class ProcessingWorker(QThread):
     """Worker para ejecutar el procesamiento en segundo plano"""
     update_progress = pyqtSignal(int, str)
+    stage_progress = pyqtSignal(int, str)
     finished_signal = pyqtSignal(dict)
     error_signal = pyqtSignal(str)
     
@@ -78,42 +84,68 @@ class ProcessingWorker(QThread):
             # Crear carpeta de salida si no existe
             os.makedirs(output_folder, exist_ok=True)
             
-            # Procesamiento por hojas
-            pto = 1
+            # Procesamiento por hojas (en paralelo con un pool de procesos)
             total_sheets = len(sheets_to_process)
+            workers = self.parameters.get('workers', MAX_WORKERS)
+            self.update_progress.emit(0, f"Procesando {total_sheets} hojas con {workers or os.cpu_count()} procesos")
             
-            for idx, sheet in enumerate(sheets_to_process):
-                if not self.running:
-                    break
-                
-                # Actualizar progreso
-                progress = int((idx / total_sheets) * 90)  # Reservamos 10% para el procesamiento final
-                self.update_progress.emit(progress, f"Procesando hoja: {sheet}")
-                
-                # Procesar hoja
-                try:
-                    # Si integramos directamente con el código existente:
-                    if PROJECT_MODULES_IMPORTED:
-                        from main import procesar_hoja
-                        pto = procesar_hoja(sheet, pto, archivo_excel, archivo_excel)
-                    else:
-                        # Simulamos el procesamiento para pruebas
-                        import time
-                        time.sleep(1)
-                except Exception as e:
-                    self.update_progress.emit(progress, f"Error en hoja {sheet}: {str(e)}")
+            # Tiempo restante a partir de la duración de las etapas ya terminadas
+            procesos = 1 if workers == 1 or total_sheets <= 1 else min(workers or os.cpu_count() or 1, total_sheets)
+            estimador = EstimadorETA(total_sheets, procesos)
+            
+            def progreso_etapa(evento):
+                estimador.registrar(evento)
+                etapa = NOMBRES_ETAPAS.get(evento.etapa, evento.etapa)
+                self.stage_progress.emit(
+                    int(estimador.fraccion_total() * 90),
+                    f"{evento.hoja}: {etapa} {evento.fraccion_etapa:.0%} "
+                    f"(etapa: {formatear_duracion(estimador.restante_etapa(evento))}, "
+                    f"total: {formatear_duracion(estimador.restante_total())} restantes)"
+                )
+            
+            def progreso(completadas, total, sheet, error):
+                estimador.hoja_terminada(sheet)
+                progress = int(estimador.fraccion_total() * 90)  # Reservamos 10% para el procesamiento final
+                if error is None:
+                    self.update_progress.emit(progress, f"Hoja procesada: {sheet} ({completadas}/{total})")
+                else:
+                    self.update_progress.emit(progress, f"Error en hoja {sheet}: {error.splitlines()[0]}")
+            
+            from main import procesar_hojas, formatear_uso_cache
+            ruido_total = RuidoTotal() if CONSOLIDATED_OUTPUT else None
+            procesadas, errores = procesar_hojas(
+                sheets_to_process, archivo_excel, archivo_excel, workers,
+                progreso=progreso, continuar=lambda: self.running, ruido_total=ruido_total,
+                progreso_etapa=progreso_etapa, output_folder=output_folder,
+                info_cache=lambda uso: self.update_progress.emit(
+                    int(estimador.fraccion_total() * 90), formatear_uso_cache(uso)
+                )
+            )
+            self.update_progress.emit(
+                90, f"Hojas procesadas: {len(procesadas)} de {total_sheets}, con errores: {len(errores)}"
+            )
+            
+            if not self.running:
+                self.update_progress.emit(
+                    int(estimador.fraccion_total() * 90),
+                    f"Procesamiento cancelado: {len(procesadas)} de {total_sheets} hojas procesadas"
+                )
             
             # Procesamiento final
             if self.running:
                 self.update_progress.emit(90, "Combinando archivos Excel...")
                 
                 if PROJECT_MODULES_IMPORTED:
-                    # Combinar archivos Excel
-                    combine_excel_files(output_folder)
+                    # Combinar archivos Excel (con la salida consolidada el libro ya está escrito)
+                    if not CONSOLIDATED_OUTPUT:
+                        combine_excel_files(output_folder)
                     
                     # Procesar ruido total
                     ruta_excel = f"{output_folder}/Excel_Intercalado.xlsx"
-                    dataframes = procesar_excel_simple(ruta_excel, output_folder)
+                    if ruido_total is not None:
+                        dataframes = ruido_total.exportar(output_folder)
+                    else:
+                        dataframes = procesar_excel_simple(ruta_excel, output_folder)
                     
                     # Combinar resultados finales
                     archivo1 = os.path.join(output_folder, "RUIDO TOTAL.xlsx")
@@ -127,8 +159,8 @@ class ProcessingWorker(QThread):
                 results = {
                     "status": "success",
                     "output_folder": output_folder,
-                    "processed_sheets": sheets_to_process,
-                    "points": pto - 1
+                    "processed_sheets": [sheet for sheet, _ in procesadas],
+                    "points": len(procesadas)
                 }
                 
                 self.finished_signal.emit(results)
@@ -233,6 +265,8 @@ class AcousticProcessingApp(QMainWindow):
         self.output_folder = ""
         self.selected_sheets = []
         self.results = None
+        self.viz_df = None
+        self.viz_plot = None
         
         # Configurar la interfaz
         self.setup_ui()
@@ -354,6 +388,12 @@ class AcousticProcessingApp(QMainWindow):
         self.process_total_option.setChecked(True)
         advanced_layout.addRow(self.process_total_option)
         
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(os.cpu_count() or 1, 1) * 4)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        self.workers_spin.setToolTip("Número de estaciones que se procesan en paralelo")
+        advanced_layout.addRow("Procesos en paralelo:", self.workers_spin)
+        
         layout.addWidget(advanced_group)
         
         # Botones de acción
@@ -411,6 +451,10 @@ class AcousticProcessingApp(QMainWindow):
         self.progress_label = QLabel("Esperando inicio...")
         progress_layout.addWidget(self.progress_label)
         
+        # Etapa en curso y tiempo restante (no se registra en el log)
+        self.stage_label = QLabel("")
+        progress_layout.addWidget(self.stage_label)
+        
         layout.addWidget(progress_group)
         
         # Botones de acción
@@ -475,18 +519,31 @@ class AcousticProcessingApp(QMainWindow):
         """Configuración de la pestaña de visualización"""
         layout = QVBoxLayout(self.visualization_tab)
         
+        # Lectura de hojas en segundo plano con caché
+        self.viz_data = VisualizationDataService(parent=self)
+        self.viz_data.sheet_names_loaded.connect(self.viz_sheet_names_loaded)
+        self.viz_data.sheet_loaded.connect(self.viz_sheet_loaded)
+        self.viz_data.load_failed.connect(self.viz_load_failed)
+        self.viz_data.busy_changed.connect(self.viz_busy_changed)
+        
         # Selector de archivo
         file_selector_group = QGroupBox("Selección de archivo para visualización")
         file_selector_layout = QFormLayout(file_selector_group)
         
         self.viz_file_combo = QComboBox()
-        self.viz_file_combo.currentIndexChanged.connect(self.update_visualization)
+        self.viz_file_combo.currentIndexChanged.connect(self.load_viz_file_sheets)
         file_selector_layout.addRow("Archivo:", self.viz_file_combo)
         
         self.viz_sheet_combo = QComboBox()
         self.viz_sheet_combo.currentIndexChanged.connect(self.update_visualization)
         file_selector_layout.addRow("Hoja:", self.viz_sheet_combo)
         
+        # Indicador de carga (indeterminado)
+        self.viz_busy_bar = QProgressBar()
+        self.viz_busy_bar.setRange(0, 0)
+        self.viz_busy_bar.setVisible(False)
+        file_selector_layout.addRow(self.viz_busy_bar)
+        
         layout.addWidget(file_selector_group)
         
         # Visualización
@@ -497,13 +554,15 @@ class AcousticProcessingApp(QMainWindow):
         chart_layout = QVBoxLayout(chart_group)
         
         self.chart_canvas = MatplotlibCanvas(width=6, height=5)
+        # Zoom y desplazamiento (la serie por intervalo se vuelve a reducir al ancho visible)
+        chart_layout.addWidget(NavigationToolbar(self.chart_canvas, chart_group))
         chart_layout.addWidget(self.chart_canvas)
         
         # Selector de gráfico
         self.viz_type_combo = QComboBox()
         # Actualizar las opciones del combo box de visualización
-        self.viz_type_combo.addItems(["Niveles acústicos diurnos", "Niveles acústicos nocturnos"])
-        self.viz_type_combo.currentIndexChanged.connect(self.update_visualization)
+        self.viz_type_combo.addItems(["Niveles acústicos diurnos", "Niveles acústicos nocturnos", "Serie por intervalo"])
+        self.viz_type_combo.currentIndexChanged.connect(self.update_viz_chart_type)
         chart_layout.addWidget(QLabel("Tipo de visualización:"))
         chart_layout.addWidget(self.viz_type_combo)
         
@@ -513,8 +572,34 @@ class AcousticProcessingApp(QMainWindow):
         data_group = QGroupBox("Datos")
         data_layout = QVBoxLayout(data_group)
         
-        self.viz_table = QTableWidget()
+        # Filtro de filas (se aplica al dejar de escribir)
+        filter_layout = QHBoxLayout()
+        self.viz_filter_edit = QLineEdit()
+        self.viz_filter_edit.setPlaceholderText("Filtrar filas...")
+        self.viz_filter_column_combo = QComboBox()
+        self.viz_filter_column_combo.addItem("Todas las columnas")
+        filter_layout.addWidget(self.viz_filter_edit)
+        filter_layout.addWidget(self.viz_filter_column_combo)
+        data_layout.addLayout(filter_layout)
+        
+        self.viz_filter_timer = QTimer(self)
+        self.viz_filter_timer.setSingleShot(True)
+        self.viz_filter_timer.setInterval(300)
+        self.viz_filter_timer.timeout.connect(self.apply_viz_filter)
+        self.viz_filter_edit.textChanged.connect(lambda _: self.viz_filter_timer.start())
+        self.viz_filter_column_combo.currentIndexChanged.connect(self.apply_viz_filter)
+        
+        # Tabla virtual: solo se formatean las celdas visibles
+        self.viz_model = DataFrameTableModel()
+        self.viz_proxy = DataFrameFilterProxyModel()
+        self.viz_proxy.setSourceModel(self.viz_model)
+        
+        self.viz_table = QTableView()
+        self.viz_table.setModel(self.viz_proxy)
         self.viz_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.viz_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.viz_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.viz_table.setSortingEnabled(True)
         data_layout.addWidget(self.viz_table)
         
         splitter.addWidget(data_group)
@@ -622,7 +707,8 @@ class AcousticProcessingApp(QMainWindow):
                     "output_folder": self.output_folder,
                     "selected_sheets": selected_sheets,
                     "combine_files": self.combine_option.isChecked(),
-                    "process_total": self.process_total_option.isChecked()
+                    "process_total": self.process_total_option.isChecked(),
+                    "workers": self.workers_spin.value()
                 }
                 
                 # Guardar a archivo
@@ -695,6 +781,9 @@ class AcousticProcessingApp(QMainWindow):
                 if "process_total" in config:
                     self.process_total_option.setChecked(config["process_total"])
                 
+                if "workers" in config:
+                    self.workers_spin.setValue(int(config["workers"]))
+                
                 QMessageBox.information(self, "Cargar Configuración", "Configuración cargada correctamente.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error al cargar la configuración: {str(e)}")
@@ -729,6 +818,7 @@ class AcousticProcessingApp(QMainWindow):
         self.log_text.clear()
         self.progress_bar.setValue(0)
         self.progress_label.setText("Iniciando procesamiento...")
+        self.stage_label.setText("")
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         
@@ -742,7 +832,8 @@ class AcousticProcessingApp(QMainWindow):
             'output_folder': self.output_folder,
             'sheets': self.selected_sheets,
             'combine_files': self.combine_option.isChecked(),
-            'process_total': self.process_total_option.isChecked()
+            'process_total': self.process_total_option.isChecked(),
+            'workers': self.workers_spin.value()
         }
         
         # Registrar el inicio en el log
@@ -754,6 +845,7 @@ class AcousticProcessingApp(QMainWindow):
         # Crear y configurar el worker
         self.processing_worker = ProcessingWorker(parameters)
         self.processing_worker.update_progress.connect(self.update_progress)
+        self.processing_worker.stage_progress.connect(self.update_stage_progress)
         self.processing_worker.finished_signal.connect(self.processing_finished)
         self.processing_worker.error_signal.connect(self.processing_error)
         
@@ -779,6 +871,11 @@ class AcousticProcessingApp(QMainWindow):
         # Mover el cursor al final del log
         self.log_text.moveCursor(self.log_text.textCursor().End)
     
+    def update_stage_progress(self, value, message):
+        """Actualizar la barra de progreso con el avance de las etapas y el tiempo restante"""
+        self.progress_bar.setValue(max(value, self.progress_bar.value()))
+        self.stage_label.setText(message)
+    
     def processing_finished(self, results):
         """Manejar la finalización del procesamiento"""
         self.results = results
@@ -903,7 +1000,9 @@ class AcousticProcessingApp(QMainWindow):
     
     def update_viz_file_selector(self):
         """Actualizar el selector de archivos para visualización"""
+        self.viz_file_combo.blockSignals(True)
         self.viz_file_combo.clear()
+        self.viz_file_combo.blockSignals(False)
         
         if not self.output_folder or not os.path.exists(self.output_folder):
             return
@@ -912,94 +1011,124 @@ class AcousticProcessingApp(QMainWindow):
             files = [f for f in os.listdir(self.output_folder) if f.endswith(('.xlsx', '.xls'))]
             
             if files:
+                self.viz_file_combo.blockSignals(True)
                 self.viz_file_combo.addItems(files)
+                self.viz_file_combo.blockSignals(False)
                 # Seleccionar el primer archivo y cargar sus hojas
                 self.load_viz_file_sheets()
         except Exception as e:
             print(f"Error al actualizar selector de archivos: {str(e)}")
     
+    def viz_file_path(self):
+        """Ruta del archivo seleccionado para visualización ('' si no hay ninguno)"""
+        selected_file = self.viz_file_combo.currentText()
+        return os.path.join(self.output_folder, selected_file) if selected_file else ""
+    
     def load_viz_file_sheets(self):
-        """Cargar las hojas del archivo seleccionado para visualización"""
+        """Pedir en segundo plano las hojas del archivo seleccionado para visualización"""
+        self.viz_sheet_combo.blockSignals(True)
         self.viz_sheet_combo.clear()
+        self.viz_sheet_combo.blockSignals(False)
         
-        selected_file = self.viz_file_combo.currentText()
-        if not selected_file:
+        file_path = self.viz_file_path()
+        if file_path and os.path.exists(file_path):
+            self.viz_data.request_sheet_names(file_path)
+    
+    def viz_sheet_names_loaded(self, file_path, sheet_names):
+        """Llenar el selector de hojas cuando llega la lista del archivo seleccionado"""
+        if file_path != self.viz_file_path():
             return
         
-        file_path = os.path.join(self.output_folder, selected_file)
+        self.viz_sheet_combo.blockSignals(True)
+        self.viz_sheet_combo.clear()
+        self.viz_sheet_combo.addItems(sheet_names)
+        self.viz_sheet_combo.blockSignals(False)
         
-        try:
-            if os.path.exists(file_path):
-                xls = pd.ExcelFile(file_path)
-                self.viz_sheet_combo.addItems(xls.sheet_names)
-                
-                # Seleccionar primera hoja y actualizar visualización
-                self.update_visualization()
-        except Exception as e:
-            print(f"Error al cargar hojas: {str(e)}")
+        # Seleccionar primera hoja y actualizar visualización
+        self.update_visualization()
     
     def update_visualization(self):
         """Actualizar la visualización basada en el archivo y hoja seleccionados"""
-        selected_file = self.viz_file_combo.currentText()
+        file_path = self.viz_file_path()
         selected_sheet = self.viz_sheet_combo.currentText()
         
-        if not selected_file or not selected_sheet:
+        if not file_path or not selected_sheet:
             return
         
-        file_path = os.path.join(self.output_folder, selected_file)
+        # Si la hoja está en caché, viz_sheet_loaded se ejecuta antes de volver
+        self.viz_df = None
+        self.viz_data.request_sheet(file_path, selected_sheet)
+    
+    def viz_sheet_loaded(self, file_path, sheet, df):
+        """Mostrar una hoja leída si sigue siendo la seleccionada"""
+        if file_path != self.viz_file_path() or sheet != self.viz_sheet_combo.currentText():
+            return
         
-        try:
-            # Cargar datos
-            df = pd.read_excel(file_path, sheet_name=selected_sheet)
-            
-            # Actualizar tabla
-            self.update_viz_table(df)
-            
-            # Actualizar gráfico
-            self.update_viz_chart(df)
-        except Exception as e:
-            self.chart_canvas.axes.clear()
-            self.chart_canvas.axes.text(0.5, 0.5, f"Error al cargar datos: {str(e)}", 
-                                         ha='center', va='center', fontsize=12)
-            self.chart_canvas.draw()
-            
-            # Limpiar tabla
-            self.viz_table.setRowCount(0)
-            self.viz_table.setColumnCount(0)
+        self.viz_df = df
+        
+        # Actualizar tabla
+        self.update_viz_table(df)
+        
+        # Actualizar gráfico
+        self.update_viz_chart(df)
     
-    def update_viz_table(self, df):
-        """Actualizar la tabla de visualización con los datos del DataFrame"""
-        self.viz_table.setRowCount(0)
+    def viz_load_failed(self, file_path, sheet, message):
+        """Mostrar el error de lectura del archivo u hoja seleccionados"""
+        if file_path != self.viz_file_path():
+            return
         
-        # Determinar columnas y configurar la tabla
-        if df.empty:
-            self.viz_table.setColumnCount(0)
+        if sheet is None:
+            print(f"Error al cargar hojas: {message}")
+            return
+        if sheet != self.viz_sheet_combo.currentText():
             return
         
-        columns = df.columns.tolist()
-        self.viz_table.setColumnCount(len(columns))
-        self.viz_table.setHorizontalHeaderLabels(columns)
+        self.viz_df = None
+        self.chart_canvas.axes.clear()
+        self.chart_canvas.axes.text(0.5, 0.5, f"Error al cargar datos: {message}", 
+                                     ha='center', va='center', fontsize=12)
+        self.chart_canvas.draw()
         
-        # Llenar la tabla con datos
-        for i, row in df.iterrows():
-            row_position = self.viz_table.rowCount()
-            self.viz_table.insertRow(row_position)
-            
-            for j, column in enumerate(columns):
-                value = row[column]
-                # Convertir a string para mostrar en la tabla
-                if pd.isna(value):
-                    value_str = ""
-                elif isinstance(value, (int, float)):
-                    value_str = f"{value:.4f}" if isinstance(value, float) else str(value)
-                else:
-                    value_str = str(value)
-                
-                self.viz_table.setItem(row_position, j, QTableWidgetItem(value_str))
+        # Limpiar tabla
+        self.update_viz_table(pd.DataFrame())
+    
+    def viz_busy_changed(self, busy):
+        """Mostrar u ocultar el indicador de carga"""
+        self.viz_busy_bar.setVisible(busy)
+        self.statusBar().showMessage("Cargando datos para visualización..." if busy else "Listo")
+    
+    def update_viz_chart_type(self):
+        """Redibujar el gráfico con el tipo seleccionado, sin volver a leer la hoja"""
+        if self.viz_df is not None:
+            self.update_viz_chart(self.viz_df)
+    
+    def update_viz_table(self, df):
+        """Actualizar la tabla de visualización con los datos del DataFrame"""
+        # Volver al orden original antes de cambiar los datos
+        self.viz_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.viz_model.set_dataframe(df)
+        
+        # Columnas disponibles para el filtro
+        self.viz_filter_column_combo.blockSignals(True)
+        self.viz_filter_column_combo.clear()
+        self.viz_filter_column_combo.addItem("Todas las columnas")
+        self.viz_filter_column_combo.addItems([str(column) for column in df.columns])
+        self.viz_filter_column_combo.blockSignals(False)
+        
+        self.apply_viz_filter()
+    
+    def apply_viz_filter(self):
+        """Aplicar el texto de filtro a la tabla de visualización"""
+        self.viz_filter_timer.stop()
+        column = self.viz_filter_column_combo.currentIndex() - 1
+        self.viz_proxy.set_filter(self.viz_filter_edit.text(), column if column >= 0 else None)
     
     def update_viz_chart(self, df):
         """Actualizar el gráfico de visualización basado en los datos y tipo seleccionado"""
         # Limpiar gráfico actual
+        if self.viz_plot is not None:
+            self.viz_plot.desconectar()
+            self.viz_plot = None
         self.chart_canvas.axes.clear()
         
         viz_type = self.viz_type_combo.currentText()
@@ -1042,6 +1171,10 @@ class AcousticProcessingApp(QMainWindow):
             
             print("Columnas disponibles:", df_clean.columns.tolist())
             
+            if viz_type == "Serie por intervalo":
+                self.plot_interval_series(df_clean)
+                return
+            
             # Seleccionar las columnas basadas en el tipo de visualización
             if viz_type == "Niveles acústicos diurnos":
                 fecha_col = 'Fecha_Dia'
@@ -1139,6 +1272,52 @@ class AcousticProcessingApp(QMainWindow):
                                         ha='center', va='center', fontsize=12)
             self.chart_canvas.draw()
                 
+    def plot_interval_series(self, df_clean):
+        """Graficar LASeq,i y LRASeq,i por intervalo con los promedios diurnos y nocturnos de cada día"""
+        axes = self.chart_canvas.axes
+        columnas = ['Fecha corregida', 'LASeq,i', 'LRASeq,i']
+        if any(columna not in df_clean.columns for columna in columnas):
+            axes.text(0.5, 0.5, "No se encontraron las columnas por intervalo (Fecha corregida, LASeq,i, LRASeq,i)", 
+                      ha='center', va='center', fontsize=10)
+            self.chart_canvas.draw()
+            return
+        
+        fechas = pd.to_datetime(df_clean['Fecha corregida'], errors='coerce')
+        validas = fechas.notna().to_numpy()
+        if not validas.any():
+            axes.text(0.5, 0.5, "No hay datos válidos después de procesar", 
+                      ha='center', va='center', fontsize=12)
+            self.chart_canvas.draw()
+            return
+        
+        series = {columna: pd.to_numeric(df_clean[columna], errors='coerce').to_numpy(dtype=float)[validas] 
+                  for columna in ['LASeq,i', 'LRASeq,i']}
+        
+        # Promedios energéticos diurnos y nocturnos ya calculados en la hoja (LRASeq,1d)
+        segmentos = []
+        for sufijo, periodo, color in [('Dia', 'diurno', 'orange'), ('Noche', 'nocturno', 'navy')]:
+            fecha_col, nivel_col = f'Fecha_{sufijo}', f'LRASeq,1d_{sufijo}'
+            if fecha_col in df_clean.columns and nivel_col in df_clean.columns:
+                segmentos.append(segmentos_periodo(df_clean[fecha_col], df_clean[nivel_col], periodo) 
+                                 + (f"LRASeq,1d {periodo}", color))
+        
+        self.viz_plot = IntervalSeriesPlot(axes, fechas[validas], series, segmentos)
+        
+        axes.set_title("Niveles por intervalo")
+        axes.set_xlabel("Fecha")
+        axes.set_ylabel("Nivel (dB)")
+        axes.legend()
+        
+        import matplotlib.dates as mdates
+        axes.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        plt.setp(axes.get_xticklabels(), rotation=45, ha='right')
+        axes.grid(True, linestyle='--', alpha=0.7)
+        
+        self.chart_canvas.fig.tight_layout()
+        # tight_layout cambia el ancho del eje
+        self.viz_plot.actualizar()
+        self.chart_canvas.draw()
+    
     def export_chart(self):
         """Exportar el gráfico actual como imagen"""
         file_path, _ = QFileDialog.getSaveFileName(
@@ -1147,7 +1326,14 @@ class AcousticProcessingApp(QMainWindow):
         )
         if file_path:
             try:
-                self.chart_canvas.fig.savefig(file_path, dpi=300, bbox_inches='tight')
+                # La serie por intervalo se reduce al ancho de la imagen exportada
+                if self.viz_plot is not None:
+                    self.viz_plot.actualizar(dpi=300)
+                try:
+                    self.chart_canvas.fig.savefig(file_path, dpi=300, bbox_inches='tight')
+                finally:
+                    if self.viz_plot is not None:
+                        self.viz_plot.actualizar()
                 QMessageBox.information(self, "Exportar Gráfico", "Gráfico exportado correctamente.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error al exportar el gráfico: {str(e)}")
@@ -1167,22 +1353,12 @@ class AcousticProcessingApp(QMainWindow):
         )
         if file_path:
             try:
-                # Construir DataFrame desde la tabla
-                rows = self.viz_table.rowCount()
-                cols = self.viz_table.columnCount()
-                headers = [self.viz_table.horizontalHeaderItem(i).text() for i in range(cols)]
-                
-                df = pd.DataFrame(columns=headers)
-                
-                for row in range(rows):
-                    data = {}
-                    for col in range(cols):
-                        item = self.viz_table.item(row, col)
-                        if item is not None:
-                            data[headers[col]] = item.text()
-                        else:
-                            data[headers[col]] = ""
-                    df = df.append(data, ignore_index=True)
+                # Filas visibles de la tabla, en el orden y con el filtro actuales
+                positions = [
+                    self.viz_model.posicion(self.viz_proxy.mapToSource(self.viz_proxy.index(row, 0)).row())
+                    for row in range(self.viz_proxy.rowCount())
+                ]
+                df = self.viz_model.dataframe().iloc[positions]
                 
                 # Exportar según la extensión
                 if file_path.endswith('.csv'):
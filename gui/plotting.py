@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from data.constants import HORAS_REFERENCIA
+
+
+def decimar_minmax(x, y, x_min, x_max, columnas):
+    """
+    Reduce una serie ordenada en x a los puntos que se ven en un ancho dado: en cada
+    columna de píxeles del rango visible se conservan solo el mínimo y el máximo (en su
+    orden original), así que la línea dibujada tiene la misma envolvente que la serie
+    completa; el primer punto de cada columna conserva además los cortes por NaN. Se agrega
+    un punto a cada lado del rango para que la línea llegue a los bordes.
+
+    Args:
+        x: Arreglo float creciente (por ejemplo fechas con mdates.date2num)
+        y: Arreglo float de valores (NaN = sin dato)
+        x_min: Inicio del rango visible
+        x_max: Fin del rango visible
+        columnas: Ancho del rango visible en píxeles
+
+    Returns:
+        Tupla (x, y) reducida, con a lo sumo 3 puntos por columna (el primero, el mínimo y
+        el máximo) más el último
+    """
+    inicio, fin = np.searchsorted(x, [x_min, x_max], side='left')
+    inicio, fin = max(inicio - 1, 0), min(fin + 1, len(x))
+    xs, ys = x[inicio:fin], y[inicio:fin]
+    columnas = max(int(columnas), 1)
+    if len(xs) <= 3 * columnas or xs[-1] <= xs[0]:
+        return xs, ys
+
+    grupos = np.minimum(((xs - xs[0]) / (xs[-1] - xs[0]) * columnas).astype(np.int64), columnas - 1)
+    inicios = np.r_[0, np.flatnonzero(np.diff(grupos)) + 1]
+    tamanos = np.diff(np.r_[inicios, len(xs)])
+    # Primera posición de cada columna que alcanza su mínimo o su máximo (fmin/fmax ignoran
+    # los NaN; en una columna sin valores se toma su primer punto, que es NaN)
+    indices = [inicios, [len(xs) - 1]]
+    for extremo in (np.fmin.reduceat(ys, inicios), np.fmax.reduceat(ys, inicios)):
+        alcanzado = (ys == np.repeat(extremo, tamanos)).nonzero()[0]
+        indices.append(alcanzado[np.diff(grupos[alcanzado], prepend=-1) != 0])
+    indices = np.unique(np.concatenate(indices))
+    return xs[indices], ys[indices]
+
+
+def segmentos_periodo(fechas, niveles, periodo):
+    """
+    Segmentos horizontales con el nivel de cada día sobre su período de referencia
+
+    Args:
+        fechas: Fechas de los días de medición
+        niveles: Nivel del período de cada día (por ejemplo LRASeq,1d)
+        periodo: 'diurno' o 'nocturno' (horas de HORAS_REFERENCIA; el nocturno termina al día siguiente)
+
+    Returns:
+        Tupla (x_inicio, x_fin, nivel) de arreglos en unidades de fecha de Matplotlib
+    """
+    inicio, fin = (("diurna_inicio", "diurna_fin") if periodo == "diurno" else ("nocturna_inicio", "nocturna_fin"))
+    inicio, fin = HORAS_REFERENCIA[inicio], HORAS_REFERENCIA[fin]
+    desde = inicio - inicio.normalize()
+    hasta = fin - fin.normalize() + (pd.Timedelta(days=1) if fin < inicio else pd.Timedelta(0))
+
+    dias = pd.to_datetime(pd.Series(fechas), errors='coerce').dt.normalize()
+    niveles = pd.to_numeric(pd.Series(niveles), errors='coerce')
+    validos = (dias.notna() & niveles.notna()).to_numpy()
+    dias = dias[validos]
+    return (mdates.date2num(dias + desde), mdates.date2num(dias + hasta), niveles[validos].to_numpy(dtype=float))
+
+
+class IntervalSeriesPlot:
+    """
+    Series por intervalo de una hoja PTO dibujadas sobre un eje de Matplotlib.
+
+    Cada serie se guarda completa, pero la línea solo recibe los puntos que
+    decimar_minmax conserva para el rango visible y el ancho del eje en píxeles. Al
+    hacer zoom o desplazar (xlim_changed) o al cambiar el tamaño del lienzo se vuelve a
+    reducir; el redibujado lo hace la propia barra de navigación, así que cada cuadro
+    dibuja unos miles de puntos en lugar de la serie completa. Los promedios diurnos y
+    nocturnos se dibujan una vez como segmentos fijos.
+    """
+
+    def __init__(self, axes, fechas, series, segmentos=()):
+        """
+        Args:
+            axes: Eje de Matplotlib (vacío)
+            fechas: Inicio de cada intervalo
+            series: Diccionario nombre -> valores por intervalo
+            segmentos: Lista de (x_inicio, x_fin, nivel, etiqueta, color) de segmentos_periodo
+        """
+        self.axes = axes
+        x = mdates.date2num(pd.to_datetime(pd.Series(fechas)))
+        orden = np.argsort(x, kind='stable')
+        self.x = np.asarray(x, dtype=float)[orden]
+        self.series = [(np.asarray(valores, dtype=float)[orden], axes.plot([], [], linewidth=0.8, label=nombre)[0])
+                       for nombre, valores in series.items()]
+
+        for x_inicio, x_fin, nivel, etiqueta, color in segmentos:
+            if len(nivel):
+                axes.hlines(nivel, x_inicio, x_fin, colors=color, linewidth=2, label=etiqueta)
+
+        if len(self.x):
+            axes.set_xlim(self.x[0], self.x[-1])
+        self.actualizar()
+        axes.relim()
+        axes.autoscale_view(scalex=False)
+
+        self._cid_limites = axes.callbacks.connect('xlim_changed', self._limites_cambiados)
+        self._cid_tamano = axes.figure.canvas.mpl_connect('resize_event', self._limites_cambiados)
+
+    def actualizar(self, dpi=None):
+        """
+        Vuelve a reducir las series al rango visible
+
+        Args:
+            dpi: Resolución de destino (por ejemplo al exportar); None = la del lienzo
+        """
+        x_min, x_max = sorted(self.axes.get_xlim())
+        if dpi is None:
+            ancho = self.axes.bbox.width
+        else:
+            ancho = self.axes.get_position().width * self.axes.figure.get_figwidth() * dpi
+        for y, linea in self.series:
+            linea.set_data(*decimar_minmax(self.x, y, x_min, x_max, ancho))
+
+    def _limites_cambiados(self, *args):
+        self.actualizar()
+
+    def desconectar(self):
+        """Deja de seguir el zoom y el tamaño del lienzo (antes de limpiar el eje)"""
+        self.axes.callbacks.disconnect(self._cid_limites)
+        self.axes.figure.canvas.mpl_disconnect(self._cid_tamano)
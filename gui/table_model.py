@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+
+def formatear_celda(valor):
+    """
+    Texto con que se muestra un valor en la tabla
+
+    Args:
+        valor: Valor de una celda del DataFrame
+
+    Returns:
+        '' para los vacíos, 4 decimales para los float y str() para el resto
+    """
+    if pd.isna(valor):
+        return ""
+    if isinstance(valor, float):
+        return f"{valor:.4f}"
+    return str(valor)
+
+
+def textos_columna(valores):
+    """
+    Texto mostrado de todas las celdas de una columna, formateado de forma
+    vectorizada. Da lo mismo que formatear_celda celda por celda: las columnas
+    float64 se formatean con np.char.mod, las enteras y booleanas con astype(str) y
+    el resto (columnas mixtas, fechas) celda por celda.
+
+    Args:
+        valores: Arreglo con los valores de la columna
+
+    Returns:
+        Arreglo de textos (dtype object)
+    """
+    valores = np.asarray(valores)
+    if valores.dtype == np.float64:
+        textos = np.char.mod('%.4f', valores).astype(object)
+        textos[np.isnan(valores)] = ""
+        return textos
+    if valores.dtype.kind in 'iub':
+        return valores.astype(str).astype(object)
+    return np.array([formatear_celda(valor) for valor in valores], dtype=object)
+
+
+def orden_columna(valores, descendente=False):
+    """
+    Permutación que ordena una columna de forma vectorizada. Las hojas de resultados
+    mezclan números, textos y fechas en una misma columna: se ordenan primero los
+    números, después los textos y al final las celdas vacías (también en orden
+    descendente). El orden es estable.
+
+    Args:
+        valores: Arreglo con los valores de la columna
+        descendente: Orden descendente
+
+    Returns:
+        Arreglo de posiciones de las filas en el nuevo orden
+    """
+    serie = pd.Series(valores)
+    vacios = serie.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        numeros = pd.Series(serie.to_numpy(dtype='datetime64[ns]').astype(np.int64), dtype=float)
+    else:
+        numeros = pd.to_numeric(serie, errors='coerce')
+    es_numero = numeros.notna().to_numpy() & ~vacios
+    claves = pd.DataFrame({
+        'grupo': np.select([es_numero, vacios], [0, 2], 1),
+        'numero': np.where(es_numero, numeros, 0.0),
+        'texto': np.where(es_numero | vacios, "", serie.astype(str))
+    })
+    return claves.sort_values(
+        ['grupo', 'numero', 'texto'], ascending=[True, not descendente, not descendente], kind='mergesort'
+    ).index.to_numpy()
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Modelo de solo lectura respaldado por un DataFrame para un QTableView.
+
+    No crea un elemento por celda: la vista solo pide con data() las celdas que
+    están en pantalla y el texto se formatea en ese momento, así que abrir una hoja
+    con un mes de intervalos no depende del número de filas. El orden de las filas
+    es una permutación de las posiciones del DataFrame que sort() calcula de forma
+    vectorizada con orden_columna.
+
+    Los textos de cada columna para el filtro se calculan la primera vez que se
+    piden y se guardan hasta el próximo set_dataframe.
+    """
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self._df = pd.DataFrame()
+        self._columnas = []
+        self._orden = np.arange(0)
+        self._textos = {}
+        self._busqueda = {}
+        if df is not None:
+            self.set_dataframe(df)
+
+    def set_dataframe(self, df):
+        """
+        Reemplaza los datos del modelo
+
+        Args:
+            df: DataFrame a mostrar (no se copia)
+        """
+        self.beginResetModel()
+        self._df = df
+        self._columnas = [df.iloc[:, j].to_numpy() for j in range(df.shape[1])]
+        self._orden = np.arange(len(df))
+        self._textos = {}
+        self._busqueda = {}
+        self.endResetModel()
+
+    def dataframe(self):
+        """DataFrame mostrado, en su orden original"""
+        return self._df
+
+    def posicion(self, fila):
+        """Posición en el DataFrame de una fila del modelo"""
+        return int(self._orden[fila])
+
+    def textos(self, columna):
+        """
+        Texto mostrado de todas las celdas de una columna, en el orden del DataFrame
+
+        Args:
+            columna: Número de columna
+
+        Returns:
+            Arreglo de textos
+        """
+        if columna not in self._textos:
+            self._textos[columna] = textos_columna(self._columnas[columna])
+        return self._textos[columna]
+
+    def textos_busqueda(self, columna=None):
+        """
+        Texto en mayúsculas donde busca el filtro, en el orden del DataFrame
+
+        Args:
+            columna: Número de columna, o None para las filas completas (los textos de
+                todas las columnas separados por saltos de línea, que no se pueden
+                escribir en el filtro)
+
+        Returns:
+            Serie de textos
+        """
+        if columna not in self._busqueda:
+            if columna is None:
+                columnas = [self.textos_busqueda(j).to_numpy() for j in range(len(self._columnas))]
+                filas = ['\n'.join(fila) for fila in zip(*columnas)] if columnas else [""] * len(self._df)
+                self._busqueda[None] = pd.Series(filas, dtype=object)
+            else:
+                self._busqueda[columna] = pd.Series(self.textos(columna), dtype=object).str.upper()
+        return self._busqueda[columna]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._orden)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columnas)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return formatear_celda(self._columnas[index.column()][self._orden[index.row()]])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self._df.columns[section])
+        # Número de fila original, que se conserva al ordenar o filtrar
+        return str(self._orden[section] + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Ordena las filas por una columna (column < 0 vuelve al orden original)
+
+        Args:
+            column: Número de columna
+            order: Qt.AscendingOrder o Qt.DescendingOrder
+        """
+        if column < 0 or column >= len(self._columnas):
+            orden = np.arange(len(self._df))
+        else:
+            orden = orden_columna(self._columnas[column], order == Qt.DescendingOrder)
+
+        self.layoutAboutToBeChanged.emit()
+        # Las selecciones siguen a sus filas en el nuevo orden
+        anteriores = self.persistentIndexList()
+        filas_nuevas = np.empty(len(orden), dtype=np.int64)
+        filas_nuevas[orden] = np.arange(len(orden))
+        nuevos = [self.index(int(filas_nuevas[self._orden[i.row()]]), i.column()) for i in anteriores]
+        self._orden = orden
+        self.changePersistentIndexList(anteriores, nuevos)
+        self.layoutChanged.emit()
+
+
+class DataFrameFilterProxyModel(QSortFilterProxyModel):
+    """
+    Proxy de filtrado y orden para DataFrameTableModel.
+
+    El filtro se evalúa una sola vez por texto con pandas sobre los textos que
+    DataFrameTableModel guarda (por columna o por fila completa), y filterAcceptsRow
+    solo consulta la máscara resultante. El orden se delega a
+    DataFrameTableModel.sort (vectorizado) en lugar de comparar filas de a pares.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mascara = None
+
+    def setSourceModel(self, modelo):
+        anterior = self.sourceModel()
+        if anterior is not None:
+            anterior.modelAboutToBeReset.disconnect(self._limpiar_filtro)
+        super().setSourceModel(modelo)
+        if modelo is not None:
+            modelo.modelAboutToBeReset.connect(self._limpiar_filtro)
+
+    def _limpiar_filtro(self):
+        # Con otro DataFrame la máscara anterior ya no corresponde
+        self._mascara = None
+
+    def set_filter(self, texto, columna=None):
+        """
+        Muestra solo las filas que contienen un texto (sin distinguir mayúsculas)
+
+        Args:
+            texto: Texto a buscar en el valor mostrado de las celdas ('' quita el filtro)
+            columna: Número de columna donde buscar, o None para todas
+        """
+        modelo = self.sourceModel()
+        texto = texto.strip()
+        if not texto or modelo is None:
+            self._mascara = None
+        else:
+            self._mascara = modelo.textos_busqueda(columna).str.contains(
+                texto.upper(), regex=False
+            ).to_numpy(dtype=bool)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._mascara is None or bool(self._mascara[self.sourceModel().posicion(source_row)])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        modelo = self.sourceModel()
+        if modelo is not None:
+            modelo.sort(column, order)
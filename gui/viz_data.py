@@ -0,0 +1,182 @@
+import os
+from collections import OrderedDict
+import pandas as pd
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from data.constants import VIZ_CACHE_SHEETS
+
+
+def clave_archivo(path):
+    """
+    Identifica una versión de un libro
+
+    Args:
+        path: Ruta del libro
+
+    Returns:
+        Tupla (ruta absoluta, mtime en ns); cambia cuando el libro se vuelve a escribir
+    """
+    return os.path.abspath(path), os.stat(path).st_mtime_ns
+
+
+class SheetLoadWorker(QThread):
+    """Worker que lee en segundo plano la lista de hojas de un libro o una hoja como DataFrame"""
+    finished_signal = pyqtSignal(object, object)
+    error_signal = pyqtSignal(object, str)
+
+    def __init__(self, clave, path):
+        """
+        Args:
+            clave: (ruta absoluta, mtime, hoja); hoja None para leer la lista de hojas
+            path: Ruta tal como la pidió la interfaz
+        """
+        super().__init__()
+        self.clave = clave
+        self.path = path
+
+    def run(self):
+        _, _, sheet = self.clave
+        try:
+            if sheet is None:
+                with pd.ExcelFile(self.path) as xls:
+                    resultado = list(xls.sheet_names)
+            else:
+                resultado = pd.read_excel(self.path, sheet_name=sheet)
+            self.finished_signal.emit(self.clave, resultado)
+        except Exception as e:
+            self.error_signal.emit(self.clave, str(e))
+
+
+class VisualizationDataService(QObject):
+    """
+    Datos de la pestaña de visualización, leídos en segundo plano y guardados en una
+    caché LRU en memoria.
+
+    Las hojas se guardan con clave (ruta, mtime, hoja): cambiar el tipo de gráfico o
+    volver a una estación ya vista no relee el libro, y un libro reescrito por un nuevo
+    procesamiento se vuelve a leer. Las listas de hojas se guardan con clave (ruta,
+    mtime). De cada libro solo se conserva la versión más reciente: una lectura que
+    termina tarde para una versión anterior se entrega pero no se guarda. La caché
+    solo se modifica en el hilo de la interfaz; los workers solo leen el archivo. Si
+    la hoja ya está en caché la señal se emite antes de volver.
+    """
+    sheet_names_loaded = pyqtSignal(str, object)   # ruta, lista de hojas
+    sheet_loaded = pyqtSignal(str, str, object)    # ruta, hoja, DataFrame
+    load_failed = pyqtSignal(str, object, str)     # ruta, hoja (None = lista de hojas), mensaje
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, max_sheets=VIZ_CACHE_SHEETS, parent=None):
+        """
+        Args:
+            max_sheets: Número máximo de hojas en la caché
+            parent: QObject padre
+        """
+        super().__init__(parent)
+        self.max_sheets = max_sheets
+        self._hojas = OrderedDict()
+        self._nombres = {}
+        self._workers = {}
+        self._terminando = set()
+        self.hits = 0
+        self.misses = 0
+
+    def is_busy(self):
+        """Hay alguna lectura en curso"""
+        return bool(self._workers)
+
+    def request_sheet_names(self, path):
+        """Pide la lista de hojas de un libro (señal sheet_names_loaded o load_failed)"""
+        self._solicitar(path, None)
+
+    def request_sheet(self, path, sheet):
+        """Pide una hoja como DataFrame (señal sheet_loaded o load_failed)"""
+        self._solicitar(path, sheet)
+
+    def _solicitar(self, path, sheet):
+        try:
+            clave = clave_archivo(path) + (sheet,)
+        except OSError as e:
+            self.load_failed.emit(path, sheet, str(e))
+            return
+
+        resultado = self._buscar(clave)
+        if resultado is not None:
+            self.hits += 1
+            self._emitir(path, sheet, resultado)
+            return
+        self.misses += 1
+
+        # La misma hoja ya se está leyendo: su resultado llegará por la misma señal
+        if clave in self._workers:
+            return
+        worker = SheetLoadWorker(clave, path)
+        worker.finished_signal.connect(self._lectura_terminada)
+        worker.error_signal.connect(self._lectura_fallida)
+        worker.finished.connect(self._liberar_worker)
+        self._workers[clave] = worker
+        if len(self._workers) == 1:
+            self.busy_changed.emit(True)
+        worker.start()
+
+    def _buscar(self, clave):
+        if clave[2] is None:
+            return self._nombres.get(clave[:2])
+        df = self._hojas.get(clave)
+        if df is not None:
+            self._hojas.move_to_end(clave)
+        return df
+
+    def _version_actual(self, ruta):
+        # mtime más reciente de un libro entre las hojas y las listas guardadas
+        return max(
+            [k[1] for k in self._hojas if k[0] == ruta] + [k[1] for k in self._nombres if k[0] == ruta],
+            default=None
+        )
+
+    def _guardar(self, clave, resultado):
+        ruta, mtime, sheet = clave
+        actual = self._version_actual(ruta)
+        if actual is not None and mtime < actual:
+            # Lectura tardía de una versión anterior del libro: no desplaza a la actual
+            return
+        # Solo la versión actual de cada libro
+        self._nombres = {k: v for k, v in self._nombres.items() if k[0] != ruta or k[1] >= mtime}
+        for anterior in [k for k in self._hojas if k[0] == ruta and k[1] < mtime]:
+            del self._hojas[anterior]
+        if sheet is None:
+            self._nombres[clave[:2]] = resultado
+            return
+        self._hojas[clave] = resultado
+        self._hojas.move_to_end(clave)
+        while len(self._hojas) > self.max_sheets:
+            self._hojas.popitem(last=False)
+
+    def _emitir(self, path, sheet, resultado):
+        if sheet is None:
+            self.sheet_names_loaded.emit(path, resultado)
+        else:
+            self.sheet_loaded.emit(path, sheet, resultado)
+
+    def _terminar(self, clave):
+        worker = self._workers.pop(clave, None)
+        if worker is not None:
+            # La referencia se conserva hasta que el hilo termine (señal finished)
+            self._terminando.add(worker)
+        if not self._workers:
+            self.busy_changed.emit(False)
+        return worker
+
+    def _lectura_terminada(self, clave, resultado):
+        worker = self._terminar(clave)
+        self._guardar(clave, resultado)
+        if worker is not None:
+            self._emitir(worker.path, clave[2], resultado)
+
+    def _lectura_fallida(self, clave, mensaje):
+        worker = self._terminar(clave)
+        if worker is not None:
+            self.load_failed.emit(worker.path, clave[2], mensaje)
+
+    def _liberar_worker(self):
+        worker = self.sender()
+        self._terminando.discard(worker)
+        worker.deleteLater()
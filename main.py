@@ -1,22 +1,37 @@
 import os
+import signal
 import warnings
+import traceback
+import multiprocessing
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from queue import Empty
 import pandas as pd
-from data.constants import SHEETS_TO_PROCESS, ARCHIVO_EXCEL, OUTPUT_FOLDER
+from data.constants import (
+    SHEETS_TO_PROCESS, ARCHIVO_EXCEL, OUTPUT_FOLDER, CACHE_FOLDER, CACHE_MAX_BYTES, MAX_WORKERS,
+    TEMPLATE_PATH, CONSOLIDATED_OUTPUT, STREAMING_CHUNK_ROWS, INCREMENTAL_STATE_FOLDER,
+    MET_EXCLUSION_THRESHOLDS
+)
 from utils.file_utils import combine_excel_files
+from utils.excel_session import WorkbookSession
+from utils.sheet_cache import SheetCache
+from utils.time_index import IndiceTemporal
+from utils.progress import ProgresoHoja, ProcesoCancelado
 from processing.acoustic import aplicar_Correccion
-from processing.meteorology import process_and_export_weather_data
+from processing.meteorology import process_and_export_weather_data, weather_exclusion_mask
 from processing.data_handler import (
-    cargar_datos, procesar_tercios_octava, crear_tabla_procesada, 
+    cargar_datos, cargar_datos_por_bloques, procesar_tercios_octava, crear_tabla_procesada, 
     filtrar_por_periodos, procesar_diario
 )
 from processing.statistics import generar_resumenes, calcular_estadisticos, actualizar_resumen, calcular_L_Raseq_dn
+from processing.daily_state import ruta_estado, actualizar_estado
 from processing.uncertainty_handler import calcular_incertidumbres
 from processing.compliance import (
     asignar_limites, asignar_limites_diarios, procesar_compliance_diurno, 
     procesar_compliance_nocturno, finalizar_agrupados
 )
-from export.excel import export_to_template
-from export.ruido_total import (procesar_excel_simple,combinar_excels)
+from export.excel import export_to_template, LibroConsolidado
+from export.ruido_total import (procesar_excel_simple, combinar_excels, RuidoTotal)
 
 # Configuración inicial
 warnings.filterwarnings('ignore')
@@ -25,7 +40,8 @@ pd.options.display.float_format = '{:.2f}'.format
 # Aseguramos que la carpeta de salida exista
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-def procesar_hoja(sheet, pto, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXCEL):
+def procesar_hoja(sheet, pto, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXCEL, sesion=None, exportar=True,
+                  progreso=None, output_folder=OUTPUT_FOLDER):
     """
     Procesa una hoja específica del archivo Excel
     
@@ -34,48 +50,90 @@ def procesar_hoja(sheet, pto, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXC
         pto: Número de punto para el archivo de salida
         archivo_excel: Nombre del archivo Excel
         file_path: Ruta del archivo Excel
+        sesion: WorkbookSession compartida entre hojas (opcional)
+        exportar: Si es False no se escriben PTO{pto}.xlsx ni MET{pto}.xlsx
+        progreso: ProgresoHoja opcional que recibe el avance de cada etapa y puede
+                  cancelar la hoja (lanza ProcesoCancelado)
+        output_folder: Carpeta de PTO{pto}.xlsx y MET{pto}.xlsx
         
     Returns:
-        Número de punto actualizado
+        Diccionario con 'Estacion', 'datasets' (bloques de la hoja PTO) y 'MET'
+        (datos meteorológicos y su resumen) para escribir en el libro consolidado
     """
-    # 1. Cargar datos
-    dataframes, nombres, TerciosOctava, dfASlow, dfAImpulse, Estacion = cargar_datos(archivo_excel, sheet)
+    if progreso is None:
+        progreso = ProgresoHoja(sheet)
+    
+    # 1. Cargar datos (por bloques, con ponderación, ajuste tonal y acumulación diaria de
+    # las bandas incluidos, si STREAMING_CHUNK_ROWS está definido)
+    progreso.etapa('carga')
+    bandas_diarias = None
+    if STREAMING_CHUNK_ROWS:
+        TablaProcesada, bandas_diarias, Estacion = cargar_datos_por_bloques(archivo_excel, sheet, STREAMING_CHUNK_ROWS, progreso)
+    else:
+        dataframes, nombres, TerciosOctava, dfASlow, dfAImpulse, Estacion = cargar_datos(archivo_excel, sheet, sesion)
     
     # 2. Procesar datos meteorológicos
-    MET_resultado, MET_Diurno, MET_Nocturno, resumen, MET_resumen_diurno, MET_resumen_nocturno = process_and_export_weather_data(file_path, Estacion, pto)
+    progreso.etapa('meteorologia')
+    MET_resultado, MET_Diurno, MET_Nocturno, resumen, MET_resumen_diurno, MET_resumen_nocturno = process_and_export_weather_data(file_path, Estacion, pto, sesion, exportar, output_folder)
+    
+    if bandas_diarias is None:
+        # 3. Procesar tercios de octava (ponderación A y ajuste tonal)
+        progreso.etapa('ponderacion_tonal')
+        TerciosOctava, DfAjusteTonal = procesar_tercios_octava(TerciosOctava)
+        
+        # 4. Crear tabla procesada
+        progreso.etapa('tabla')
+        TablaProcesada = crear_tabla_procesada(TerciosOctava, dfASlow, dfAImpulse, DfAjusteTonal)
+    else:
+        TerciosOctava = None
+        progreso.etapa('tabla')
     
-    # 3. Procesar tercios de octava
-    TerciosOctava, DfAjusteTonal = procesar_tercios_octava(TerciosOctava)
+    # Índice temporal de la estación (períodos, días y tipo de día), compartido por las etapas siguientes
+    indice = IndiceTemporal(TablaProcesada['Period start'])
     
-    # 4. Crear tabla procesada
-    TablaProcesada = crear_tabla_procesada(TerciosOctava, dfASlow, dfAImpulse, DfAjusteTonal)
     TablaProcesada['LRASeq,i'] = TablaProcesada.apply(aplicar_Correccion, axis=1)
     
-    # 5. Filtrar por precipitación
+    # 5. Excluir los intervalos de las horas con lluvia (u otra variable MET sobre su umbral)
     if MET_resultado is not None:
-        TablaProcesada = TablaProcesada[~TablaProcesada['Period start'].isin(
-            MET_resultado[MET_resultado['PREC'] > 0.5].index
-        )]
-    
-    # 6. Filtrar por períodos
-    diurno_ref, nocturno_ref, diurno_Total, nocturno_Total = filtrar_por_periodos(TerciosOctava, TablaProcesada)
+        excluidos, por_variable = weather_exclusion_mask(TablaProcesada['Period start'], MET_resultado)
+        if excluidos.any():
+            detalle = ", ".join(f"{var} > {MET_EXCLUSION_THRESHOLDS[var]}: {n}" for var, n in por_variable.items())
+            print(f"Exclusión meteorológica en {sheet}: {int(excluidos.sum())} intervalos descartados ({detalle})")
+        TablaProcesada = TablaProcesada[~excluidos]
     
-    # 7. Procesar datos diarios
-    DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped = procesar_diario(TablaProcesada, diurno_ref, nocturno_ref)
+    progreso.etapa('diario')
+    estado = None
+    if INCREMENTAL_STATE_FOLDER:
+        # 6-7. Incorporar solo los días nuevos al estado de la estación y derivar de él los datos diarios
+        estado = actualizar_estado(
+            ruta_estado(INCREMENTAL_STATE_FOLDER, archivo_excel, sheet), TablaProcesada, indice, TerciosOctava, bandas_diarias
+        )
+        DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped = estado.agrupados()
+    else:
+        # 6. Filtrar por períodos
+        diurno_ref, nocturno_ref, diurno_Total, nocturno_Total = filtrar_por_periodos(TerciosOctava, TablaProcesada, indice)
+        
+        # 7. Procesar datos diarios
+        DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped = procesar_diario(TablaProcesada, diurno_ref, nocturno_ref, indice, bandas_diarias)
     
     # 8. Finalizar agrupados
+    progreso.etapa('estadisticos')
     diurno_grouped, nocturno_grouped = finalizar_agrupados(diurno_grouped, nocturno_grouped, DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref)
     
-    # 9. Generar resumenes
-    resumen_diurno, resumen_nocturno = generar_resumenes(diurno_Total, nocturno_Total, diurno_grouped, nocturno_grouped)
-    
-    # 10. Calcular estadísticos
-    resultados_diurnos_df = calcular_estadisticos(resumen_diurno, diurno_Total)
-    resultados_nocturnos_df = calcular_estadisticos(resumen_nocturno, nocturno_Total)
-    
-    # 11. Actualizar resumenes
-    resumen_diurno = actualizar_resumen(resumen_diurno, resultados_diurnos_df)
-    resumen_nocturno = actualizar_resumen(resumen_nocturno, resultados_nocturnos_df)
+    if estado is not None:
+        # 9-11. Resúmenes y estadísticos a partir de las sumas acumuladas por día
+        resumen_diurno, resumen_nocturno = estado.resumenes(diurno_grouped, nocturno_grouped)
+    else:
+        # 9. Generar resumenes
+        resumen_diurno, resumen_nocturno = generar_resumenes(diurno_Total, nocturno_Total, diurno_grouped, nocturno_grouped)
+        
+        # 10. Calcular estadísticos
+        resultados_diurnos_df = calcular_estadisticos(resumen_diurno, diurno_Total)
+        resultados_nocturnos_df = calcular_estadisticos(resumen_nocturno, nocturno_Total)
+        
+        # 11. Actualizar resumenes
+        resumen_diurno = actualizar_resumen(resumen_diurno, resultados_diurnos_df)
+        resumen_nocturno = actualizar_resumen(resumen_nocturno, resultados_nocturnos_df)
     
     # 12. Calcular día-noche
     dia_noche = pd.DataFrame({
@@ -87,9 +145,11 @@ def procesar_hoja(sheet, pto, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXC
     })
     
     # 13. Calcular incertidumbres
+    progreso.etapa('incertidumbre')
     IncExp_diu, IncExp_noc = calcular_incertidumbres(resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno)
     
     # 14. Asignar límites
+    progreso.etapa('cumplimiento')
     resumen_diurno, resumen_nocturno = asignar_limites(resumen_diurno, resumen_nocturno, Estacion)
     diurno_grouped, nocturno_grouped = asignar_limites_diarios(diurno_grouped, nocturno_grouped, Estacion)
     
@@ -98,52 +158,429 @@ def procesar_hoja(sheet, pto, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXC
     resumen_nocturno, nocturno_grouped = procesar_compliance_nocturno(resumen_nocturno, nocturno_grouped, IncExp_noc)
     
     # 16. Exportar resultados
-    template_path = "Plantilla/Plantilla_Macro.xlsx"
-    output_path = f'{OUTPUT_FOLDER}/PTO{pto}.xlsx'
-    TablaProcesada=TablaProcesada.drop(columns=['Fechas'])
+    progreso.etapa('exportacion')
+    template_path = TEMPLATE_PATH
+    output_path = f'{output_folder}/PTO{pto}.xlsx'
+    TablaProcesada=TablaProcesada.drop(columns=['Fechas'], errors='ignore')
     # Eliminar filas completamente nulas de cada DataFrame
     print(diurno_grouped)
-    export_to_template(
-        TablaProcesada, 
-        diurno_grouped, 
-        nocturno_grouped, 
-        resumen_diurno, 
-        resumen_nocturno, 
-        dia_noche, 
-        template_path, 
-        output_path,
-        Estacion
+    if exportar:
+        export_to_template(
+            TablaProcesada, 
+            diurno_grouped, 
+            nocturno_grouped, 
+            resumen_diurno, 
+            resumen_nocturno, 
+            dia_noche, 
+            template_path, 
+            output_path,
+            Estacion
+        )
+    progreso.terminar()
+    
+    return {
+        "Estacion": Estacion,
+        "datasets": [TablaProcesada, diurno_grouped, nocturno_grouped, resumen_diurno, resumen_nocturno, dia_noche],
+        "MET": (MET_resultado, resumen)
+    }
+
+# Sesiones de los libros de entrada de cada proceso trabajador, cola por la que envía
+# el avance de sus etapas y evento de cancelación compartido
+SESIONES_POR_TRABAJADOR = 2
+_sesiones_trabajador = OrderedDict()
+_cola_progreso = None
+_cancelar = None
+
+def _inicializar_trabajador(cola_progreso=None, cancelar=None, ignorar_interrupcion=False):
+    """
+    Prepara un proceso trabajador
+
+    Args:
+        cola_progreso: Cola multiprocessing opcional para los EventoProgreso de las hojas
+        cancelar: Evento multiprocessing opcional que cancela las hojas en curso
+        ignorar_interrupcion: Ignorar Ctrl+C en el trabajador (la cancelación llega por el evento)
+    """
+    global _cola_progreso, _cancelar
+    _cola_progreso = cola_progreso
+    _cancelar = cancelar
+    if cola_progreso is not None:
+        # Un trabajador que termina no espera a que se lean sus avances pendientes
+        cola_progreso.cancel_join_thread()
+    if ignorar_interrupcion:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _sesion_trabajador(archivo_excel):
+    """
+    Sesión del libro en el proceso trabajador. Se conservan las SESIONES_POR_TRABAJADOR
+    usadas más recientemente (un lote puede pasar por varios libros) y se cierran las demás.
+    """
+    sesion = _sesiones_trabajador.get(archivo_excel)
+    if sesion is None:
+        sesion = WorkbookSession(archivo_excel, SheetCache(CACHE_FOLDER, CACHE_MAX_BYTES))
+        _sesiones_trabajador[archivo_excel] = sesion
+        while len(_sesiones_trabajador) > SESIONES_POR_TRABAJADOR:
+            _sesiones_trabajador.popitem(last=False)[1].close()
+    _sesiones_trabajador.move_to_end(archivo_excel)
+    return sesion
+
+def uso_cache(sesion):
+    """
+    Aciertos y fallos de caché de una sesión (WorkbookSession.cache_info), para sumar
+    los de varias hojas o procesos
+
+    Args:
+        sesion: WorkbookSession
+
+    Returns:
+        Counter con 'hits' y 'misses' de las hojas en memoria y 'disco_hits' y
+        'disco_misses' de la caché en disco
+    """
+    info = sesion.cache_info()
+    disco = info.get("disk", {})
+    return Counter(hits=info["hits"], misses=info["misses"],
+                   disco_hits=disco.get("hits", 0), disco_misses=disco.get("misses", 0))
+
+def formatear_uso_cache(uso):
+    """Texto con los aciertos y fallos de un Counter de uso_cache"""
+    return (f"Caché de hojas: {uso['misses']} lecturas, {uso['hits']} reutilizaciones; "
+            f"caché en disco: {uso['disco_hits']} aciertos, {uso['disco_misses']} fallos")
+
+def _procesar_hoja_trabajador(sheet, pto, archivo_excel, file_path, exportar, output_folder=OUTPUT_FOLDER):
+    """
+    Procesa una hoja dentro de un proceso trabajador
+
+    Returns:
+        Tupla (resultado, error, cancelada, uso): el resultado solo se devuelve si no se
+        exportó a archivos, el error es la traza si la hoja falla y uso son los aciertos
+        y fallos de caché de la hoja (uso_cache; la sesión del trabajador acumula los
+        de todas sus hojas)
+    """
+    progreso = ProgresoHoja(
+        sheet,
+        _cola_progreso.put if _cola_progreso is not None else None,
+        _cancelar.is_set if _cancelar is not None else None
     )
+    sesion = _sesion_trabajador(archivo_excel)
+    antes = uso_cache(sesion)
+    try:
+        resultado = procesar_hoja(sheet, pto, archivo_excel, file_path, sesion, exportar, progreso, output_folder)
+        salida = (None if exportar else resultado), None, False
+    except ProcesoCancelado:
+        salida = None, None, True
+    except Exception as e:
+        salida = None, f"{e}\n{traceback.format_exc()}", False
+    return salida + (uso_cache(sesion) - antes,)
+
+def procesar_en_pool(tareas, workers, registrar, cancelado, progreso_etapa=None, ignorar_interrupcion=False,
+                     uso=None):
+    """
+    Ejecuta hojas en un pool de procesos con un número máximo de procesos para todas
+
+    Args:
+        tareas: Lista de (clave, argumentos de _procesar_hoja_trabajador), en el orden de envío
+        workers: Número máximo de procesos
+        registrar: Función registrar(clave, error, resultado) para cada hoja terminada (no
+                   se llama para las canceladas); las que terminan a la vez se registran en
+                   el orden de tareas
+        cancelado: Función que devuelve True para cancelar las hojas en curso y pendientes
+        progreso_etapa: Función opcional progreso_etapa(EventoProgreso)
+        ignorar_interrupcion: Los trabajadores ignoran Ctrl+C, que se atiende en este proceso
+        uso: Counter opcional donde se suman los aciertos y fallos de caché de cada hoja
+
+    Returns:
+        True si se canceló
+    """
+    # La cola y el evento se heredan al crear los procesos (initargs), no viajan con cada tarea
+    contexto = multiprocessing.get_context()
+    cola_progreso = contexto.Queue() if progreso_etapa is not None else None
+    cancelar = contexto.Event()
+
+    def leer_avances():
+        while cola_progreso is not None:
+            try:
+                evento = cola_progreso.get_nowait()
+            except Empty:
+                return
+            progreso_etapa(evento)
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(tareas)),
+        mp_context=contexto,
+        initializer=_inicializar_trabajador,
+        initargs=(cola_progreso, cancelar, ignorar_interrupcion)
+    )
+    try:
+        futuros = {}
+        for posicion, (clave, argumentos) in enumerate(tareas):
+            futuros[executor.submit(_procesar_hoja_trabajador, *argumentos)] = (posicion, clave)
+        restantes = set(futuros)
+        # Espera con un tiempo límite para pasar los avances y atender la cancelación
+        # mientras las hojas están en curso
+        while restantes:
+            listos, restantes = wait(restantes, timeout=0.2, return_when=FIRST_COMPLETED)
+            leer_avances()
+            for futuro in sorted(listos, key=lambda f: futuros[f][0]):
+                if futuro.cancelled():
+                    continue
+                try:
+                    resultado, error, cancelada, uso_hoja = futuro.result()
+                except Exception as e:
+                    resultado, error, cancelada, uso_hoja = None, f"{e}\n{traceback.format_exc()}", False, Counter()
+                if uso is not None:
+                    uso.update(uso_hoja)
+                if not cancelada:
+                    registrar(futuros[futuro][1], error, resultado)
+            if not cancelar.is_set() and cancelado():
+                # Las hojas en curso se detienen en su siguiente comprobación; las que
+                # terminen antes (por ejemplo durante la exportación) se conservan
+                cancelar.set()
+                for futuro in restantes:
+                    futuro.cancel()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        leer_avances()
+    return cancelar.is_set()
+
+def _renumerar_salidas(asignados, procesadas, descartadas, output_folder=OUTPUT_FOLDER):
+    """
+    Deja los archivos PTO/MET con la misma numeración que una ejecución secuencial:
+    elimina las salidas parciales de las hojas fallidas o canceladas y numera las
+    correctas de forma consecutiva
+    
+    Args:
+        asignados: Diccionario hoja -> número asignado al iniciar
+        procesadas: Lista de hojas procesadas correctamente, en el orden original
+        descartadas: Hojas fallidas o sin terminar (una hoja cancelada puede haber
+                     escrito ya su MET)
+        output_folder: Carpeta de los archivos PTO/MET
+        
+    Returns:
+        Lista de tuplas (hoja, número final)
+    """
+    for sheet in descartadas:
+        for prefijo in ["PTO", "MET"]:
+            ruta = os.path.join(output_folder, f"{prefijo}{asignados[sheet]}.xlsx")
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    resultado = []
+    for numero, sheet in enumerate(procesadas, start=1):
+        if asignados[sheet] != numero:
+            for prefijo in ["PTO", "MET"]:
+                origen = os.path.join(output_folder, f"{prefijo}{asignados[sheet]}.xlsx")
+                if os.path.exists(origen):
+                    os.replace(origen, os.path.join(output_folder, f"{prefijo}{numero}.xlsx"))
+        resultado.append((sheet, numero))
+    return resultado
+
+class RegistroHojas:
+    """
+    Resultados de las hojas de un libro, que pueden terminar en cualquier orden.
+
+    Los números de punto se asignan al inicio según el orden de las hojas. Con la salida
+    consolidada cada estación se escribe en el libro consolidado (y pasa sus resúmenes a
+    RUIDO TOTAL) en cuanto terminaron todas las hojas anteriores; con la salida por
+    archivos, cerrar() deja los PTO/MET numerados como en una ejecución secuencial.
+    """
+
+    def __init__(self, sheets, consolidado=CONSOLIDATED_OUTPUT, ruido_total=None, progreso=None,
+                 output_folder=OUTPUT_FOLDER):
+        """
+        Args:
+            sheets: Lista de hojas a procesar
+            consolidado: Escribir un único libro consolidado en lugar de archivos PTO/MET
+            ruido_total: RuidoTotal opcional que recibe los resúmenes de cada estación escrita
+                         en el libro consolidado
+            progreso: Función opcional progreso(completadas, total, sheet, error)
+            output_folder: Carpeta de salida
+        """
+        self.sheets = list(sheets)
+        self.asignados = {sheet: idx for idx, sheet in enumerate(self.sheets, start=1)}
+        self.errores = {}
+        self.terminadas = set()
+        self.ruido_total = ruido_total
+        self.progreso = progreso
+        self.output_folder = output_folder
+        self.libro = None
+        if consolidado:
+            self.libro = LibroConsolidado(TEMPLATE_PATH, os.path.join(output_folder, "Excel_Intercalado.xlsx"))
+        self._pendientes = {}  # Resultados que esperan a que terminen las hojas anteriores
+        self._numeros = {}
+        self._siguiente = 0
+
+    def completo(self):
+        """Terminaron todas las hojas"""
+        return len(self.terminadas) == len(self.sheets)
+
+    def _escribir(self, sheet):
+        # Escribe las hojas PTO/MET de la estación y pasa sus resúmenes a RUIDO TOTAL
+        resultado = self._pendientes.pop(sheet)
+        self._numeros[sheet] = self.libro.agregar_estacion(resultado)
+        if self.ruido_total is not None:
+            _, _, _, resumen_diurno, resumen_nocturno, _ = resultado["datasets"]
+            self.ruido_total.agregar_estacion(
+                f"PTO{self._numeros[sheet]}", resultado["Estacion"], resumen_diurno, resumen_nocturno
+            )
+
+    def _escribir_en_orden(self):
+        # Escribe en el libro consolidado las hojas terminadas que ya tienen su turno
+        while self._siguiente < len(self.sheets) and self.sheets[self._siguiente] in self.terminadas:
+            if self.sheets[self._siguiente] in self._pendientes:
+                self._escribir(self.sheets[self._siguiente])
+            self._siguiente += 1
+
+    def registrar(self, sheet, error, resultado=None):
+        """
+        Registra una hoja terminada
+
+        Args:
+            sheet: Nombre de la hoja
+            error: Traza del error, o None si se procesó correctamente
+            resultado: Diccionario de procesar_hoja (solo con la salida consolidada)
+        """
+        self.terminadas.add(sheet)
+        if error is not None:
+            self.errores[sheet] = error
+            print(f"Error en hoja {sheet}: {error.splitlines()[0]}")
+        elif self.libro is not None:
+            self._pendientes[sheet] = resultado
+            self._escribir_en_orden()
+        if self.progreso is not None:
+            self.progreso(len(self.terminadas), len(self.sheets), sheet, error)
+
+    def cerrar(self):
+        """
+        Termina la salida: guarda el libro consolidado o renumera los archivos PTO/MET
+
+        Returns:
+            Tupla con (lista de (hoja, número de punto), diccionario hoja -> error)
+        """
+        procesadas = [sheet for sheet in self.sheets if sheet in self.terminadas and sheet not in self.errores]
+        if self.libro is None:
+            descartadas = [sheet for sheet in self.sheets if sheet not in procesadas]
+            return _renumerar_salidas(self.asignados, procesadas, descartadas, self.output_folder), self.errores
+
+        # Si se canceló, las hojas terminadas después de una pendiente aún no se han escrito
+        for sheet in procesadas:
+            if sheet in self._pendientes:
+                self._escribir(sheet)
+        self.libro.guardar()
+        return [(sheet, self._numeros[sheet]) for sheet in procesadas], self.errores
+
+def procesar_hojas(sheets, archivo_excel=ARCHIVO_EXCEL, file_path=ARCHIVO_EXCEL, workers=MAX_WORKERS,
+                   progreso=None, continuar=None, consolidado=CONSOLIDATED_OUTPUT, ruido_total=None,
+                   progreso_etapa=None, output_folder=OUTPUT_FOLDER, info_cache=None):
+    """
+    Procesa varias hojas, en paralelo con un pool de procesos si workers > 1.
+    Los números de punto se asignan al inicio según el orden de las hojas y, al terminar,
+    las salidas quedan numeradas igual que en una ejecución secuencial.
+
+    Con consolidado=True las hojas PTO y MET se escriben directamente, en el orden de
+    las hojas, en output_folder/Excel_Intercalado.xlsx y no se generan archivos por estación.
+    
+    Args:
+        sheets: Lista de hojas a procesar
+        archivo_excel: Nombre del archivo Excel
+        file_path: Ruta del archivo Excel
+        workers: Número de procesos (None usa el número de CPUs, 1 procesa en el mismo proceso)
+        progreso: Función opcional progreso(completadas, total, sheet, error) llamada al terminar cada hoja
+        continuar: Función opcional que devuelve False para cancelar; se consulta durante
+                   las etapas de cada hoja, así que también se detienen las hojas en curso
+                   (quedan sin procesar, no como error)
+        consolidado: Escribir un único libro consolidado en lugar de archivos PTO/MET
+        ruido_total: RuidoTotal opcional que recibe los resúmenes de cada estación escrita
+                     en el libro consolidado (no se usa con la salida por archivos)
+        progreso_etapa: Función opcional progreso_etapa(EventoProgreso) con el avance de las
+                        etapas de cada hoja (desde los procesos trabajadores, al menos
+                        cada ProgresoHoja.INTERVALO_REPORTE segundos por hoja)
+        output_folder: Carpeta de salida
+        info_cache: Función opcional info_cache(uso) que recibe al terminar los aciertos y
+                    fallos de caché de todas las hojas (Counter de uso_cache), que
+                    también se imprimen
+        
+    Returns:
+        Tupla con (lista de (hoja, número de punto), diccionario hoja -> error)
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_folder, exist_ok=True)
+    registro = RegistroHojas(sheets, consolidado, ruido_total, progreso, output_folder)
+
+    def cancelado():
+        return continuar is not None and not continuar()
+
+    if workers == 1 or len(sheets) <= 1:
+        with WorkbookSession(archivo_excel, SheetCache(CACHE_FOLDER, CACHE_MAX_BYTES)) as sesion:
+            for sheet in sheets:
+                if cancelado():
+                    break
+                print(f"Procesando hoja: {sheet}")
+                try:
+                    resultado = procesar_hoja(sheet, registro.asignados[sheet], archivo_excel, file_path, sesion,
+                                              not consolidado, ProgresoHoja(sheet, progreso_etapa, cancelado),
+                                              output_folder)
+                    registro.registrar(sheet, None, resultado)
+                except ProcesoCancelado:
+                    break
+                except Exception as e:
+                    registro.registrar(sheet, f"{e}\n{traceback.format_exc()}")
+            uso = uso_cache(sesion)
+    else:
+        tareas = [
+            (sheet, (sheet, registro.asignados[sheet], archivo_excel, file_path, not consolidado, output_folder))
+            for sheet in sheets
+        ]
+        # Cada trabajador tiene su sesión: se suman los aciertos y fallos de cada hoja
+        uso = Counter()
+        procesar_en_pool(tareas, workers, registro.registrar, cancelado, progreso_etapa, uso=uso)
+
+    print(formatear_uso_cache(uso))
+    if info_cache is not None:
+        info_cache(uso)
+    return registro.cerrar()
+
+def generar_ruido_total(output_folder=OUTPUT_FOLDER, ruido_total=None):
+    """
+    Genera RUIDO TOTAL.xlsx y la plantilla final de una carpeta de salida ya procesada
+
+    Args:
+        output_folder: Carpeta de salida de procesar_hojas
+        ruido_total: RuidoTotal con los resúmenes de las estaciones (salida consolidada);
+                     None combina los archivos PTO/MET y relee el libro intercalado
+
+    Returns:
+        Ruta de la plantilla final
+    """
+    # Combinar archivos Excel (con la salida consolidada el libro ya está escrito)
+    ruta_excel = os.path.join(output_folder, "Excel_Intercalado.xlsx")
+    if ruido_total is None:
+        combine_excel_files(output_folder)
+
+    # RUIDO TOTAL desde los resúmenes en memoria (o releyendo el libro con la salida por archivos)
+    if ruido_total is not None:
+        ruido_total.exportar(output_folder)
+    else:
+        procesar_excel_simple(ruta_excel, output_folder)
     
-    return pto + 1
+    # Combinar excels
+    archivo1 = os.path.join(output_folder, "RUIDO TOTAL.xlsx")
+    archivo_salida = os.path.join(output_folder, "20240723 FOM305-25 y 26 Plantilla Ruido Total (Ambiental) v1.xlsx")
+    combinar_excels(archivo1, ruta_excel, archivo_salida)
+    return archivo_salida
 
 def main():
     """Función principal que ejecuta el flujo completo de procesamiento"""
     
     archivo_excel = ARCHIVO_EXCEL
     file_path = ARCHIVO_EXCEL
-    pto = 1
-    
-    # Procesar todas las hojas
-    for sheet in SHEETS_TO_PROCESS:
-        print(f"Procesando hoja: {sheet}")
-        pto = procesar_hoja(sheet, pto, archivo_excel, file_path)
-    
-    # Combinar archivos Excel
-    combine_excel_files(OUTPUT_FOLDER)
-
-    """Función principal que ejecuta el procesamiento completo"""
-    # Configuración de rutas
-    ruta_excel = "PTOS_salida/Excel_Intercalado.xlsx"    
-    # Procesar el archivo Excel
-    dataframes = procesar_excel_simple(ruta_excel, OUTPUT_FOLDER)
     
-    # Combinar excels si se requiere
-    archivo1 = os.path.join(OUTPUT_FOLDER, "RUIDO TOTAL.xlsx")
-    archivo2 = ruta_excel
-    archivo_salida = os.path.join(OUTPUT_FOLDER, "20240723 FOM305-25 y 26 Plantilla Ruido Total (Ambiental) v1.xlsx")
+    # Procesar todas las hojas (en paralelo según MAX_WORKERS)
+    ruido_total = RuidoTotal() if CONSOLIDATED_OUTPUT else None
+    procesadas, errores = procesar_hojas(SHEETS_TO_PROCESS, archivo_excel, file_path, ruido_total=ruido_total)
+    print(f"Hojas procesadas: {len(procesadas)} de {len(SHEETS_TO_PROCESS)}")
+    for sheet, error in errores.items():
+        print(f"  {sheet}: {error.splitlines()[0]}")
     
-    combinar_excels(archivo1, archivo2, archivo_salida)
+    generar_ruido_total(OUTPUT_FOLDER, ruido_total)
     print("Proceso completado con éxito.")
 
 if __name__ == "__main__":
@@ -2,42 +2,87 @@ import numpy as np
 import pandas as pd
 from data.constants import FREQUENCIES, PONDERATION
 
-def Ponderacion_A(spectrum_k1_str, valor_entrada):
+def frecuencia_banda(spectrum_k1_str):
     """
-    Corrige el valor de entrada sumando la ponderación A correspondiente
+    Convierte la etiqueta de una banda (por ejemplo '10k' o '31.5') a Hz
     
     Args:
         spectrum_k1_str: Frecuencia en forma de string
-        valor_entrada: Valor de nivel sonoro a corregir
     
     Returns:
-        Valor corregido con ponderación A
+        Frecuencia en Hz
     """
-    # Convertir la frecuencia de la cadena (por ejemplo '10k') a Hz
+    spectrum_k1_str = str(spectrum_k1_str)
     if 'k' in spectrum_k1_str or 'K' in spectrum_k1_str:
-        frecuencia_entrada = float(spectrum_k1_str.replace('k', '').replace('K', '')) * 1000
-    else:
-        frecuencia_entrada = float(spectrum_k1_str)
+        return float(spectrum_k1_str.replace('k', '').replace('K', '')) * 1000
+    return float(spectrum_k1_str)
 
+def ponderacion_frecuencia(frecuencia_entrada):
+    """
+    Obtiene la ponderación A de la frecuencia de la tabla más cercana
+    
+    Args:
+        frecuencia_entrada: Frecuencia en Hz
+    
+    Returns:
+        Ponderación A en dB
+    """
     # Buscar el índice de la frecuencia más cercana en la tabla
     idx = np.searchsorted(FREQUENCIES, frecuencia_entrada)
 
     # Verificar si la frecuencia ingresada está fuera del rango de la tabla
     if idx == 0:
-        ponderacion = PONDERATION[0]
+        return PONDERATION[0]
     elif idx == len(FREQUENCIES):
-        ponderacion = PONDERATION[-1]
-    else:
-        # Verificar cuál es la frecuencia más cercana
-        if abs(FREQUENCIES[idx] - frecuencia_entrada) < abs(FREQUENCIES[idx - 1] - frecuencia_entrada):
-            ponderacion = PONDERATION[idx]
-        else:
-            ponderacion = PONDERATION[idx - 1]
+        return PONDERATION[-1]
+    # Verificar cuál es la frecuencia más cercana
+    if abs(FREQUENCIES[idx] - frecuencia_entrada) < abs(FREQUENCIES[idx - 1] - frecuencia_entrada):
+        return PONDERATION[idx]
+    return PONDERATION[idx - 1]
+
+def Ponderacion_A(spectrum_k1_str, valor_entrada):
+    """
+    Corrige el valor de entrada sumando la ponderación A correspondiente
+    
+    Args:
+        spectrum_k1_str: Frecuencia en forma de string
+        valor_entrada: Valor de nivel sonoro a corregir
+    
+    Returns:
+        Valor corregido con ponderación A
+    """
+    ponderacion = ponderacion_frecuencia(frecuencia_banda(spectrum_k1_str))
 
     # Sumar la ponderación al valor de entrada
     valor_corregido = valor_entrada + ponderacion
     return valor_corregido
 
+def vector_ponderacion_A(spectrum):
+    """
+    Resuelve una sola vez las etiquetas de banda a su vector de ponderaciones A
+    
+    Args:
+        spectrum: Lista de etiquetas de frecuencia de las bandas
+    
+    Returns:
+        Arreglo float64 con la ponderación de cada banda
+    """
+    return np.array([ponderacion_frecuencia(frecuencia_banda(freq)) for freq in spectrum], dtype=np.float64)
+
+def Ponderacion_A_matriz(spectrum, niveles):
+    """
+    Aplica la ponderación A a toda la matriz de tercios de octava en una operación
+    vectorial. Equivale exactamente a llamar Ponderacion_A celda por celda.
+    
+    Args:
+        spectrum: Lista de etiquetas de frecuencia (una por columna)
+        niveles: Matriz (intervalos x bandas) de niveles sonoros
+    
+    Returns:
+        Matriz float64 con los niveles ponderados
+    """
+    return np.asarray(niveles, dtype=np.float64) + vector_ponderacion_A(spectrum)
+
 def ajuste_tonal(spectrum, levels):
     """
     Calcula el ajuste tonal según la Resolución colombiana 627 de 2006.
@@ -126,6 +171,68 @@ def ajuste_tonal(spectrum, levels):
     
     return adj
 
+# Rangos de bandas de la Resolución 0627 y umbrales (3 dB, 6 dB) de cada rango
+RANGOS_AJUSTE_TONAL = ['<= 125 Hz', '>= 160 Hz & <= 400 Hz', '>= 500 Hz']
+UMBRALES_AJUSTE_TONAL = np.array([[8, 12], [5, 8], [3, 5]], dtype=np.float64)
+
+# Etiqueta de 'Bandas' para cada código de 3 bits (bit a = rango a con ajuste)
+ETIQUETAS_BANDAS = [
+    "; ".join(RANGOS_AJUSTE_TONAL[a] for a in range(3) if codigo & (1 << a)) or "No hay ajuste tonal"
+    for codigo in range(8)
+]
+
+def ajuste_tonal_matriz(spectrum, niveles):
+    """
+    Calcula el ajuste tonal de todas las filas de una matriz de tercios de octava a la vez.
+    Reproduce exactamente ajuste_tonal aplicado fila por fila.
+
+    Args:
+        spectrum: Lista de frecuencias centrales (una por columna)
+        niveles: Matriz (intervalos x bandas) de niveles ponderados
+
+    Returns:
+        Tupla con (vector KT de 0/3/6 dB, columna categórica 'Bandas')
+    """
+    niveles = np.asarray(niveles, dtype=np.float64)
+    n_filas, n_bandas = niveles.shape
+    if len(spectrum) != n_bandas:
+        raise ValueError("El número de bandas no coincide con el número de columnas")
+
+    codigos = np.zeros(n_filas, dtype=np.int8)
+    kt = np.zeros(n_filas, dtype=np.int64)
+    if n_bandas < 3:
+        return kt, pd.Categorical.from_codes(codigos, categories=ETIQUETAS_BANDAS)
+
+    # Rango (bajo/medio/alto, -1 si no aplica) de cada banda interior
+    frecuencias = np.array([frecuencia_banda(freq) for freq in spectrum[1:-1]])
+    rango = np.full(n_bandas - 2, -1)
+    rango[(frecuencias >= 20) & (frecuencias <= 125)] = 0
+    rango[(frecuencias >= 160) & (frecuencias <= 400)] = 1
+    rango[frecuencias >= 500] = 2
+    umbrales = np.where(rango[:, None] >= 0, UMBRALES_AJUSTE_TONAL[rango], np.nan)
+
+    # Diferencia de cada banda con la media de sus vecinas
+    lt = niveles[:, 1:-1]
+    ls = (niveles[:, :-2] + niveles[:, 2:]) / 2
+    l = lt - ls
+
+    nivel6 = (l > umbrales[:, 1]) & (l <= lt)
+    nivel3 = (l > umbrales[:, 0]) & (l <= umbrales[:, 1])
+
+    # Un ajuste de 3 dB solo marca su rango si ninguna banda anterior alcanzó 6 dB
+    hay6 = nivel6.any(axis=1)
+    primero6 = np.where(hay6, nivel6.argmax(axis=1), n_bandas - 2)
+    nivel3 &= np.arange(n_bandas - 2) < primero6[:, None]
+
+    kt[nivel3.any(axis=1)] = 3
+    kt[hay6] = 6
+
+    marcadas = nivel6 | nivel3
+    for a in range(3):
+        codigos |= (marcadas[:, rango == a].any(axis=1).astype(np.int8) << a)
+
+    return kt, pd.Categorical.from_codes(codigos, categories=ETIQUETAS_BANDAS)
+
 def calcular_ki(diff):
     """
     Calcula el factor de corrección KI según la diferencia entre LAIeq y LASeq
@@ -2,7 +2,111 @@ import pandas as pd
 import numpy as np
 from scipy.stats import t, norm
 from data.limits import LIMITE_0627_DIA, LIMITE_0627_NOCHE
-from processing.acoustic import calcular_declaracion, calcular_declaracion_diaria, Nivel_Eq_diaria
+from processing.acoustic import Nivel_Eq_diaria
+from utils.time_index import tipos_dia
+
+def declaracion_vectorial(nivel, Tu, Au, w):
+    """
+    Declaración de cumplimiento para arreglos completos, con la misma lógica que
+    calcular_declaracion y calcular_declaracion_diaria aplicadas fila por fila
+    
+    Args:
+        nivel: Arreglo con LRASeq_k o LRASeq_1d
+        Tu: Arreglo con los límites
+        Au: Arreglo con los límites de aceptación
+        w: Arreglo con la banda de guarda
+        
+    Returns:
+        Arreglo de textos con la declaración
+    """
+    w_positivo = w > 0
+    condiciones = [
+        w == 0,
+        w_positivo & (nivel <= Au),
+        w_positivo & (nivel <= Tu),
+        w_positivo & (nivel <= Tu + w),
+        w_positivo,
+        nivel <= Tu,
+        nivel <= Au
+    ]
+    opciones = ["—", "Pasa", "Pasa condicional", "No pasa condicional", "No pasa", "Pasa", "Pasa condicional"]
+    return np.select(condiciones, opciones, default="No pasa").astype(object)
+
+def evaluar_cumplimiento(df, columna_nivel, Au=None):
+    """
+    Calcula E, w, Au, Z, Rp*=Pc, Rc y Declaracion de todas las filas en una sola pasada,
+    con una única llamada a norm.cdf. Acepta el resumen o los datos diarios de una estación
+    o las filas de varias estaciones apiladas, porque cada fila lleva sus propios Tu, K y U.
+    
+    Args:
+        df: DataFrame con las columnas columna_nivel, Tu, K y U
+        columna_nivel: Columna con el nivel a evaluar ('LRASeq_k' o 'LRASeq_1d')
+        Au: Arreglo opcional con el límite de aceptación de cada fila (por defecto Tu - w)
+        
+    Returns:
+        DataFrame con las columnas de cumplimiento añadidas
+    """
+    nivel = df[columna_nivel].to_numpy(dtype=float)
+    Tu = pd.to_numeric(df["Tu"], errors="coerce").to_numpy(dtype=float)
+    K = df["K"].to_numpy(dtype=float)
+    U = df["U"].to_numpy(dtype=float)
+    
+    w = -U
+    with np.errstate(divide="ignore", invalid="ignore"):
+        escala = U / K
+        Z = (Tu - nivel) / escala
+        Rp = norm.cdf(nivel + escala * Z, nivel, escala)
+    
+    df["E"] = np.maximum(nivel - Tu, 0)
+    df["w"] = w
+    df["Au"] = Tu - w if Au is None else Au
+    df["Z"] = Z
+    
+    # Sin incertidumbre (U o K iguales a cero) la probabilidad no está definida
+    definida = (U != 0) & (K != 0)
+    if definida.all():
+        df["Rp*=Pc"] = Rp
+        df["Rc"] = 1 - Rp
+    else:
+        df["Rp*=Pc"] = np.where(definida, Rp.astype(object), "—")
+        df["Rc"] = np.where(definida, (1 - Rp).astype(object), "—")
+    
+    df["Declaracion"] = declaracion_vectorial(nivel, Tu, df["Au"].to_numpy(dtype=float), w)
+    return df
+
+def _procesar_compliance(resumen, grouped, IncExp):
+    """
+    Procesa el cumplimiento de un período (diurno o nocturno)
+    
+    Args:
+        resumen: DataFrame con el resumen del período
+        grouped: DataFrame con los datos diarios del período
+        IncExp: DataFrame con la incertidumbre expandida del período
+        
+    Returns:
+        Tupla con (resumen actualizado, grouped actualizado)
+    """
+    # Asignamos valores basados en `TipoDia`
+    tipo = resumen['TipoDia']
+    resumen['K'] = np.select(
+        [tipo == 'Dominical', tipo == 'Ordinario', tipo == 'Total'],
+        [IncExp['K,dom'][0], IncExp['K,Ord'][0], IncExp['K'][0]], default=np.nan
+    )
+    resumen['U'] = np.select(
+        [tipo == 'Dominical', tipo == 'Ordinario', tipo == 'Total'],
+        [IncExp['U,dom'][0], IncExp['U,Ord'][0], IncExp['U'][0]], default=np.nan
+    )
+    resumen = evaluar_cumplimiento(resumen, "LRASeq_k")
+    
+    # Los días toman K, U y Au del resumen de su tipo de día
+    dominical = (grouped['TipoDia'] == 'Dominical').to_numpy()
+    grouped['K'] = np.where(dominical, IncExp['K,dom'][0], IncExp['K,Ord'][0])
+    grouped['U'] = np.where(dominical, IncExp['U,dom'][0], IncExp['U,Ord'][0])
+    Au_tipo = dict(zip(resumen['TipoDia'], resumen['Au']))
+    Au = np.where(dominical, Au_tipo.get('Dominical', np.nan), Au_tipo.get('Ordinario', np.nan))
+    grouped = evaluar_cumplimiento(grouped, "LRASeq_1d", Au)
+    
+    return resumen, grouped
 
 def procesar_compliance_diurno(resumen_diurno, diurno_grouped, IncExp_diu):
     """
@@ -16,62 +120,7 @@ def procesar_compliance_diurno(resumen_diurno, diurno_grouped, IncExp_diu):
     Returns:
         Tupla con (resumen_diurno actualizado, diurno_grouped actualizado)
     """
-    # Asignamos valores basados en `TipoDia`
-    resumen_diurno['K'] = resumen_diurno['TipoDia'].apply(
-        lambda x: IncExp_diu['K,dom'][0] if x == 'Dominical' 
-        else IncExp_diu['K,Ord'][0] if x == 'Ordinario' 
-        else IncExp_diu['K'][0] if x == 'Total' 
-        else None
-    )
-
-    resumen_diurno['U'] = resumen_diurno['TipoDia'].apply(
-        lambda x: IncExp_diu['U,dom'][0] if x == 'Dominical' 
-        else IncExp_diu['U,Ord'][0] if x == 'Ordinario' 
-        else IncExp_diu['U'][0] if x == 'Total' 
-        else None
-    )
-
-    # Asignar valores para las columnas de resumen_diurno
-    resumen_diurno["E"] = resumen_diurno.apply(lambda row: max(row["LRASeq_k"] - row["Tu"], 0), axis=1)
-    resumen_diurno["w"] = resumen_diurno.apply(lambda row: -row['U'], axis=1)
-    resumen_diurno["Au"] = resumen_diurno.apply(lambda row: row['Tu']-row['w'], axis=1)
-    resumen_diurno["Z"] = (resumen_diurno["Tu"] - resumen_diurno["LRASeq_k"]) / (resumen_diurno["U"] / resumen_diurno["K"])
-
-    resumen_diurno["Rp*=Pc"] = resumen_diurno.apply(
-        lambda row: norm.cdf((row["LRASeq_k"] + (row["U"] / row["K"])*row["Z"]), row["LRASeq_k"], row["U"] / row["K"])
-        if row["U"] and row["K"] else "—",
-        axis=1
-    )
-    resumen_diurno["Rc"] = resumen_diurno.apply(
-        lambda row: 1-row["Rp*=Pc"] if isinstance(row["Rp*=Pc"], (int, float)) else "—",
-        axis=1
-    )
-
-    resumen_diurno["Declaracion"] = resumen_diurno.apply(calcular_declaracion, axis=1)
-    
-    # Asignamos valores para diurno_grouped basados en `tipoDia`
-    diurno_grouped['K'] = diurno_grouped['TipoDia'].apply(lambda x: IncExp_diu['K,dom'][0] if x == 'Dominical' else IncExp_diu['K,Ord'][0])
-    diurno_grouped['U'] = diurno_grouped['TipoDia'].apply(lambda x: IncExp_diu['U,dom'][0] if x == 'Dominical' else IncExp_diu['U,Ord'][0])
-    
-    # Calcular campos para diurno_grouped
-    diurno_grouped["E"] = diurno_grouped.apply(lambda row: max(row["LRASeq_1d"] - row["Tu"], 0), axis=1)
-    diurno_grouped["w"] = diurno_grouped.apply(lambda row: -row['U'], axis=1)
-    diurno_grouped['Au'] = diurno_grouped['TipoDia'].apply(lambda x: resumen_diurno.loc[resumen_diurno['TipoDia'] == 'Dominical', "Au"].values[0] if x == 'Dominical' else resumen_diurno.loc[resumen_diurno['TipoDia'] == 'Ordinario', "Au"].values[0])
-    diurno_grouped["Z"] = (diurno_grouped["Tu"] - diurno_grouped["LRASeq_1d"]) / (diurno_grouped["U"] / diurno_grouped["K"])
-    
-    # Calcular la distribución normal acumulativa (CDF)
-    diurno_grouped["Rp*=Pc"] = diurno_grouped.apply(
-        lambda row: norm.cdf((row["LRASeq_1d"] + (row["U"] / row["K"])*row["Z"]), row["LRASeq_1d"], row["U"] / row["K"])
-        if row["U"] and row["K"] else "—",
-        axis=1
-    )
-    diurno_grouped["Rc"] = diurno_grouped.apply(
-        lambda row: 1-row["Rp*=Pc"] if isinstance(row["Rp*=Pc"], (int, float)) else "—",
-        axis=1
-    )
-    diurno_grouped["Declaracion"] = diurno_grouped.apply(calcular_declaracion_diaria, axis=1)
-    
-    return resumen_diurno, diurno_grouped
+    return _procesar_compliance(resumen_diurno, diurno_grouped, IncExp_diu)
 
 def procesar_compliance_nocturno(resumen_nocturno, nocturno_grouped, IncExp_noc):
     """
@@ -85,62 +134,7 @@ def procesar_compliance_nocturno(resumen_nocturno, nocturno_grouped, IncExp_noc)
     Returns:
         Tupla con (resumen_nocturno actualizado, nocturno_grouped actualizado)
     """
-    # Asignamos valores basados en `TipoDia`
-    resumen_nocturno['K'] = resumen_nocturno['TipoDia'].apply(
-        lambda x: IncExp_noc['K,dom'][0] if x == 'Dominical' 
-        else IncExp_noc['K,Ord'][0] if x == 'Ordinario' 
-        else IncExp_noc['K'][0] if x == 'Total' 
-        else None
-    )
-
-    resumen_nocturno['U'] = resumen_nocturno['TipoDia'].apply(
-        lambda x: IncExp_noc['U,dom'][0] if x == 'Dominical' 
-        else IncExp_noc['U,Ord'][0] if x == 'Ordinario' 
-        else IncExp_noc['U'][0] if x == 'Total' 
-        else None
-    )
-
-    # Asignar valores para las columnas de resumen_nocturno
-    resumen_nocturno["E"] = resumen_nocturno.apply(lambda row: max(row["LRASeq_k"] - row["Tu"], 0), axis=1)
-    resumen_nocturno["w"] = resumen_nocturno.apply(lambda row: -row['U'], axis=1)
-    resumen_nocturno["Au"] = resumen_nocturno.apply(lambda row: row['Tu']-row['w'], axis=1)
-    resumen_nocturno["Z"] = (resumen_nocturno["Tu"] - resumen_nocturno["LRASeq_k"]) / (resumen_nocturno["U"] / resumen_nocturno["K"])
-    
-    # Calcular la distribución normal acumulativa (CDF)
-    resumen_nocturno["Rp*=Pc"] = resumen_nocturno.apply(
-        lambda row: norm.cdf((row["LRASeq_k"] + (row["U"] / row["K"])*row["Z"]), row["LRASeq_k"], row["U"] / row["K"])
-        if row["U"] and row["K"] else "—",
-        axis=1
-    )
-    resumen_nocturno["Rc"] = resumen_nocturno.apply(
-        lambda row: 1-row["Rp*=Pc"] if isinstance(row["Rp*=Pc"], (int, float)) else "—",
-        axis=1
-    )
-    resumen_nocturno["Declaracion"] = resumen_nocturno.apply(calcular_declaracion, axis=1)
-    
-    # Asignamos valores para nocturno_grouped
-    nocturno_grouped['K'] = nocturno_grouped['TipoDia'].apply(lambda x: IncExp_noc['K,dom'][0] if x == 'Dominical' else IncExp_noc['K,Ord'][0])
-    nocturno_grouped['U'] = nocturno_grouped['TipoDia'].apply(lambda x: IncExp_noc['U,dom'][0] if x == 'Dominical' else IncExp_noc['U,Ord'][0])
-    
-    # Calcular campos para nocturno_grouped
-    nocturno_grouped["E"] = nocturno_grouped.apply(lambda row: max(row["LRASeq_1d"] - row["Tu"], 0), axis=1)
-    nocturno_grouped["w"] = nocturno_grouped.apply(lambda row: -row['U'], axis=1)
-    nocturno_grouped['Au'] = nocturno_grouped['TipoDia'].apply(lambda x: resumen_nocturno.loc[resumen_nocturno['TipoDia'] == 'Dominical', "Au"].values[0] if x == 'Dominical' else resumen_nocturno.loc[resumen_nocturno['TipoDia'] == 'Ordinario', "Au"].values[0])
-    nocturno_grouped["Z"] = (nocturno_grouped["Tu"] - nocturno_grouped["LRASeq_1d"]) / (nocturno_grouped["U"] / nocturno_grouped["K"])
-    
-    # Calcular la distribución normal acumulativa (CDF)
-    nocturno_grouped["Rp*=Pc"] = nocturno_grouped.apply(
-        lambda row: norm.cdf((row["LRASeq_1d"] + (row["U"] / row["K"])*row["Z"]), row["LRASeq_1d"], row["U"] / row["K"])
-        if row["U"] and row["K"] else "—",
-        axis=1
-    )
-    nocturno_grouped["Rc"] = nocturno_grouped.apply(
-        lambda row: 1-row["Rp*=Pc"] if isinstance(row["Rp*=Pc"], (int, float)) else "—",
-        axis=1
-    )
-    nocturno_grouped["Declaracion"] = nocturno_grouped.apply(calcular_declaracion_diaria, axis=1)
-    
-    return resumen_nocturno, nocturno_grouped
+    return _procesar_compliance(resumen_nocturno, nocturno_grouped, IncExp_noc)
 
 def asignar_limites(resumen_diurno, resumen_nocturno, Estacion):
     """
@@ -205,20 +199,8 @@ def finalizar_agrupados(diurno_grouped, nocturno_grouped, DfAjusteTonal_diurno_r
     diurno_grouped['LRASeq,1d'] = diurno_grouped.apply(Nivel_Eq_diaria, axis=1)
 
     # Añadir columna TipoDia
-    import pandas as pd
-    import numpy as np
-    
-    diurno_grouped['TipoDia'] = np.where(
-        pd.to_datetime(diurno_grouped['Fechas']).dt.dayofweek == 6, 
-        'Dominical', 
-        'Ordinario'
-    )
-
-    nocturno_grouped['TipoDia'] = np.where(
-        pd.to_datetime(nocturno_grouped['Fechas']).dt.dayofweek == 6, 
-        'Dominical', 
-        'Ordinario'
-    )
+    diurno_grouped['TipoDia'] = tipos_dia(diurno_grouped['Fechas'])
+    nocturno_grouped['TipoDia'] = tipos_dia(nocturno_grouped['Fechas'])
 
     # Reorganizar columnas
     column_order = ['Fechas', 'TipoDia', 'Nm_1d', 'LASeq_1d', 'LAIeq_1d', 'KI,1d', 'KT,1d', 'Bandas', 'LRASeq_1d']
@@ -0,0 +1,242 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from processing.statistics import AcumuladorDiario, completar_resumen, estadisticos_desde_sumas, actualizar_resumen
+from processing.data_handler import (
+    COLUMNAS_NIVELES, indice_de, codigos_filas_completas, acumular_bandas, agrupados_de_bandas,
+    tablas_diarias, completar_diario
+)
+from utils.time_index import PERIODO_DIURNO, PERIODO_NOCTURNO, TIPOS_DIA, codigos_tipo_dia
+
+# Versión del formato del archivo de estado (un cambio obliga a recalcularlo)
+VERSION_ESTADO = 1
+
+def ruta_estado(carpeta, archivo_excel, sheet):
+    """
+    Ruta del archivo de estado de una estación
+
+    Args:
+        carpeta: Carpeta de los estados (INCREMENTAL_STATE_FOLDER)
+        archivo_excel: Libro de entrada (el estado es propio de cada libro mensual)
+        sheet: Nombre de la hoja EMRI
+
+    Returns:
+        Ruta del archivo .npz
+    """
+    libro = os.path.splitext(os.path.basename(archivo_excel))[0]
+    return os.path.join(carpeta, re.sub(r'[^\w\-]', '_', f"{libro}_{sheet}") + '.npz')
+
+def _filas_por_dia(dias, codigos, hasta):
+    """Número de filas de cada (período, día) anterior a hasta"""
+    filas = ((codigos == PERIODO_DIURNO) | (codigos == PERIODO_NOCTURNO)) & (dias < hasta)
+    claves, conteos = np.unique(
+        np.column_stack([codigos[filas], dias[filas]]).astype(np.int64), axis=0, return_counts=True
+    )
+    return {(int(codigo), int(dia)): int(n) for (codigo, dia), n in zip(claves, conteos)}
+
+def _promedio_energia(energia, conteo):
+    """Promedio logarítmico redondeado a 1 decimal a partir de la suma de energía y el número de valores"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.round(10 * np.log10(energia / conteo), 1)
+
+class EstadoEstacion:
+    """
+    Estado acumulado por día de una estación, para que los datos que se agregan
+    cada día no obliguen a reprocesar el mes completo.
+
+    Guarda dos AcumuladorDiario con las sumas de energía, conteos y filas de cada
+    (período, día):
+      - bandas: bandas ponderadas de todas las filas (entradas de KT,1d)
+      - niveles: LASeq, LAIeq, LRASeq y 2·LRASeq de las filas completas, de los que
+        salen Nm_1d, los promedios diarios, KI,1d, los promedios por tipo de día y
+        Σx_i y Σx_i² de x_i = 10^(0.1·LRASeq,i) para s_k²
+
+    Los resúmenes por tipo de día, s_k², s_k y, a partir de ellos, la incertidumbre y
+    el cumplimiento se derivan solo de estas sumas. Al actualizar se reprocesan
+    únicamente los días desde el último guardado (que puede estar incompleto).
+    """
+
+    def __init__(self):
+        self.bandas = AcumuladorDiario()
+        self.niveles = AcumuladorDiario(COLUMNAS_NIVELES + ['LRASeq,i^2'])
+
+    def _acumuladores(self):
+        return {'bandas': self.bandas, 'niveles': self.niveles}
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga el estado guardado de una estación
+
+        Args:
+            ruta: Archivo .npz del estado
+
+        Returns:
+            EstadoEstacion (vacío si el archivo no existe, está dañado o es de otra versión)
+        """
+        estado = cls()
+        try:
+            with np.load(ruta, allow_pickle=False) as datos:
+                if int(datos['version']) != VERSION_ESTADO:
+                    return estado
+                for nombre in estado._acumuladores():
+                    arreglos = {clave[len(nombre) + 1:]: datos[clave] for clave in datos.files if clave.startswith(nombre + '_')}
+                    setattr(estado, nombre, AcumuladorDiario.desde_arreglos(arreglos))
+        except (OSError, ValueError, KeyError):
+            return cls()
+        return estado
+
+    def guardar(self, ruta):
+        """
+        Guarda el estado con escritura atómica
+
+        Args:
+            ruta: Archivo .npz del estado
+        """
+        arreglos = {'version': np.array(VERSION_ESTADO)}
+        for nombre, acumulador in self._acumuladores().items():
+            for clave, arreglo in acumulador.a_arreglos().items():
+                arreglos[f"{nombre}_{clave}"] = arreglo
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as f:
+            np.savez(f, **arreglos)
+        os.replace(temporal, ruta)
+
+    def primer_dia_pendiente(self, TablaProcesada, indice):
+        """
+        Primer día que hay que (re)procesar: el último día guardado, que puede haber
+        quedado incompleto. Si las filas de los días anteriores ya no coinciden con las
+        guardadas (datos corregidos, otra precipitación u otro libro) se descarta el estado.
+
+        Args:
+            TablaProcesada: Tabla procesada filtrada por precipitación, con 'LRASeq,i'
+            indice: IndiceTemporal de todas las filas de la hoja
+
+        Returns:
+            Ordinal del primer día a procesar, o None para procesar todos
+        """
+        ultimo = self.bandas.ultimo_dia()
+        if ultimo is None:
+            return None
+
+        indice_tabla = indice_de(TablaProcesada, indice)
+        esperado = [
+            (self.bandas, _filas_por_dia(indice.dia, indice.periodo, ultimo)),
+            (self.niveles, _filas_por_dia(indice_tabla.dia, codigos_filas_completas(TablaProcesada, indice_tabla), ultimo))
+        ]
+        for acumulador, filas in esperado:
+            guardadas = {clave: n for clave, n in acumulador.filas_por_dia().items() if clave[1] < ultimo}
+            if guardadas != filas:
+                self.__init__()
+                return None
+        return ultimo
+
+    def actualizar(self, desde, TablaProcesada, indice, bandas_diarias):
+        """
+        Reemplaza lo acumulado desde un día con los datos nuevos
+
+        Args:
+            desde: Ordinal del primer día a reemplazar (None = todo el estado)
+            TablaProcesada: Tabla procesada filtrada por precipitación, con 'LRASeq,i'
+            indice: IndiceTemporal de todas las filas de la hoja
+            bandas_diarias: AcumuladorDiario de las bandas ponderadas con al menos los días desde 'desde'
+        """
+        if desde is None:
+            self.__init__()
+        else:
+            for acumulador in self._acumuladores().values():
+                acumulador.descartar_desde(desde)
+        self.bandas.columnas = bandas_diarias.columnas
+        self.bandas.incorporar(bandas_diarias, desde)
+
+        indice_tabla = indice_de(TablaProcesada, indice)
+        filas = slice(None) if desde is None else indice_tabla.dia >= desde
+        niveles = TablaProcesada[COLUMNAS_NIVELES].to_numpy(dtype=float)[filas]
+        dias = indice_tabla.dia[filas]
+        self.niveles.agregar(
+            dias, np.column_stack([niveles, 2 * niveles[:, 2]]), codigos_filas_completas(TablaProcesada, indice_tabla)[filas]
+        )
+
+    def agrupados(self):
+        """
+        Datos diarios a partir de lo acumulado (equivale a procesar_diario)
+
+        Returns:
+            Tupla con (DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped)
+        """
+        diurno_grouped, nocturno_grouped = (
+            grupo[['Fechas', 'Nm'] + COLUMNAS_NIVELES] for grupo in tablas_diarias(self.niveles.promedios(), self.niveles.columnas)
+        )
+        return completar_diario(diurno_grouped, nocturno_grouped, agrupados_de_bandas(self.bandas))
+
+    def resumenes(self, diurno_grouped, nocturno_grouped):
+        """
+        Resúmenes por tipo de día con s_k² y s_k a partir de lo acumulado (equivale a
+        generar_resumenes, calcular_estadisticos y actualizar_resumen)
+
+        Args:
+            diurno_grouped: DataFrame diurno de finalizar_agrupados
+            nocturno_grouped: DataFrame nocturno de finalizar_agrupados
+
+        Returns:
+            Tupla con (resumen_diurno, resumen_nocturno)
+        """
+        sumas = self.niveles.sumas()
+        resumenes = []
+        for codigo, grouped in [(PERIODO_DIURNO, diurno_grouped), (PERIODO_NOCTURNO, nocturno_grouped)]:
+            dias, energia, conteos, filas = sumas[codigo]
+            por_dia = pd.DataFrame({
+                'TipoDia': TIPOS_DIA[codigos_tipo_dia(dias)],
+                'Conteo': filas,
+                'E_LAS': energia[:, 0], 'n_LAS': conteos[:, 0],
+                'E_LAI': energia[:, 1], 'n_LAI': conteos[:, 1],
+                'n': conteos[:, 2], 'x': energia[:, 2], 'x2': energia[:, 3]
+            })
+            por_tipo = por_dia.groupby('TipoDia').sum()
+            total = por_dia.drop(columns='TipoDia').sum()
+
+            resumen = pd.DataFrame({
+                'TipoDia': por_tipo.index,
+                'Conteo': por_tipo['Conteo'].to_numpy(),
+                'LASeq_k': _promedio_energia(por_tipo['E_LAS'], por_tipo['n_LAS']).to_numpy(),
+                'LAIeq_k': _promedio_energia(por_tipo['E_LAI'], por_tipo['n_LAI']).to_numpy()
+            })
+            resumen = completar_resumen(resumen, {
+                'Conteo': int(total['Conteo']),
+                'LASeq_k': _promedio_energia(total['E_LAS'], total['n_LAS']),
+                'LAIeq_k': _promedio_energia(total['E_LAI'], total['n_LAI'])
+            }, grouped)
+
+            sumas_lineales = {tipo: (fila['n'], fila['x'], fila['x2']) for tipo, fila in por_tipo.iterrows()}
+            sumas_lineales['Total'] = (total['n'], total['x'], total['x2'])
+            resumenes.append(actualizar_resumen(resumen, estadisticos_desde_sumas(resumen, sumas_lineales)))
+        return tuple(resumenes)
+
+def actualizar_estado(ruta, TablaProcesada, indice, TerciosOctava=None, bandas_diarias=None):
+    """
+    Carga el estado de una estación, incorpora los días nuevos y lo guarda
+
+    Args:
+        ruta: Archivo .npz del estado (ruta_estado)
+        TablaProcesada: Tabla procesada filtrada por precipitación, con 'LRASeq,i'
+        indice: IndiceTemporal de todas las filas de la hoja
+        TerciosOctava: DataFrame con las bandas ponderadas (carga completa)
+        bandas_diarias: AcumuladorDiario de las bandas (carga por bloques), en lugar de TerciosOctava
+
+    Returns:
+        EstadoEstacion actualizado
+    """
+    estado = EstadoEstacion.cargar(ruta)
+    desde = estado.primer_dia_pendiente(TablaProcesada, indice)
+    if bandas_diarias is None:
+        bandas_diarias = acumular_bandas(TerciosOctava, indice, desde)
+    if desde is not None and bandas_diarias.columnas != estado.bandas.columnas:
+        # Otras bandas en la hoja: el estado guardado no sirve
+        desde = None
+        if TerciosOctava is not None:
+            bandas_diarias = acumular_bandas(TerciosOctava, indice)
+    estado.actualizar(desde, TablaProcesada, indice, bandas_diarias)
+    estado.guardar(ruta)
+    return estado
@@ -1,51 +1,105 @@
 import pandas as pd
 import numpy as np
-from data.constants import HORAS_REFERENCIA
-from utils.date_utils import corregir_fecha_hora
-from processing.acoustic import Ponderacion_A, ajuste_tonal, calcular_ki
+from openpyxl import load_workbook
+from utils.date_utils import corregir_fechas, parsear_periodos
+from utils.sheet_cache import columna_tiempo, matriz_numerica, valor_json
+from processing.acoustic import Ponderacion_A_matriz, ajuste_tonal_matriz, calcular_ki, ETIQUETAS_BANDAS
+from processing.statistics import AcumuladorDiario, promedios_logaritmicos_diarios
+from utils.time_index import IndiceTemporal, PERIODO_DIURNO, PERIODO_NOCTURNO, PERIODO_FUERA
 
-def cargar_datos(archivo_excel, sheet):
+# Columnas de la tabla procesada que se promedian por día
+COLUMNAS_NIVELES = ['LASeq,i', 'LAIeq,i', 'LRASeq,i']
+
+def leer_hoja_emri(archivo_excel, sheet, sesion=None):
     """
-    Carga los datos del archivo Excel para una hoja específica
+    Lee una hoja EMRI y la separa en encabezado, columna de tiempo y matriz numérica.
+    Si la sesión tiene caché en disco, se usa la versión ya recortada en lugar de parsear el XML.
     
     Args:
         archivo_excel: Ruta del archivo Excel
         sheet: Nombre de la hoja a procesar
+        sesion: WorkbookSession opcional
         
     Returns:
-        Tupla con (dataframes, nombres, TerciosOctava, dfASlow, dfAImpulse, Estacion)
+        Tupla con (meta, tiempos, valores)
     """
-    df = pd.read_excel(archivo_excel, sheet_name=sheet, header=None)
-    Nombres = df.iloc[6, :]
-    Estacion = df.iloc[4, 1]
+    cache = sesion.cache if sesion is not None else None
+    if cache is not None:
+        entrada = cache.get(archivo_excel, sheet)
+        if entrada is not None:
+            return entrada
 
-    # Preparar datos
-    Nombres = Nombres.dropna().reset_index(drop=True)
-    df.columns = df.iloc[8, :]
-    df = df.iloc[9:].reset_index(drop=True)
-    primera_columna = df.iloc[:, 0].rename("Period start")  
+    if sesion is not None:
+        df = sesion.parse(sheet, header=None)
+    else:
+        df = pd.read_excel(archivo_excel, sheet_name=sheet, header=None)
+
+    # Encabezado: estación (fila 4), nombres de grupos (fila 6) y columnas (fila 8)
+    meta = {
+        'estacion': valor_json(df.iloc[4, 1]),
+        'nombres': [valor_json(v) for v in df.iloc[6, :]],
+        'columnas': [valor_json(v) for v in df.iloc[8, :]]
+    }
+    cuerpo = df.iloc[9:]
+    tiempos = columna_tiempo(cuerpo.iloc[:, 0])
+    valores = matriz_numerica(cuerpo.iloc[:, 1:])
+
+    if cache is not None:
+        cache.put(archivo_excel, sheet, meta, tiempos, valores)
+    return meta, tiempos, valores
+
+def nombres_grupos(meta, n_columnas):
+    """
+    Nombres de los grupos de 5 columnas de una hoja EMRI (Slow, Impulso y bandas)
     
+    Args:
+        meta: Encabezado devuelto por leer_hoja_emri
+        n_columnas: Número de columnas de la hoja, incluida la de tiempo
+        
+    Returns:
+        Lista con un nombre por grupo ('Desconocido_<n>' si falta en el encabezado)
+    """
     # Limpiar nombres para evitar NaN
+    Nombres = pd.Series(meta['nombres'], dtype=object).dropna().reset_index(drop=True)
     Nombres = [str(n).replace("1/3 Oct", "").replace("Hz", "").strip() if pd.notna(n) else f"Desconocido_{idx}" 
             for idx, n in enumerate(Nombres)]
 
-    # Extraer dataframes por grupos de columnas
-    dataframes = []
-    nombres = []
-    j = 1  # Índice independiente para recorrer `Nombres`
-    for i in range(1, df.shape[1], 5):
-        sub_df = pd.concat([primera_columna, df.iloc[:, i:i+5]], axis=1)
-        
-        # Verificar si `j` está dentro del rango de `Nombres`
-        if j < len(Nombres):
-            nombre = Nombres[j]  # Usar índice independiente
-        else:
-            nombre = f"Desconocido_{j}"
-        
-        dataframes.append(sub_df)
-        nombres.append(nombre)
+    # El primer nombre corresponde a la columna de tiempo
+    return [Nombres[j] if j < len(Nombres) else f"Desconocido_{j}"
+            for j in range(1, len(range(1, n_columnas, 5)) + 1)]
+
+def cargar_datos(archivo_excel, sheet, sesion=None):
+    """
+    Carga los datos del archivo Excel para una hoja específica
+    
+    Args:
+        archivo_excel: Ruta del archivo Excel
+        sheet: Nombre de la hoja a procesar
+        sesion: WorkbookSession opcional para reutilizar el libro ya abierto
         
-        j += 1  # Avanzamos al siguiente nombre sin saltos
+    Returns:
+        Tupla con (dataframes, nombres, TerciosOctava, dfASlow, dfAImpulse, Estacion)
+    """
+    meta, tiempos, valores = leer_hoja_emri(archivo_excel, sheet, sesion)
+    Estacion = meta['estacion']
+
+    # Preparar datos
+    df = pd.DataFrame(valores, columns=meta['columnas'][1:])
+    df.insert(0, meta['columnas'][0], tiempos, allow_duplicates=True)
+
+    # Parsear 'Period start' una sola vez; las filas mal formadas se descartan con un aviso
+    periodos, malformadas = parsear_periodos(df.iloc[:, 0])
+    if malformadas.any():
+        filas = np.flatnonzero(malformadas)
+        print(f"Aviso: {len(filas)} filas de {sheet} con 'Period start' no válido se descartan "
+              f"(primera: fila {filas[0] + 10}, valor {df.iloc[filas[0], 0]!r})")
+        df = df.loc[~malformadas].reset_index(drop=True)
+        periodos = periodos[~malformadas]
+    primera_columna = df.iloc[:, 0].rename("Period start")  
+    
+    # Extraer dataframes por grupos de columnas
+    nombres = nombres_grupos(meta, df.shape[1])
+    dataframes = [pd.concat([primera_columna, df.iloc[:, i:i+5]], axis=1) for i in range(1, df.shape[1], 5)]
         
     # Crear TerciosOctava de manera más directa
     TerciosOctava = pd.DataFrame({
@@ -58,13 +112,158 @@ def cargar_datos(archivo_excel, sheet):
     dfASlow = dataframes[0]
     dfAImpulse = dataframes[1]
 
-    # Convertir y corregir fechas de una manera más eficiente
+    # Corregir las fechas una sola vez y compartirlas entre los tres DataFrames
+    periodos = corregir_fechas(periodos).to_numpy()
     for df_item in [TerciosOctava, dfASlow, dfAImpulse]:
-        df_item['Period start'] = pd.to_datetime(df_item['Period start'], format='%d/%m/%Y %I:%M:%S %p')
-        df_item['Period start'] = df_item['Period start'].apply(corregir_fecha_hora)
+        df_item['Period start'] = periodos
     
     return dataframes, nombres, TerciosOctava, dfASlow, dfAImpulse, Estacion
 
+def leer_hoja_emri_por_bloques(archivo_excel, sheet, filas_bloque):
+    """
+    Recorre una hoja EMRI por bloques de filas con el lector de solo lectura de
+    openpyxl, sin cargar la hoja completa en memoria
+    
+    Args:
+        archivo_excel: Ruta del archivo Excel
+        sheet: Nombre de la hoja a procesar
+        filas_bloque: Número de filas de datos por bloque
+        
+    Returns:
+        Tupla con (meta, bloques): el encabezado como en leer_hoja_emri (más 'filas', el
+        número aproximado de filas de datos o None) y un generador
+        de (tiempos, valores) por bloque, con la columna de tiempo como arreglo object
+        y la matriz numérica float64. Como en leer_hoja_emri (pandas), las filas
+        completamente vacías entre filas de datos se conservan (tiempo vacío y valores
+        NaN) y las del final de la hoja se omiten.
+    """
+    libro = load_workbook(archivo_excel, read_only=True, data_only=True)
+    try:
+        hoja = libro[sheet]
+        filas = hoja.iter_rows(values_only=True)
+        encabezado = [next(filas, ()) for _ in range(9)]
+    except Exception:
+        libro.close()
+        raise
+
+    # Encabezado: estación (fila 4), nombres de grupos (fila 6) y columnas (fila 8)
+    meta = {
+        'estacion': valor_json(encabezado[4][1]) if len(encabezado[4]) > 1 else None,
+        'nombres': [valor_json(v) for v in encabezado[6]],
+        'columnas': [valor_json(v) for v in encabezado[8]],
+        # Filas de datos según la dimensión guardada en el libro (None si no la tiene)
+        'filas': max(hoja.max_row - 9, 0) if hoja.max_row else None
+    }
+    ancho = len(meta['columnas'])
+
+    def convertir(bloque):
+        matriz = np.array(bloque, dtype=object)
+        try:
+            valores = matriz[:, 1:].astype(np.float64)
+        except (TypeError, ValueError):
+            valores = matriz_numerica(pd.DataFrame(matriz[:, 1:]))
+        return matriz[:, 0], valores
+
+    def bloques():
+        try:
+            bloque = []
+            vacias = 0  # Filas vacías pendientes: solo se agregan si después hay datos
+            for fila in filas:
+                if all(v is None for v in fila):
+                    vacias += 1
+                    continue
+                pendientes = [(None,) * ancho] * vacias + [tuple(fila[:ancho]) + (None,) * (ancho - len(fila))]
+                vacias = 0
+                for fila in pendientes:
+                    bloque.append(fila)
+                    if len(bloque) == filas_bloque:
+                        yield convertir(bloque)
+                        bloque = []
+            if bloque:
+                yield convertir(bloque)
+        finally:
+            libro.close()
+
+    return meta, bloques()
+
+def cargar_datos_por_bloques(archivo_excel, sheet, filas_bloque, progreso=None):
+    """
+    Carga una hoja EMRI por bloques y aplica a cada bloque la ponderación A, el ajuste
+    tonal y la acumulación diaria de las bandas, de modo que la matriz de tercios de
+    octava nunca está completa en memoria. Solo se conservan por intervalo las
+    columnas de la tabla procesada (LASeq, LAIeq, KT y bandas con ajuste tonal).
+    Se toma el primer estadístico de cada grupo (Leq), como en cargar_datos.
+    
+    Args:
+        archivo_excel: Ruta del archivo Excel
+        sheet: Nombre de la hoja a procesar
+        filas_bloque: Número de filas por bloque
+        progreso: ProgresoHoja opcional; recibe el avance después de cada bloque y puede
+                  cancelar la carga
+        
+    Returns:
+        Tupla con (TablaProcesada, bandas_diarias, Estacion), donde bandas_diarias es el
+        AcumuladorDiario de las bandas ponderadas que espera procesar_diario
+    """
+    meta, bloques = leer_hoja_emri_por_bloques(archivo_excel, sheet, filas_bloque)
+    spectrum_list = nombres_grupos(meta, len(meta['columnas']))[2:]
+    acumulador = AcumuladorDiario(spectrum_list)
+    partes = {'Period start': [], 'slow': [], 'impulso': [], 'kt': [], 'bandas': []}
+    descartadas, primera_descartada = 0, None
+    leidas = 0
+
+    for tiempos, valores in bloques:
+        leidas += len(tiempos)
+        # Fechas del bloque; las filas mal formadas se descartan con un aviso al final
+        periodos, malformadas = parsear_periodos(pd.Series(tiempos, dtype=object))
+        if malformadas.any():
+            if primera_descartada is None:
+                primera_descartada = tiempos[malformadas][0]
+            descartadas += int(malformadas.sum())
+            periodos, valores = periodos[~malformadas], valores[~malformadas]
+        periodos = corregir_fechas(periodos).to_numpy()
+
+        # Ponderación A y ajuste tonal del bloque
+        ponderados = Ponderacion_A_matriz(spectrum_list, valores[:, 10::5][:, :len(spectrum_list)])
+        kt, bandas = ajuste_tonal_matriz(spectrum_list, ponderados)
+
+        # Promedios diarios de las bandas: solo se guardan las sumas por día
+        indice = IndiceTemporal(periodos)
+        acumulador.agregar(indice.dia, ponderados, indice.periodo)
+
+        partes['Period start'].append(periodos)
+        partes['slow'].append(valores[:, 0])
+        partes['impulso'].append(valores[:, 5])
+        partes['kt'].append(kt)
+        partes['bandas'].append(bandas.codes)
+        if progreso is not None:
+            if meta['filas']:
+                progreso.avance(leidas / meta['filas'])
+            else:
+                progreso.verificar()
+
+    if not partes['Period start']:
+        raise ValueError(f"La hoja {sheet} no tiene filas de datos")
+    if descartadas:
+        print(f"Aviso: {descartadas} filas de {sheet} con 'Period start' no válido se descartan "
+              f"(primera con valor {primera_descartada!r})")
+
+    def unir(clave, dtype):
+        return np.concatenate(partes[clave]) if partes[clave] else np.array([], dtype=dtype)
+
+    periodos = unir('Period start', 'datetime64[ns]')
+    DfAjusteTonal = pd.DataFrame({
+        'KT,i': unir('kt', np.int64),
+        'Bandas': pd.Categorical.from_codes(unir('bandas', np.int8), categories=ETIQUETAS_BANDAS)
+    })
+    TablaProcesada = crear_tabla_procesada(
+        pd.DataFrame({'Period start': periodos}),
+        pd.DataFrame({'Period start': periodos, 'Leq': unir('slow', np.float64)}),
+        pd.DataFrame({'Period start': periodos, 'Leq': unir('impulso', np.float64)}),
+        DfAjusteTonal
+    )
+    return TablaProcesada, acumulador, meta['estacion']
+
 def procesar_tercios_octava(TerciosOctava):
     """
     Procesa los datos de tercios de octava con ponderación A
@@ -79,26 +278,17 @@ def procesar_tercios_octava(TerciosOctava):
     # Convertir spectrum a lista de strings para evitar problemas con índices
     spectrum_list = list(TerciosOctava.columns[1:])
 
-    # Usar list comprehension y procesamiento vectorial
-    resultados_Ponderados = np.array([
-        [Ponderacion_A(freq, level) for freq, level in zip(spectrum_list, row)]
-        for row in TerciosOctava.iloc[:, 1:].values
-    ])
+    # Ponderación A de toda la matriz con el vector de ponderaciones por banda
+    resultados_Ponderados = Ponderacion_A_matriz(spectrum_list, TerciosOctava.iloc[:, 1:].values)
 
     # Crear DataFrame de resultados ponderados
     resultados_df = pd.DataFrame(resultados_Ponderados, columns=spectrum_list)
     resultados_df.insert(0, 'Period start', TerciosOctava['Period start'].reset_index(drop=True))
     TerciosOctava_procesado = resultados_df
 
-    # Ajuste tonal optimizado con lista de frecuencias
-    resultados = [
-        {
-            'KT,i': ajuste_tonal(spectrum_list, row)[0],
-            'Bandas': ajuste_tonal(spectrum_list, row)[1]
-        }
-        for row in TerciosOctava_procesado.iloc[:, 1:].values
-    ]
-    DfAjusteTonal = pd.DataFrame(resultados)
+    # Ajuste tonal de todos los intervalos sobre la matriz ponderada
+    kt, bandas = ajuste_tonal_matriz(spectrum_list, resultados_Ponderados)
+    DfAjusteTonal = pd.DataFrame({'KT,i': kt, 'Bandas': bandas})
     
     return TerciosOctava_procesado, DfAjusteTonal
 
@@ -134,154 +324,233 @@ def crear_tabla_procesada(TerciosOctava, dfASlow, dfAImpulse, DfAjusteTonal):
 
     return TablaProcesada
 
-def filtrar_por_periodos(TerciosOctava, TablaProcesada):
+def indice_de(df, indice=None):
+    """
+    Índice temporal alineado con las filas de un DataFrame con 'Period start'
+    
+    Args:
+        df: DataFrame con la columna 'Period start'
+        indice: IndiceTemporal de la estación; si es None se construye a partir de df
+        
+    Returns:
+        IndiceTemporal con una entrada por fila de df
+    """
+    if indice is None:
+        return IndiceTemporal(df['Period start'])
+    return indice.para(df)
+
+def filtrar_por_periodos(TerciosOctava, TablaProcesada, indice=None):
     """
     Filtra los datos por períodos diurnos y nocturnos
     
     Args:
-        TerciosOctava: DataFrame con datos de tercios de octava
+        TerciosOctava: DataFrame con datos de tercios de octava (None si la hoja se leyó por bloques)
         TablaProcesada: DataFrame con datos procesados
+        indice: IndiceTemporal de la estación (opcional, se construye si no se da)
         
     Returns:
         Tupla con (diurno_ref, nocturno_ref, diurno_Total, nocturno_Total)
     """
-    # Definir horas de referencia
-    hora_diurna_inicio, hora_diurna_fin = HORAS_REFERENCIA["diurna_inicio"].time(), HORAS_REFERENCIA["diurna_fin"].time()
-    hora_nocturna_inicio, hora_nocturna_fin = HORAS_REFERENCIA["nocturna_inicio"].time(), HORAS_REFERENCIA["nocturna_fin"].time()
-    
-    # Filtrar tercios de octava por período
-    diurno_ref = TerciosOctava[(TerciosOctava['Period start'].dt.time >= hora_diurna_inicio) &
-                         (TerciosOctava['Period start'].dt.time <= hora_diurna_fin)]
-    nocturno_ref = TerciosOctava[(TerciosOctava['Period start'].dt.time >= hora_nocturna_inicio) |
-                           (TerciosOctava['Period start'].dt.time <= hora_nocturna_fin)]
+    # Filtrar tercios de octava por período (no hay matriz completa si la hoja se leyó por bloques)
+    diurno_ref = nocturno_ref = None
+    if TerciosOctava is not None:
+        indice_ref = indice_de(TerciosOctava, indice)
+        diurno_ref = TerciosOctava[indice_ref.mascara(PERIODO_DIURNO)]
+        nocturno_ref = TerciosOctava[indice_ref.mascara(PERIODO_NOCTURNO)]
     
-    # Filtrar datos diurnos y nocturnos para la tabla procesada
-    diurno_Total = TablaProcesada[
-        (TablaProcesada['Period start'].dt.time >= hora_diurna_inicio) &
-        (TablaProcesada['Period start'].dt.time <= hora_diurna_fin) &
-        (TablaProcesada['LASeq,i'].notna()) &
-        (TablaProcesada['LAIeq,i'].notna()) &
-        (TablaProcesada['LRASeq,i'].notna())
-    ]
-
-    nocturno_Total = TablaProcesada[
-        ((TablaProcesada['Period start'].dt.time >= hora_nocturna_inicio) |
-        (TablaProcesada['Period start'].dt.time <= hora_nocturna_fin)) &
-        (TablaProcesada['LASeq,i'].notna()) &
-        (TablaProcesada['LAIeq,i'].notna()) &
-        (TablaProcesada['LRASeq,i'].notna())
-    ]
+    # Filtrar datos diurnos y nocturnos para la tabla procesada (solo filas completas)
+    indice_tabla = indice_de(TablaProcesada, indice)
+    completas = TablaProcesada[['LASeq,i', 'LAIeq,i', 'LRASeq,i']].notna().all(axis=1).to_numpy()
+    diurna = indice_tabla.mascara(PERIODO_DIURNO) & completas
+    nocturna = indice_tabla.mascara(PERIODO_NOCTURNO) & completas
+    diurno_Total = TablaProcesada[diurna]
+    nocturno_Total = TablaProcesada[nocturna]
     
     # Añadir tipo de día
-    for df in [diurno_Total, nocturno_Total]:
-        df['TipoDia'] = np.where(df['Period start'].dt.dayofweek == 6, 'Dominical', 'Ordinario')
+    tipos = indice_tabla.tipos_dia()
+    diurno_Total['TipoDia'] = tipos[diurna]
+    nocturno_Total['TipoDia'] = tipos[nocturna]
     
     return diurno_ref, nocturno_ref, diurno_Total, nocturno_Total
 
-def procesar_diario(TablaProcesada, diurno_ref, nocturno_ref):
+def tablas_diarias(agregados, columnas):
     """
-    Procesa los datos diarios para períodos diurnos y nocturnos
+    Convierte los promedios diarios de AcumuladorDiario en DataFrames
+    
+    Args:
+        agregados: Diccionario devuelto por promedios_logaritmicos_diarios o AcumuladorDiario.promedios
+        columnas: Nombres de las columnas de niveles
+        
+    Returns:
+        Tupla con (diurno, nocturno): DataFrames con 'Fechas', el número de filas de
+        cada día ('Nm') y el promedio de cada columna
+    """
+    grupos = []
+    for codigo in (PERIODO_DIURNO, PERIODO_NOCTURNO):
+        fechas, promedios, filas = agregados[codigo]
+        grupo = pd.DataFrame(promedios, columns=columnas)
+        grupo.insert(0, 'Nm', filas.astype(np.int64))
+        grupo.insert(0, 'Fechas', pd.Series(fechas.astype(object), dtype=object))
+        grupos.append(grupo)
+    return tuple(grupos)
+
+def agrupar_diario(dias, niveles, codigos, columnas):
+    """
+    Agrupa por día los períodos diurno y nocturno con promedios logarítmicos
+    
+    Args:
+        dias: Ordinal del día de medición de cada fila (IndiceTemporal.dia)
+        niveles: Matriz (filas x columnas) de niveles en dB
+        codigos: Código de período de cada fila (IndiceTemporal.periodo)
+        columnas: Nombres de las columnas de niveles
+        
+    Returns:
+        Tupla con (diurno, nocturno): DataFrames con 'Fechas', el número de filas de
+        cada día ('Nm') y el promedio de cada columna
+    """
+    return tablas_diarias(promedios_logaritmicos_diarios(dias, niveles, codigos), columnas)
+
+def acumular_bandas(TerciosOctava, indice=None, desde=None):
+    """
+    Acumula por (período, día) las bandas ponderadas de todas las filas de referencia
+    
+    Args:
+        TerciosOctava: DataFrame con 'Period start' y las bandas ponderadas
+        indice: IndiceTemporal de la estación (opcional)
+        desde: Ordinal del primer día a acumular (None = todos)
+        
+    Returns:
+        AcumuladorDiario con las columnas de bandas
+    """
+    columnas = [col for col in TerciosOctava.columns if col not in ['Period start', 'Fechas']]
+    indice_bandas = indice_de(TerciosOctava, indice)
+    filas = slice(None) if desde is None else indice_bandas.dia >= desde
+    acumulador = AcumuladorDiario(columnas)
+    acumulador.agregar(
+        indice_bandas.dia[filas],
+        TerciosOctava[columnas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)[filas],
+        indice_bandas.periodo[filas]
+    )
+    return acumulador
+
+def agrupados_de_bandas(bandas_diarias):
+    """
+    Promedios diarios de las bandas a partir de su AcumuladorDiario
+    
+    Args:
+        bandas_diarias: AcumuladorDiario con las columnas de bandas
+        
+    Returns:
+        Tupla con (diurno_grouped_ref, nocturno_grouped_ref)
+    """
+    agrupados = tablas_diarias(bandas_diarias.promedios(), bandas_diarias.columnas)
+    return tuple(grupo.drop(columns='Nm') for grupo in agrupados)
+
+def agrupar_diario_ref(diurno_ref, nocturno_ref, indice=None):
+    """
+    Promedios diarios de todas las bandas, diurnos y nocturnos, en una sola pasada
     
     Args:
-        TablaProcesada: DataFrame con datos procesados
         diurno_ref: DataFrame con referencia diurna
         nocturno_ref: DataFrame con referencia nocturna
+        indice: IndiceTemporal de la estación (opcional)
         
     Returns:
-        Tupla con (DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped)
+        Tupla con (diurno_grouped_ref, nocturno_grouped_ref)
     """
-    # Convertir 'Period start' a datetime y crear columnas de fecha
-    for df in [TablaProcesada, diurno_ref, nocturno_ref]:
-        if 'Fechas' not in df.columns:
-            df['Fechas'] = df['Period start'].dt.date
-
     # Identificar columnas de ruido (excluyendo 'Period start' y 'Fechas')
     columnas_ruido_ref = [col for col in diurno_ref.columns if col not in ['Period start', 'Fechas']]
-    
-    # Asegurar que todas las columnas de ruido sean numéricas
-    for df in [diurno_ref, nocturno_ref]:
-        df[columnas_ruido_ref] = df[columnas_ruido_ref].apply(pd.to_numeric, errors='coerce')
 
-    from processing.statistics import promedio_logaritmico_ref
+    niveles_ref = np.vstack([
+        df[columnas_ruido_ref].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        for df in [diurno_ref, nocturno_ref]
+    ])
+    dias_ref = np.concatenate([indice_de(df, indice).dia for df in [diurno_ref, nocturno_ref]])
+    codigos_ref = np.repeat([PERIODO_DIURNO, PERIODO_NOCTURNO], [len(diurno_ref), len(nocturno_ref)])
+    agrupados = agrupar_diario(dias_ref, niveles_ref, codigos_ref, columnas_ruido_ref)
+    return tuple(grupo.drop(columns='Nm') for grupo in agrupados)
+
+def completar_diario(diurno_grouped, nocturno_grouped, agrupados_ref):
+    """
+    Ajuste tonal de los promedios diarios de las bandas y KI,1d de los promedios diarios
+    de LASeq, LAIeq y LRASeq
     
-    # Agrupar por fecha y calcular métricas
-    diurno_grouped_ref = diurno_ref.groupby('Fechas').agg(
-        {col: lambda x: promedio_logaritmico_ref(x.dropna()) for col in columnas_ruido_ref}
-    ).reset_index()
-
-    nocturno_grouped_ref = nocturno_ref.groupby('Fechas').agg(
-        {col: lambda x: promedio_logaritmico_ref(x.dropna()) for col in columnas_ruido_ref}
-    ).reset_index()
-
-    # Procesar datos diurnos y nocturnos con list comprehension
-    resultados_diurno_ref = [{
-        'KT,i': ajuste_tonal(
-            diurno_grouped_ref.columns[1:].to_list(), 
-            diurno_grouped_ref.iloc[idx, 1:].to_list()
-        )[0],
-        'Bandas': ajuste_tonal(
-            diurno_grouped_ref.columns[1:].to_list(), 
-            diurno_grouped_ref.iloc[idx, 1:].to_list()
-        )[1]
-    } for idx in range(len(diurno_grouped_ref))]
-
-    resultados_nocturno_ref = [{
-        'KT,i': ajuste_tonal(
-            nocturno_grouped_ref.columns[1:].to_list(), 
-            nocturno_grouped_ref.iloc[idx, 1:].to_list()
-        )[0],
-        'Bandas': ajuste_tonal(
-            nocturno_grouped_ref.columns[1:].to_list(), 
-            nocturno_grouped_ref.iloc[idx, 1:].to_list()
-        )[1]
-    } for idx in range(len(nocturno_grouped_ref))]
+    Args:
+        diurno_grouped: DataFrame diurno de agrupar_diario con 'Fechas', 'Nm', 'LASeq,i', 'LAIeq,i' y 'LRASeq,i'
+        nocturno_grouped: DataFrame nocturno con las mismas columnas
+        agrupados_ref: Tupla (diurno_grouped_ref, nocturno_grouped_ref) con los promedios diarios de las bandas
+        
+    Returns:
+        Tupla con (DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped)
+    """
+    diurno_grouped_ref, nocturno_grouped_ref = agrupados_ref
+
+    # Ajuste tonal de los promedios diarios sobre la matriz de bandas
+    kt_diurno, bandas_diurno = ajuste_tonal_matriz(
+        diurno_grouped_ref.columns[1:].to_list(), diurno_grouped_ref.iloc[:, 1:].values
+    )
+    kt_nocturno, bandas_nocturno = ajuste_tonal_matriz(
+        nocturno_grouped_ref.columns[1:].to_list(), nocturno_grouped_ref.iloc[:, 1:].values
+    )
 
     # Crear los DataFrames finales
-    DfAjusteTonal_diurno_ref = pd.DataFrame(resultados_diurno_ref)
-    DfAjusteTonal_nocturno_ref = pd.DataFrame(resultados_nocturno_ref)
+    DfAjusteTonal_diurno_ref = pd.DataFrame({'KT,i': kt_diurno, 'Bandas': bandas_diurno})
+    DfAjusteTonal_nocturno_ref = pd.DataFrame({'KT,i': kt_nocturno, 'Bandas': bandas_nocturno})
     
-    # Definir horas de referencia
-    hora_diurna_inicio, hora_diurna_fin = HORAS_REFERENCIA["diurna_inicio"].time(), HORAS_REFERENCIA["diurna_fin"].time()
-    hora_nocturna_inicio, hora_nocturna_fin = HORAS_REFERENCIA["nocturna_inicio"].time(), HORAS_REFERENCIA["nocturna_fin"].time()
-
-    # Filtrar horarios diurno y nocturno
-    diurno = TablaProcesada[
-        (TablaProcesada['Period start'].dt.time >= hora_diurna_inicio) &
-        (TablaProcesada['Period start'].dt.time <= hora_diurna_fin) &
-        (TablaProcesada['LASeq,i'].notna()) &
-        (TablaProcesada['LAIeq,i'].notna()) & 
-        (TablaProcesada['LRASeq,i'].notna())
-    ]
-
-    nocturno = TablaProcesada[
-        ((TablaProcesada['Period start'].dt.time >= hora_nocturna_inicio) |
-        (TablaProcesada['Period start'].dt.time <= hora_nocturna_fin)) &
-        (TablaProcesada['LASeq,i'].notna()) &
-        (TablaProcesada['LAIeq,i'].notna()) & 
-        (TablaProcesada['LRASeq,i'].notna())
-    ]
-
-    # Crear columna de fechas para agrupar
-    diurno['Fechas'] = diurno['Period start'].dt.date
-    nocturno['Fechas'] = nocturno['Period start'].dt.date
-
-    # Agrupar por fecha y calcular métricas para diurno y nocturno
-    diurno_grouped = diurno.groupby('Fechas').agg(
-        Nm_1d=('LASeq,i', 'size'),
-        LASeq_1d=('LASeq,i', lambda x: promedio_logaritmico_ref(x)),
-        LAIeq_1d=('LAIeq,i', lambda x: promedio_logaritmico_ref(x)),
-        LRASeq_1d=('LRASeq,i', lambda x: promedio_logaritmico_ref(x))
-    ).reset_index()
-
-    nocturno_grouped = nocturno.groupby('Fechas').agg(
-        Nm_1d=('LASeq,i', 'size'),
-        LASeq_1d=('LASeq,i', lambda x: promedio_logaritmico_ref(x)),
-        LAIeq_1d=('LAIeq,i', lambda x: promedio_logaritmico_ref(x)),
-        LRASeq_1d=('LRASeq,i', lambda x: promedio_logaritmico_ref(x))
-    ).reset_index()
+    nombres = {'Nm': 'Nm_1d', 'LASeq,i': 'LASeq_1d', 'LAIeq,i': 'LAIeq_1d', 'LRASeq,i': 'LRASeq_1d'}
+    diurno_grouped = diurno_grouped.rename(columns=nombres)
+    nocturno_grouped = nocturno_grouped.rename(columns=nombres)
 
     # Calcular KI,1d
     diurno_grouped['KI,1d'] = (diurno_grouped['LAIeq_1d'] - diurno_grouped['LASeq_1d']).apply(calcular_ki)
     nocturno_grouped['KI,1d'] = (nocturno_grouped['LAIeq_1d'] - nocturno_grouped['LASeq_1d']).apply(calcular_ki)
     
-    return DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped
\ No newline at end of file
+    return DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped
+
+def codigos_filas_completas(TablaProcesada, indice_tabla):
+    """
+    Código de período de cada fila de la tabla, con PERIODO_FUERA en las filas a las que
+    les falta LASeq, LAIeq o LRASeq (no entran en los promedios diarios)
+    
+    Args:
+        TablaProcesada: DataFrame con datos procesados
+        indice_tabla: IndiceTemporal alineado con TablaProcesada
+        
+    Returns:
+        Arreglo int8 con el código de período de cada fila
+    """
+    codigos = indice_tabla.periodo.copy()
+    codigos[TablaProcesada[COLUMNAS_NIVELES].isna().any(axis=1).to_numpy()] = PERIODO_FUERA
+    return codigos
+
+def procesar_diario(TablaProcesada, diurno_ref, nocturno_ref, indice=None, bandas_diarias=None):
+    """
+    Procesa los datos diarios para períodos diurnos y nocturnos
+    
+    Args:
+        TablaProcesada: DataFrame con datos procesados
+        diurno_ref: DataFrame con referencia diurna (None si se da bandas_diarias)
+        nocturno_ref: DataFrame con referencia nocturna (None si se da bandas_diarias)
+        indice: IndiceTemporal de la estación (opcional, se construye si no se da)
+        bandas_diarias: AcumuladorDiario de las bandas ya acumulado (cargar_datos_por_bloques)
+        
+    Returns:
+        Tupla con (DfAjusteTonal_diurno_ref, DfAjusteTonal_nocturno_ref, diurno_grouped, nocturno_grouped)
+    """
+    # Crear la columna de fechas del día de medición
+    indice_tabla = indice_de(TablaProcesada, indice)
+    if 'Fechas' not in TablaProcesada.columns:
+        TablaProcesada['Fechas'] = indice_tabla.fechas()
+
+    # Promedios diarios de las bandas (ya acumulados si la hoja se leyó por bloques)
+    if bandas_diarias is None:
+        agrupados_ref = agrupar_diario_ref(diurno_ref, nocturno_ref, indice)
+    else:
+        agrupados_ref = agrupados_de_bandas(bandas_diarias)
+    
+    # Promedios diarios de LASeq, LAIeq y LRASeq sobre las filas completas de cada período
+    codigos = codigos_filas_completas(TablaProcesada, indice_tabla)
+    diurno_grouped, nocturno_grouped = agrupar_diario(
+        indice_tabla.dia, TablaProcesada[COLUMNAS_NIVELES].to_numpy(dtype=float), codigos, COLUMNAS_NIVELES
+    )
+    return completar_diario(diurno_grouped, nocturno_grouped, agrupados_ref)
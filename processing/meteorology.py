@@ -1,9 +1,44 @@
 import pandas as pd
 import numpy as np
-from data.constants import ESTACIONES_MET, HORAS_REFERENCIA
-from utils.date_utils import corregir_fecha_hora
+from data.constants import ESTACIONES_MET, MET_EXCLUSION_THRESHOLDS
+from utils.date_utils import corregir_fechas, fechas_reales
+from utils.sheet_cache import columna_tiempo, matriz_numerica
+from utils.time_index import IndiceTemporal, PERIODO_DIURNO, PERIODO_NOCTURNO
 import os
 
+def read_weather_sheet(file_path, sheet_name, excel_file, cache=None):
+    """
+    Read a meteorological sheet, using the on-disk sheet cache when available
+    
+    Args:
+        file_path (str): Path to the source workbook
+        sheet_name (str): Sheet to read (TEMP, HUM, PRES or PREC)
+        excel_file: Open workbook (pd.ExcelFile or WorkbookSession)
+        cache (SheetCache): Optional on-disk cache of parsed sheets
+        
+    Returns:
+        pd.DataFrame: Sheet with stripped column names, or None if the sheet does not exist
+    """
+    if cache is not None:
+        entry = cache.get(file_path, sheet_name)
+        if entry is not None:
+            meta, tiempos, valores = entry
+            df = pd.DataFrame(valores, columns=meta['columnas'])
+            df.insert(0, 'Fecha', tiempos)
+            return df
+
+    if sheet_name not in excel_file.sheet_names:
+        return None
+
+    df = excel_file.parse(sheet_name)
+    df.columns = df.columns.str.strip()
+
+    if cache is not None and 'Fecha' in df.columns:
+        resto = df.drop(columns=['Fecha'])
+        cache.put(file_path, sheet_name, {'columnas': list(resto.columns)},
+                  columna_tiempo(df['Fecha']), matriz_numerica(resto))
+    return df
+
 def filter_by_time_range(df, start_time, end_time, is_night_range=False):
     """
     Filter DataFrame by time range, safely handling type mismatches
@@ -46,7 +81,181 @@ def filter_by_time_range(df, start_time, end_time, is_night_range=False):
         print(f"Error in time filtering: {str(e)}")
         return pd.DataFrame()
 
-def process_and_export_weather_data(file_path, Estacion, numero):
+def weather_exclusion_mask(period_start, met_df, thresholds=MET_EXCLUSION_THRESHOLDS):
+    """
+    Flag the acoustic intervals that fall in a MET hour where any variable exceeds its threshold
+    
+    Each interval is mapped to the MET row with the latest timestamp not after its start
+    (at most one MET step earlier) by a searchsorted join on the sorted MET index, so a
+    1-minute series loses the whole rainy hour and not only its top-of-hour minute.
+    Both sides arrive corrected to the measurement day (corregir_fechas), which moves
+    the times before 06:59 back one day; the join runs on the real times
+    (fechas_reales) so the 06:00 hour is not split across two days.
+    
+    Args:
+        period_start: Corrected interval start times (Series, DatetimeIndex or datetime64 array)
+        met_df (pd.DataFrame): MET data indexed by the corrected 'Fecha_Hora'
+        thresholds (dict): Variable -> threshold
+        
+    Returns:
+        tuple: (boolean array with the excluded intervals, dict variable -> intervals it excludes)
+    """
+    starts = np.asarray(fechas_reales(period_start), dtype='datetime64[ns]')
+    excluded = np.zeros(len(starts), dtype=bool)
+    variables = [var for var in thresholds if met_df is not None and var in met_df.columns]
+    counts = {var: 0 for var in variables}
+    if not variables or len(starts) == 0:
+        return excluded, counts
+
+    # Sorted MET timestamps (rows without a date never match)
+    times = np.asarray(fechas_reales(met_df.index), dtype='datetime64[ns]')
+    rows = np.flatnonzero(~np.isnat(times))
+    rows = rows[np.argsort(times[rows], kind='stable')]
+    times = times[rows]
+    if len(times) == 0:
+        return excluded, counts
+    steps = np.diff(times)
+    steps = steps[steps > np.timedelta64(0, 'ns')]
+    step = np.median(steps) if len(steps) else np.timedelta64(1, 'h')
+
+    # MET row of each interval: latest timestamp <= start, less than one step before it
+    pos = np.searchsorted(times, starts, side='right') - 1
+    matched = (pos >= 0) & ~np.isnat(starts)
+    matched[matched] = (starts[matched] - times[pos[matched]]) < step
+    pos = pos[matched]
+
+    for var in variables:
+        values = pd.to_numeric(met_df[var], errors='coerce').to_numpy(dtype=float)[rows]
+        hits = np.zeros(len(starts), dtype=bool)
+        hits[matched] = values[pos] > thresholds[var]
+        counts[var] = int(hits.sum())
+        excluded |= hits
+    return excluded, counts
+
+class WeatherStore:
+    """
+    Meteorological data of one workbook, parsed once and shared by every EMRI point.
+
+    Each MET sheet (TEMP, HUM, PRES, PREC and any extra exclusion variable) is read
+    once, with its corrected 'Fecha' column. The 'Fecha_Hora'-indexed frame of each
+    physical station and its full/day/night summaries are built on first request
+    and memoized, so EMRI points that share a station (ESTACIONES_MET) reuse them.
+    The memoized frames are shared: callers must not modify them.
+    """
+
+    def __init__(self, file_path, excel_file=None, cache=None):
+        """
+        Args:
+            file_path (str): Path to the source workbook
+            excel_file: Open workbook (pd.ExcelFile or WorkbookSession); opened on first use if None
+            cache (SheetCache): Optional on-disk cache of parsed sheets
+        """
+        self.file_path = file_path
+        self.excel_file = excel_file
+        self.cache = cache
+        self._sheets = None
+        self._stations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def sheets(self):
+        """
+        MET sheets of the workbook, parsed on first use
+
+        Returns:
+            dict: Sheet name -> (corrected 'Fecha' values, DataFrame) for the sheets present
+        """
+        if self._sheets is None:
+            if self.excel_file is None:
+                self.excel_file = pd.ExcelFile(self.file_path)
+            sheet_names = ['TEMP', 'HUM', 'PRES', 'PREC']
+            sheet_names += [var for var in MET_EXCLUSION_THRESHOLDS if var not in sheet_names]
+            self._sheets = {}
+            for sheet_name in sheet_names:
+                df = read_weather_sheet(self.file_path, sheet_name, self.excel_file, self.cache)
+                if df is not None:
+                    fechas = corregir_fechas(pd.to_datetime(df['Fecha'], errors='coerce')) if 'Fecha' in df.columns else None
+                    self._sheets[sheet_name] = (fechas, df)
+        return self._sheets
+
+    def station_data(self, station_column_name):
+        """
+        Frame and summaries of a physical MET station, built once
+
+        Args:
+            station_column_name (str): Station name as it appears in the MET column headers
+
+        Returns:
+            tuple: (final_df, MET_Diurno, MET_Nocturno, summary_df, diurno_summary_df,
+            nocturno_summary_df), or None if no sheet has a column for the station
+        """
+        if station_column_name in self._stations:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._stations[station_column_name] = self._build_station(station_column_name)
+        return self._stations[station_column_name]
+
+    def _build_station(self, station_column_name):
+        final_df = None
+        for sheet_name, (fechas, df) in self.sheets().items():
+            matching_columns = [col for col in df.columns if station_column_name in col]
+
+            if matching_columns:
+                if final_df is None:
+                    final_df = pd.DataFrame({'Fecha_Hora': fechas})
+                final_df[sheet_name] = df[matching_columns[0]].values
+            else:
+                print(f"No se encontró columna para {sheet_name} con estación {station_column_name}")
+
+        if final_df is None or final_df.empty:
+            return None
+
+        final_df.set_index('Fecha_Hora', inplace=True)
+
+        # Day and night rows from the station time index (rows without a date are excluded)
+        indice = IndiceTemporal(final_df.index)
+        MET_Diurno = final_df.loc[indice.mascara(PERIODO_DIURNO)]
+        MET_Nocturno = final_df.loc[indice.mascara(PERIODO_NOCTURNO)]
+
+        return (final_df, MET_Diurno, MET_Nocturno, summarize_weather(final_df),
+                summarize_weather(MET_Diurno), summarize_weather(MET_Nocturno))
+
+def summarize_weather(df):
+    """
+    MAX, MIN and range of each meteorological variable
+    
+    Args:
+        df (pd.DataFrame): MET data (may be empty)
+        
+    Returns:
+        pd.DataFrame: One row per variable with 'Variable', 'MAX', 'MIN' and '∆'
+    """
+    return pd.DataFrame([{ 
+        'Variable': col, 
+        'MAX': df[col].max() if not df.empty else np.nan, 
+        'MIN': df[col].min() if not df.empty else np.nan,
+        '∆': (df[col].max() - df[col].min()) if not df.empty else np.nan
+    } for col in df.columns])
+
+def weather_store(file_path, sesion=None):
+    """
+    Meteorological store of a workbook
+    
+    Args:
+        file_path (str): Path to the source workbook
+        sesion: Optional WorkbookSession; its store is created on first use and reused
+        
+    Returns:
+        WeatherStore: The session store, or a new store when there is no session
+    """
+    if sesion is None:
+        return WeatherStore(file_path)
+    if sesion.weather_store is None or sesion.weather_store.file_path != file_path:
+        sesion.weather_store = WeatherStore(file_path, sesion, sesion.cache)
+    return sesion.weather_store
+
+def process_and_export_weather_data(file_path, Estacion, numero, sesion=None, exportar=True, output_dir='PTOS_salida'):
     """
     Procesa y exporta datos meteorológicos para una estación específica
     
@@ -54,6 +263,9 @@ def process_and_export_weather_data(file_path, Estacion, numero):
         file_path: Ruta al archivo Excel con datos meteorológicos
         Estacion: Código de la estación a procesar
         numero: Número para el archivo de salida
+        sesion: WorkbookSession opcional para no volver a parsear las hojas MET
+        exportar: Si es False no se escribe MET{numero}.xlsx (la hoja se escribe en el libro consolidado)
+        output_dir: Carpeta de MET{numero}.xlsx
         
     Returns:
         Tuple con DataFrames de resultados meteorológicos
@@ -83,93 +295,45 @@ def process_and_export_weather_data(file_path, Estacion, numero):
                                      'MIN': [np.nan]*4, 
                                      '∆': [np.nan]*4})
         
-        # Create output directory if it doesn't exist
-        output_dir = 'PTOS_salida'
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"Created directory: {output_dir}")
-        
-        output_file = f'{output_dir}/MET{numero}.xlsx'
-        
-        # Export empty dataframes
-        with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-            empty_df.to_excel(writer, sheet_name='MET', index=True, startcol=0)
-            empty_summary.to_excel(writer, sheet_name='MET', index=False, startcol=empty_df.shape[1] + 2)
+        if exportar:
+            # Create output directory if it doesn't exist
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+                print(f"Created directory: {output_dir}")
             
-        print(f"SDA station: Empty data exported to {output_file}")
+            output_file = f'{output_dir}/MET{numero}.xlsx'
+            
+            # Export empty dataframes
+            with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+                empty_df.to_excel(writer, sheet_name='MET', index=True, startcol=0)
+                empty_summary.to_excel(writer, sheet_name='MET', index=False, startcol=empty_df.shape[1] + 2)
+                
+            print(f"SDA station: Empty data exported to {output_file}")
         return empty_df, empty_df, empty_df, empty_summary, empty_summary, empty_summary
     
-    # Normal processing for regular stations
+    # Normal processing for regular stations: the MET sheets are parsed once per workbook
+    # and each physical station is built once, whatever the number of EMRI points using it
     try:
-        excel_file = pd.ExcelFile(file_path)
-        final_df = None
-
-        for sheet_name in ['TEMP', 'HUM', 'PRES', 'PREC']:
-            if sheet_name in excel_file.sheet_names:
-                df = excel_file.parse(sheet_name)
-                df.columns = df.columns.str.strip()
-                matching_columns = [col for col in df.columns if station_column_name in col]
-
-                if matching_columns:
-                    if final_df is None:
-                        final_df = pd.DataFrame({'Fecha_Hora': pd.to_datetime(df['Fecha'], errors='coerce')})
-                        final_df['Fecha_Hora'] = final_df['Fecha_Hora'].apply(corregir_fecha_hora)
-                    final_df[sheet_name] = df[matching_columns[0]].values
-                else:
-                    print(f"No se encontró columna para {sheet_name} con estación {station_column_name}")
-
-        if final_df is None or final_df.empty:
+        station_data = weather_store(file_path, sesion).station_data(station_column_name)
+        if station_data is None:
             print(f"No se encontraron datos para la estación '{Estacion}'")
             return None, None, None, None, None, None
 
-        final_df.set_index('Fecha_Hora', inplace=True)
-
-        # Use the safe filtering function instead of direct comparison
-        MET_Diurno = filter_by_time_range(final_df, 
-                                        HORAS_REFERENCIA["diurna_inicio"].time(), 
-                                        HORAS_REFERENCIA["diurna_fin"].time(), 
-                                        is_night_range=False)
-        
-        MET_Nocturno = filter_by_time_range(final_df, 
-                                          HORAS_REFERENCIA["nocturna_inicio"].time(), 
-                                          HORAS_REFERENCIA["nocturna_fin"].time(), 
-                                          is_night_range=True)
-
-        # Safe calculation of statistics with empty dataframe handling
-        summary_df = pd.DataFrame([{ 
-            'Variable': col, 
-            'MAX': final_df[col].max(), 
-            'MIN': final_df[col].min(),
-            '∆': final_df[col].max() - final_df[col].min()
-        } for col in final_df.columns])
-        
-        diurno_summary_df = pd.DataFrame([{ 
-            'Variable': col, 
-            'MAX': MET_Diurno[col].max() if not MET_Diurno.empty else np.nan, 
-            'MIN': MET_Diurno[col].min() if not MET_Diurno.empty else np.nan,
-            '∆': (MET_Diurno[col].max() - MET_Diurno[col].min()) if not MET_Diurno.empty else np.nan
-        } for col in MET_Diurno.columns])
-        
-        nocturno_summary_df = pd.DataFrame([{ 
-            'Variable': col, 
-            'MAX': MET_Nocturno[col].max() if not MET_Nocturno.empty else np.nan, 
-            'MIN': MET_Nocturno[col].min() if not MET_Nocturno.empty else np.nan,
-            '∆': (MET_Nocturno[col].max() - MET_Nocturno[col].min()) if not MET_Nocturno.empty else np.nan
-        } for col in MET_Nocturno.columns])
+        final_df, MET_Diurno, MET_Nocturno, summary_df, diurno_summary_df, nocturno_summary_df = station_data
         
-        # Create output directory if it doesn't exist
-        output_dir = 'PTOS_salida'
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"Created directory: {output_dir}")
-        
-        output_file = f'{output_dir}/MET{numero}.xlsx'
-        
-        with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-            final_df.to_excel(writer, sheet_name='MET', index=True, startcol=0)
-            summary_df.to_excel(writer, sheet_name='MET', index=False, startcol=final_df.shape[1] + 2)
+        if exportar:
+            # Create output directory if it doesn't exist
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+                print(f"Created directory: {output_dir}")
+            
+            output_file = f'{output_dir}/MET{numero}.xlsx'
+            
+            with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+                final_df.to_excel(writer, sheet_name='MET', index=True, startcol=0)
+                summary_df.to_excel(writer, sheet_name='MET', index=False, startcol=final_df.shape[1] + 2)
 
-        print(f"Datos exportados exitosamente a: {output_file}")
+            print(f"Datos exportados exitosamente a: {output_file}")
         
         return final_df, MET_Diurno, MET_Nocturno, summary_df, diurno_summary_df, nocturno_summary_df
         
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 from processing.acoustic import calcular_L_Raseq_dn
+from utils.time_index import PERIODO_DIURNO, PERIODO_NOCTURNO
 
 def promedio_logaritmico_ref(grupo):
     """
@@ -16,6 +17,201 @@ def promedio_logaritmico_ref(grupo):
     promedio_lineal_ref = np.mean(valores_lineales_ref)  # Promedio en escala lineal
     return round(10 * np.log10(promedio_lineal_ref), 1)  # Convertir de vuelta a dB y redondear
 
+class AcumuladorDiario:
+    """
+    Sumas de energía, conteos y número de filas por (período, día) de todas las
+    columnas de una matriz de niveles, acumulables por bloques de filas.
+
+    Cada bloque se pasa a energía una sola vez; sus filas se ordenan por período y
+    fecha y cada día suma su tramo contiguo con la suma por pares de NumPy (la misma
+    de np.mean en promedio_logaritmico_ref). Con un solo bloque los promedios son
+    idénticos a los de promedio_logaritmico_ref; cuando un día se reparte entre
+    varios bloques solo cambia el orden de suma de sus tramos.
+    """
+
+    def __init__(self, columnas=None):
+        """
+        Args:
+            columnas: Nombres de las columnas de la matriz (opcional)
+        """
+        self.columnas = list(columnas) if columnas is not None else None
+        self._sumas = {}
+        self._conteos = {}
+        self._filas = {}
+
+    def agregar(self, dias, niveles, codigos):
+        """
+        Acumula un bloque de filas
+
+        Args:
+            dias: Ordinal del día de medición de cada fila (IndiceTemporal.dia)
+            niveles: Matriz (filas x columnas) de niveles en dB; los NaN se ignoran
+            codigos: Código de período de cada fila (IndiceTemporal.periodo); las filas
+                que no son PERIODO_DIURNO ni PERIODO_NOCTURNO se excluyen
+        """
+        dias = np.asarray(dias, dtype=np.int64)
+        niveles = np.asarray(niveles, dtype=float).reshape(len(dias), -1)
+        codigos = np.asarray(codigos)
+
+        # Filas de ambos períodos, ordenadas por (período, día) conservando el orden original
+        filas = np.flatnonzero((codigos == PERIODO_DIURNO) | (codigos == PERIODO_NOCTURNO))
+        if len(filas) == 0:
+            return
+        orden = filas[np.lexsort((dias[filas], codigos[filas]))]
+        dias, codigos = dias[orden], codigos[orden]
+
+        # Energía por columna en filas contiguas (los NaN suman 0 y no cuentan)
+        energia = np.ascontiguousarray((10 ** (niveles[orden] / 10)).T)
+        validos = ~np.isnan(energia)
+        energia[~validos] = 0.0
+
+        cambios = np.flatnonzero((dias[1:] != dias[:-1]) | (codigos[1:] != codigos[:-1])) + 1
+        inicios = np.r_[0, cambios]
+        finales = np.r_[cambios, len(orden)]
+        for inicio, fin in zip(inicios, finales):
+            clave = (int(codigos[inicio]), int(dias[inicio]))
+            self._sumar(clave, energia[:, inicio:fin].sum(axis=1), validos[:, inicio:fin].sum(axis=1), fin - inicio)
+
+    def _sumar(self, clave, suma, conteo, filas):
+        if clave in self._sumas:
+            self._sumas[clave] = self._sumas[clave] + suma
+            self._conteos[clave] = self._conteos[clave] + conteo
+            self._filas[clave] += filas
+        else:
+            self._sumas[clave], self._conteos[clave], self._filas[clave] = suma, conteo, filas
+
+    def __len__(self):
+        return len(self._sumas)
+
+    def filas_por_dia(self):
+        """Número de filas acumuladas de cada (período, día)"""
+        return dict(self._filas)
+
+    def ultimo_dia(self):
+        """Ordinal del último día acumulado, o None si está vacío"""
+        return max((dia for _, dia in self._sumas), default=None)
+
+    def descartar_desde(self, dia):
+        """
+        Elimina lo acumulado de un día en adelante
+
+        Args:
+            dia: Ordinal del primer día a eliminar
+        """
+        for clave in [clave for clave in self._sumas if clave[1] >= dia]:
+            del self._sumas[clave], self._conteos[clave], self._filas[clave]
+
+    def incorporar(self, otro, desde=None):
+        """
+        Suma lo acumulado en otro acumulador, opcionalmente solo de un día en adelante
+
+        Args:
+            otro: AcumuladorDiario con las mismas columnas
+            desde: Ordinal del primer día a incorporar (None = todos)
+        """
+        for clave, suma in otro._sumas.items():
+            if desde is None or clave[1] >= desde:
+                self._sumar(clave, suma, otro._conteos[clave], otro._filas[clave])
+
+    def sumas(self, columnas=0):
+        """
+        Sumas acumuladas por período, ordenadas por día
+
+        Args:
+            columnas: Número de columnas de la matriz (solo se usa si no hay días acumulados)
+
+        Returns:
+            Diccionario código -> (ordinales de día, sumas de energía (días x columnas),
+            conteos de valores no nulos (días x columnas), número de filas de cada día)
+        """
+        if self.columnas is not None:
+            columnas = len(self.columnas)
+        resultado = {}
+        for codigo in (PERIODO_DIURNO, PERIODO_NOCTURNO):
+            claves = sorted(clave for clave in self._sumas if clave[0] == codigo)
+            dias = np.array([dia for _, dia in claves], dtype=np.int64)
+            if claves:
+                sumas = np.vstack([self._sumas[clave] for clave in claves])
+                conteos = np.vstack([self._conteos[clave] for clave in claves])
+            else:
+                sumas = np.empty((0, columnas))
+                conteos = np.empty((0, columnas), dtype=np.int64)
+            filas = np.array([self._filas[clave] for clave in claves], dtype=np.int64)
+            resultado[codigo] = (dias, sumas, conteos, filas)
+        return resultado
+
+    def promedios(self, columnas=0):
+        """
+        Promedios logarítmicos diarios de lo acumulado
+
+        Args:
+            columnas: Número de columnas de la matriz (solo se usa si no hay días acumulados)
+
+        Returns:
+            Diccionario código -> (fechas datetime64[D], promedios redondeados a 1 decimal
+            (días x columnas), número de filas de cada día)
+        """
+        resultado = {}
+        for codigo, (dias, sumas, conteos, filas) in self.sumas(columnas).items():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                promedios = np.round(10 * np.log10(sumas / conteos), 1)
+            resultado[codigo] = (dias.astype('datetime64[D]'), promedios, filas)
+        return resultado
+
+    def a_arreglos(self):
+        """
+        Contenido del acumulador como arreglos, para guardarlo con np.savez
+
+        Returns:
+            Diccionario con 'claves' (n x 2: período, día), 'sumas', 'conteos', 'filas' y 'columnas'
+        """
+        claves = sorted(self._sumas)
+        ancho = len(self.columnas) if self.columnas is not None else 0
+        return {
+            'claves': np.array(claves, dtype=np.int64).reshape(-1, 2),
+            'sumas': np.vstack([self._sumas[c] for c in claves]) if claves else np.empty((0, ancho)),
+            'conteos': np.vstack([self._conteos[c] for c in claves]) if claves else np.empty((0, ancho), dtype=np.int64),
+            'filas': np.array([self._filas[c] for c in claves], dtype=np.int64),
+            'columnas': np.array(self.columnas if self.columnas is not None else [], dtype=str)
+        }
+
+    @classmethod
+    def desde_arreglos(cls, arreglos):
+        """
+        Reconstruye un acumulador guardado con a_arreglos
+
+        Args:
+            arreglos: Diccionario (o NpzFile) con las claves de a_arreglos
+
+        Returns:
+            AcumuladorDiario
+        """
+        acumulador = cls([str(c) for c in arreglos['columnas']])
+        for clave, suma, conteo, filas in zip(arreglos['claves'], arreglos['sumas'], arreglos['conteos'], arreglos['filas']):
+            acumulador._sumar((int(clave[0]), int(clave[1])), np.array(suma), np.array(conteo), int(filas))
+        return acumulador
+
+def promedios_logaritmicos_diarios(dias, niveles, codigos):
+    """
+    Calcula los promedios logarítmicos diarios de todas las columnas de una matriz,
+    para los períodos diurno y nocturno en una sola llamada (ver AcumuladorDiario).
+    Los resultados redondeados son idénticos a los de promedio_logaritmico_ref.
+    
+    Args:
+        dias: Ordinal del día de medición de cada fila (IndiceTemporal.dia)
+        niveles: Matriz (filas x columnas) de niveles en dB; los NaN se ignoran
+        codigos: Código de período de cada fila (IndiceTemporal.periodo); las filas
+            que no son PERIODO_DIURNO ni PERIODO_NOCTURNO se excluyen
+        
+    Returns:
+        Diccionario código -> (fechas datetime64[D], promedios redondeados a 1 decimal
+        (días x columnas), número de filas de cada día)
+    """
+    niveles = np.asarray(niveles, dtype=float).reshape(len(dias), -1)
+    acumulador = AcumuladorDiario()
+    acumulador.agregar(dias, niveles, codigos)
+    return acumulador.promedios(niveles.shape[1])
+
 def NivelEq_Jornadas(df):
     """
     Calcula el nivel equivalente para jornadas ordinarias y dominicales
@@ -96,6 +292,32 @@ def procesar_resumen_periodo(df_total, df_grouped):
         df_total: DataFrame con todos los datos del período
         df_grouped: DataFrame agrupado del período
     
+    Returns:
+        DataFrame con el resumen completo
+    """
+    resumen = df_total.groupby('TipoDia').agg(
+        Conteo=('TipoDia', 'size'),
+        LASeq_k=('LASeq,i', promedio_logaritmico_ref),
+        LAIeq_k=('LAIeq,i', promedio_logaritmico_ref)
+    ).reset_index()
+    
+    total = {
+        'Conteo': df_total.shape[0],
+        'LASeq_k': promedio_logaritmico_ref(df_total['LASeq,i']),
+        'LAIeq_k': promedio_logaritmico_ref(df_total['LAIeq,i'])
+    }
+    
+    return completar_resumen(resumen, total, df_grouped)
+
+def completar_resumen(resumen, total, df_grouped):
+    """
+    Añade LRASeq_k por tipo de día y la fila 'Total' al resumen de un período
+    
+    Args:
+        resumen: DataFrame con 'TipoDia', 'Conteo', 'LASeq_k' y 'LAIeq_k' de cada tipo de día
+        total: Diccionario con 'Conteo', 'LASeq_k' y 'LAIeq_k' de todo el período
+        df_grouped: DataFrame agrupado del período
+    
     Returns:
         DataFrame con el resumen completo
     """
@@ -107,19 +329,13 @@ def procesar_resumen_periodo(df_total, df_grouped):
         'LRASeq_k': [dominical, ordinarios]
     })
     
-    resumen = df_total.groupby('TipoDia').agg(
-        Conteo=('TipoDia', 'size'),
-        LASeq_k=('LASeq,i', promedio_logaritmico_ref),
-        LAIeq_k=('LAIeq,i', promedio_logaritmico_ref)
-    ).reset_index()
-    
     resumen = pd.merge(resumen, leq_jornadas, on='TipoDia', how='outer')
     
     total_row = pd.DataFrame({
         'TipoDia': ['Total'],
-        'Conteo': [df_total.shape[0]],
-        'LASeq_k': [promedio_logaritmico_ref(df_total['LASeq,i'])],
-        'LAIeq_k': [promedio_logaritmico_ref(df_total['LAIeq,i'])],
+        'Conteo': [total['Conteo']],
+        'LASeq_k': [total['LASeq_k']],
+        'LAIeq_k': [total['LAIeq_k']],
         'LRASeq_k': [round(eq_total[0], 1)]
     })
     
@@ -148,43 +364,68 @@ def generar_resumenes(diurno_Total, nocturno_Total, diurno_grouped, nocturno_gro
 
 def calcular_estadisticos(resumen, datos_total):
     """
-    Calcula estadísticos para el resumen
+    Calcula estadísticos para el resumen. Las desviaciones cuadráticas en escala
+    lineal se agrupan por tipo de día en una sola ordenación de los intervalos; cada
+    grupo se suma en un tramo contiguo (misma suma por pares que Series.sum).
     
     Args:
         resumen: DataFrame con resumen
         datos_total: DataFrame con datos totales
         
     Returns:
-        DataFrame con estadísticos calculados
+        DataFrame con estadísticos calculados (s_k^2 y s_k en float64; la notación
+        científica se aplica al exportar)
+    """
+    tipos = resumen['TipoDia'].to_numpy()
+    N_mk = pd.to_numeric(resumen['Conteo']).to_numpy(dtype=float)
+    x_k = 10**(0.1 * pd.to_numeric(resumen['LRASeq_k']).to_numpy(dtype=float))
+    x_i = 10**(0.1 * datos_total['LRASeq,i'].to_numpy(dtype=float))
+    
+    # Intervalos ordenados por la fila del resumen de su tipo de día
+    grupos = pd.Index(tipos).get_indexer(datos_total['TipoDia'].to_numpy())
+    orden = np.argsort(grupos, kind='stable')
+    limites = np.searchsorted(grupos[orden], np.arange(len(resumen) + 1))
+    
+    # Σ(x_i - x_k)² de cada fila (la fila 'Total' usa todos los intervalos; los NaN suman 0)
+    diferencias = np.empty(len(resumen))
+    for fila, tipo_dia in enumerate(tipos):
+        valores = x_i if tipo_dia == 'Total' else x_i[orden[limites[fila]:limites[fila + 1]]]
+        cuadrados = (valores - x_k[fila])**2
+        diferencias[fila] = np.where(np.isnan(cuadrados), 0.0, cuadrados).sum()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_k2 = diferencias / (N_mk - 1)
+        s_k = np.power(s_k2, 0.5) / np.power(N_mk, 0.5)
+    
+    return pd.DataFrame({'TipoDia': tipos, 's_k^2': s_k2, 's_k': s_k})
+
+def estadisticos_desde_sumas(resumen, sumas_lineales):
     """
-    resultados = []
+    Calcula los estadísticos de calcular_estadisticos a partir de sumas lineales de
+    LRASeq,i por tipo de día, sin recorrer los intervalos. Con x_i = 10^(0.1·LRASeq,i)
+    y x_k = 10^(0.1·LRASeq_k): Σ(x_i - x_k)² = Σx_i² - 2·x_k·Σx_i + n·x_k²
     
-    for index, row in resumen.iterrows():
-        tipo_dia = row['TipoDia']
-        N_mk = row['Conteo']
-        LRASeq_k = row['LRASeq_k']
-        
-        # Filtrar datos
-        data_filtrada = datos_total if tipo_dia == 'Total' else datos_total[datos_total['TipoDia'] == tipo_dia]
-        
-        # Calcular LRASeq,i usando promedio logarítmico
-        LRASeq_i = promedio_logaritmico_ref(data_filtrada['LRASeq,i'])
+    Args:
+        resumen: DataFrame con resumen
+        sumas_lineales: Diccionario TipoDia (incluido 'Total') -> (n valores no nulos, Σx_i, Σx_i²)
         
-        # Calcular s_k^2
-        diferencias = (10**(0.1 * data_filtrada['LRASeq,i']) - 10**(0.1 * LRASeq_k))**2
-        s_k2 = diferencias.sum() / (N_mk - 1)
+    Returns:
+        DataFrame con estadísticos calculados (s_k^2 y s_k en float64)
+    """
+    tipos = resumen['TipoDia'].to_numpy()
+    N_mk = pd.to_numeric(resumen['Conteo']).to_numpy(dtype=float)
+    x_k = 10**(0.1 * pd.to_numeric(resumen['LRASeq_k']).to_numpy(dtype=float))
+    n, suma, suma_cuadrados = np.array([sumas_lineales.get(tipo, (0, 0.0, 0.0)) for tipo in tipos], dtype=float).reshape(-1, 3).T
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Calcular s_k^2 (sin negativos por redondeo cuando todos los x_i son casi iguales)
+        diferencias = np.where(n > 0, np.maximum(suma_cuadrados - 2 * x_k * suma + n * x_k**2, 0.0), 0.0)
+        s_k2 = diferencias / (N_mk - 1)
         
         # Calcular s_k
-        s_k = (s_k2**0.5) / (N_mk**0.5)
-        
-        # Formatear a notación científica con 2 decimales
-        resultados.append({
-            'TipoDia': tipo_dia, 
-            's_k^2': format(s_k2, '.2e'), 
-            's_k': format(s_k, '.2e')
-        })
-    
-    return pd.DataFrame(resultados)
+        s_k = np.power(s_k2, 0.5) / np.power(N_mk, 0.5)
+    
+    return pd.DataFrame({'TipoDia': tipos, 's_k^2': s_k2, 's_k': s_k})
 
 def actualizar_resumen(resumen, resultados_df):
     """
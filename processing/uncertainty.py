@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from scipy.stats import t
 
 def Calculo_U(df):
     """
@@ -109,4 +110,59 @@ def calcular_veff(IncComb, Tipo_A, instru, sens, Ubi):
             np.power(ubi_uloc, 4) / 50
         ), 0
     )
-    return veff
\ No newline at end of file
+    return veff
+# Componentes fijos del presupuesto de incertidumbre
+U_SLM = 0.5                            # Sonómetro (uslm)
+U_RESOL = round(0.1 / np.sqrt(12), 3)  # Resolución (uresol)
+C_T = -0.007                           # Sensibilidad a la temperatura (dB/°C)
+C_P = -0.010                           # Sensibilidad a la presión (dB/kPa)
+U_MIC_H = 0.1                          # Humedad (umic,H*)
+U_LOC = 0                              # Ubicación (uloc)
+ALPHA = 0.05                           # Nivel de significancia del factor de cobertura
+
+def incertidumbre_expandida(Nm, LRASeq, s, delta_T, delta_P, alpha=ALPHA):
+    """
+    Presupuesto de incertidumbre completo sobre arreglos: cada posición es una
+    combinación estación x período x tipo de día y todas se calculan en una sola
+    pasada, con una única llamada a t.ppf. Los arreglos se combinan con las reglas
+    de difusión de NumPy. Las operaciones siguen el mismo orden que Calculo_U,
+    calcular_incertidumbre y calcular_veff, así que los resultados coinciden bit a bit.
+    
+    Args:
+        Nm: Número de intervalos (Conteo)
+        LRASeq: Nivel LRASeq_k
+        s: Desviación s_k
+        delta_T: Rango de temperatura ∆Tmax
+        delta_P: Rango de presión ∆Pmax
+        alpha: Nivel de significancia
+        
+    Returns:
+        Diccionario de arreglos con 'uA' (tipo A), 'u' (combinada), 'veff', 'K' y 'U' (expandida)
+    """
+    Nm, LRASeq, s, delta_T, delta_P = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (Nm, LRASeq, s, delta_T, delta_P))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u_A = 10 * np.log10(np.power(10, 0.1 * LRASeq) + s) - LRASeq
+        umic_T = delta_T * np.abs(C_T)
+        umic_P = delta_P * np.abs(C_P)
+
+        # Suma de cuadrados en el orden de calcular_incertidumbre
+        suma = 0
+        for componente in (U_LOC, U_MIC_H, umic_P, umic_T, U_SLM, U_RESOL, u_A):
+            suma = suma + np.square(componente)
+        u = np.sqrt(suma)
+
+        veff = np.round(
+            np.power(u, 4) /
+            (
+                np.power(u_A, 4) / (Nm - 1) +
+                np.power(U_SLM, 4) / 50 +
+                np.power(umic_T, 4) / 200 +
+                np.power(umic_P, 4) / 200 +
+                np.power(U_MIC_H, 4) / 200 +
+                np.power(U_LOC, 4) / 50
+            ), 0
+        )
+    K = t.ppf(1 - alpha / 2, veff)
+    return {'uA': u_A, 'u': u, 'veff': veff, 'K': K, 'U': K * u}
@@ -1,7 +1,56 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import t
-from processing.uncertainty import crear_dataframe, calcular_incertidumbre, calcular_veff
+from processing.uncertainty import incertidumbre_expandida
+from utils.file_utils import valores_cientificos
+
+# Tipos de día del resumen y sufijos de sus columnas en la incertidumbre expandida
+TIPOS_INCERTIDUMBRE = [('Dominical', ',dom'), ('Ordinario', ',Ord'), ('Total', '')]
+
+def _valores_por_tipo(resumen, columna):
+    """Valor de la columna en la primera fila de cada tipo de día de TIPOS_INCERTIDUMBRE (NaN si no hay fila)"""
+    tipos = resumen['TipoDia'].to_numpy()
+    valores = pd.to_numeric(resumen[columna], errors='coerce').to_numpy(dtype=float)
+    primeras = [np.flatnonzero(tipos == tipo) for tipo, _ in TIPOS_INCERTIDUMBRE]
+    return [valores[filas[0]] if len(filas) else np.nan for filas in primeras]
+
+def calcular_incertidumbres_lote(estaciones):
+    """
+    Calcula las incertidumbres de varias estaciones en una sola operación vectorizada
+    sobre todas las combinaciones estación x período x tipo de día
+    
+    Args:
+        estaciones: Lista de tuplas (resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno)
+        
+    Returns:
+        Lista de tuplas (IncExp_diu, IncExp_noc), una por estación
+    """
+    # Arreglos de forma (estaciones, período, tipo de día)
+    Nm, LRASeq, s, delta_T, delta_P = [], [], [], [], []
+    for resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno in estaciones:
+        for resumen, MET_resumen in [(resumen_diurno, MET_resumen_diurno), (resumen_nocturno, MET_resumen_nocturno)]:
+            Nm.append(_valores_por_tipo(resumen, 'Conteo'))
+            LRASeq.append(_valores_por_tipo(resumen, 'LRASeq_k'))
+            # s_k con las 3 cifras del informe ('.2e'), como cuando se guardaba como texto,
+            # para que U y los márgenes de cumplimiento no cambien
+            s.append(valores_cientificos(_valores_por_tipo(resumen, 's_k')))
+            # ∆Tmax y ∆Pmax: filas TEMP y PRES del resumen meteorológico
+            delta_T.append([MET_resumen["∆"].iloc[0]] * len(TIPOS_INCERTIDUMBRE))
+            delta_P.append([MET_resumen["∆"].iloc[2]] * len(TIPOS_INCERTIDUMBRE))
+
+    forma = (len(estaciones), 2, len(TIPOS_INCERTIDUMBRE))
+    resultado = incertidumbre_expandida(*(np.reshape(np.array(x, dtype=float), forma) for x in (Nm, LRASeq, s, delta_T, delta_P)))
+
+    incertidumbres = []
+    for estacion in range(len(estaciones)):
+        IncExp = []
+        for periodo in range(2):
+            columnas = {}
+            for tipo, (_, sufijo) in enumerate(TIPOS_INCERTIDUMBRE):
+                columnas[f"K{sufijo}"] = [resultado['K'][estacion, periodo, tipo]]
+                columnas[f"U{sufijo}"] = [resultado['U'][estacion, periodo, tipo]]
+            IncExp.append(pd.DataFrame(columnas))
+        incertidumbres.append(tuple(IncExp))
+    return incertidumbres
 
 def calcular_incertidumbres(resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno):
     """
@@ -16,100 +65,4 @@ def calcular_incertidumbres(resumen_diurno, resumen_nocturno, MET_resumen_diurno
     Returns:
         Tupla con (IncExp_diu, IncExp_noc)
     """
-    # Creación de DataFrames para tipos A
-    Tipo_A_Dom_Diurno = crear_dataframe('Dominical', resumen_diurno)
-    Tipo_A_Ord_Diurno = crear_dataframe('Ordinario', resumen_diurno)
-    Tipo_A_Diurno = crear_dataframe('Total', resumen_diurno)
-
-    Tipo_A_Dom_Nocturno = crear_dataframe('Dominical', resumen_nocturno)
-    Tipo_A_Ord_Nocturno = crear_dataframe('Ordinario', resumen_nocturno)
-    Tipo_A_Nocturno = crear_dataframe('Total', resumen_nocturno)
-
-    # Crear DataFrames para instrumentación
-    instru_Diu = pd.DataFrame({'uslm': [0.5], 'uresol': [round(0.1 / np.sqrt(12),3)]})
-    instru_Noc = pd.DataFrame({'uslm': [0.5], 'uresol': [round(0.1 / np.sqrt(12),3)]})
-
-    # Crear DataFrames para sensibilidad
-    sens_Diu = pd.DataFrame({
-        'cT dB/°C': [-0.007], 
-        'cP dB/kPa': [-0.010],
-        "∆Tmax": [MET_resumen_diurno["∆"].iloc[0]],
-        "∆Pmax": [MET_resumen_diurno["∆"].iloc[2]],
-        "umic,T": [MET_resumen_diurno["∆"].iloc[0] * np.abs(-0.007)],
-        "umic,P": [MET_resumen_diurno["∆"].iloc[2] * np.abs(-0.010)],
-        "umic,H*": [0.1]
-    })
-    
-    sens_Noc = pd.DataFrame({
-        'cT dB/°C': [-0.007], 
-        'cP dB/kPa': [-0.010],
-        "∆Tmax": [MET_resumen_nocturno["∆"].iloc[0]],
-        "∆Pmax": [MET_resumen_nocturno["∆"].iloc[2]],
-        "umic,T": [MET_resumen_nocturno["∆"].iloc[0] * np.abs(-0.007)],
-        "umic,P": [MET_resumen_nocturno["∆"].iloc[2] * np.abs(-0.010)],
-        "umic,H*": [0.1]
-    })
-
-    # Crear DataFrames para ubicación
-    Ubi_diu = pd.DataFrame({"uloc": [0]})
-    Ubi_noc = pd.DataFrame({"uloc": [0]})
-
-    # Calcular incertidumbres combinadas
-    columnas = ["udom", "uord", "u"]
-    IncComb_Dia = pd.DataFrame(columns=columnas)
-    IncComb_Noc = pd.DataFrame(columns=columnas)
-
-    # Calcular incertidumbre para día
-    IncComb_Dia.loc[0] = [
-        calcular_incertidumbre(Ubi_diu, sens_Diu, instru_Diu, Tipo_A_Dom_Diurno),
-        calcular_incertidumbre(Ubi_diu, sens_Diu, instru_Diu, Tipo_A_Ord_Diurno),
-        calcular_incertidumbre(Ubi_diu, sens_Diu, instru_Diu, Tipo_A_Diurno)
-    ]
-
-    # Calcular incertidumbre para noche
-    IncComb_Noc.loc[0] = [
-        calcular_incertidumbre(Ubi_noc, sens_Noc, instru_Noc, Tipo_A_Dom_Nocturno),
-        calcular_incertidumbre(Ubi_noc, sens_Noc, instru_Noc, Tipo_A_Ord_Nocturno),
-        calcular_incertidumbre(Ubi_noc, sens_Noc, instru_Noc, Tipo_A_Nocturno)
-    ]
-
-    # Calcular grados de libertad efectivos (veff)
-    veff_values = {
-        "veff_noc": {
-            "veff,dom": calcular_veff(IncComb_Noc["udom"], Tipo_A_Dom_Nocturno, instru_Noc, sens_Noc, Ubi_noc),
-            "veff,ord": calcular_veff(IncComb_Noc["uord"], Tipo_A_Ord_Nocturno, instru_Noc, sens_Noc, Ubi_noc),
-            "veff": calcular_veff(IncComb_Noc["u"], Tipo_A_Nocturno, instru_Noc, sens_Noc, Ubi_noc)
-        },
-        "veff_diu": {
-            "veff,dom": calcular_veff(IncComb_Dia["udom"], Tipo_A_Dom_Diurno, instru_Diu, sens_Diu, Ubi_diu),
-            "veff,ord": calcular_veff(IncComb_Dia["uord"], Tipo_A_Ord_Diurno, instru_Diu, sens_Diu, Ubi_diu),
-            "veff": calcular_veff(IncComb_Dia["u"], Tipo_A_Diurno, instru_Diu, sens_Diu, Ubi_diu)
-        }
-    }
-
-    # Crear DataFrames con los valores calculados
-    veff_noc = pd.DataFrame([veff_values["veff_noc"]])
-    veff_diu = pd.DataFrame([veff_values["veff_diu"]])
-
-    # Calcular incertidumbre expandida
-    alpha = 0.05
-
-    IncExp_diu = pd.DataFrame({
-        "K,dom": [t.ppf(1 - alpha / 2, veff_diu["veff,dom"].iloc[0])],
-        "U,dom": [(t.ppf(1 - alpha / 2, veff_diu["veff,dom"].iloc[0])*IncComb_Dia["udom"].iloc[0])],
-        "K,Ord": [t.ppf(1 - alpha / 2, veff_diu["veff,ord"].iloc[0])],
-        "U,Ord": [(t.ppf(1 - alpha / 2, veff_diu["veff,ord"].iloc[0])*IncComb_Dia["uord"].iloc[0])],
-        "K": [t.ppf(1 - alpha / 2, veff_diu["veff"].iloc[0])],
-        "U": [(t.ppf(1 - alpha / 2, veff_diu["veff"].iloc[0])*IncComb_Dia["u"].iloc[0])]
-    })
-
-    IncExp_noc = pd.DataFrame({
-        "K,dom": [t.ppf(1 - alpha / 2, veff_noc["veff,dom"].iloc[0])],
-        "U,dom": [(t.ppf(1 - alpha / 2, veff_noc["veff,dom"].iloc[0])*IncComb_Noc["udom"].iloc[0])],
-        "K,Ord": [t.ppf(1 - alpha / 2, veff_noc["veff,ord"].iloc[0])],
-        "U,Ord": [(t.ppf(1 - alpha / 2, veff_noc["veff,ord"].iloc[0])*IncComb_Noc["uord"].iloc[0])],
-        "K": [t.ppf(1 - alpha / 2, veff_noc["veff"].iloc[0])],
-        "U": [(t.ppf(1 - alpha / 2, veff_noc["veff"].iloc[0])*IncComb_Noc["u"].iloc[0])]
-    })
-    
-    return IncExp_diu, IncExp_noc
\ No newline at end of file
+    return calcular_incertidumbres_lote([(resumen_diurno, resumen_nocturno, MET_resumen_diurno, MET_resumen_nocturno)])[0]
@@ -1,5 +1,10 @@
+from datetime import datetime
+import numpy as np
 import pandas as pd
 
+# Desfase de la fórmula de corrección: el día de medición empieza a las 06:59
+DESFASE_DIA_MEDICION = np.timedelta64(6 * 60 + 59, 'm')
+
 def corregir_fecha_hora(fecha_hora):
     """
     Corrige la fecha hora según la fórmula ENTERO(A10-"06:59") - ENTERO(A10) + A10
@@ -14,4 +19,215 @@ def corregir_fecha_hora(fecha_hora):
     fecha_corregida = fecha_hora - pd.Timedelta(hours=6, minutes=59)
     fecha_corregida = fecha_corregida.date()
     fecha_hora_corregida = fecha_corregida - fecha_hora.date() + fecha_hora
-    return fecha_hora_corregida
\ No newline at end of file
+    return fecha_hora_corregida
+
+def corregir_fechas(fechas):
+    """
+    Aplica la corrección de corregir_fecha_hora a una columna completa con aritmética datetime64
+    
+    Args:
+        fechas: Serie, índice o arreglo de fechas
+    
+    Returns:
+        Fechas corregidas (Serie con el mismo índice y nombre si se recibe una Serie,
+        DatetimeIndex en otro caso). Los NaT se conservan.
+    """
+    valores = np.asarray(pd.to_datetime(fechas), dtype='datetime64[ns]')
+    dias = valores.astype('datetime64[D]')
+    dias_corregidos = (valores - DESFASE_DIA_MEDICION).astype('datetime64[D]')
+    corregidas = valores + (dias_corregidos - dias)
+
+    if isinstance(fechas, pd.Series):
+        return pd.Series(corregidas, index=fechas.index, name=fechas.name)
+    return pd.DatetimeIndex(corregidas)
+
+def fechas_reales(fechas):
+    """
+    Deshace corregir_fechas: la corrección solo atrasa un día las horas anteriores a
+    las 06:59, así que esas se adelantan un día y el resto queda igual
+    
+    Args:
+        fechas: Serie, índice o arreglo de fechas corregidas
+    
+    Returns:
+        Fechas y horas reales (Serie con el mismo índice y nombre si se recibe una Serie,
+        DatetimeIndex en otro caso). Los NaT se conservan.
+    """
+    valores = np.asarray(pd.to_datetime(fechas), dtype='datetime64[ns]')
+    hora_del_dia = valores - valores.astype('datetime64[D]')
+    reales = valores + np.where(hora_del_dia < DESFASE_DIA_MEDICION, np.timedelta64(1, 'D'), np.timedelta64(0, 'D'))
+
+    if isinstance(fechas, pd.Series):
+        return pd.Series(reales, index=fechas.index, name=fechas.name)
+    return pd.DatetimeIndex(reales)
+
+# Formato de 'Period start' en las exportaciones del sonómetro (por ejemplo '01/04/2025 07:00:00 AM')
+FORMATO_PERIODO = '%d/%m/%Y %I:%M:%S %p'
+LONGITUD_PERIODO = len('01/04/2025 07:00:00 AM')
+
+# Origen de los números de serie de fecha de Excel
+ORIGEN_EXCEL = np.datetime64('1899-12-30', 'ns')
+
+_NAT = np.datetime64('NaT', 'ns')
+_NS_POR_SEGUNDO = 1_000_000_000
+
+def _parsear_texto_fijo(textos):
+    """
+    Parsea textos de ancho fijo 'dd/mm/YYYY hh:MM:SS AM' operando sobre los códigos de carácter
+    
+    Args:
+        textos: Arreglo de texto (dtype U)
+    
+    Returns:
+        Tupla con (fechas datetime64[ns], máscara de textos válidos). Los textos de otro
+        largo o con otro formato quedan como no válidos.
+    """
+    ancho = textos.dtype.itemsize // 4
+    if ancho < LONGITUD_PERIODO:
+        return np.full(len(textos), _NAT), np.zeros(len(textos), dtype=bool)
+    matriz = textos.view(np.uint32).reshape(-1, ancho)
+    codigos = matriz[:, :LONGITUD_PERIODO].astype(np.int64)
+    digitos = codigos - ord('0')
+
+    def numero(*posiciones):
+        valor = np.zeros(len(codigos), dtype=np.int64)
+        for posicion in posiciones:
+            valor = valor * 10 + digitos[:, posicion]
+        return valor
+
+    posiciones_digitos = [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]
+    meridiano = codigos[:, 20] | 0x20  # minúscula
+    validos = (
+        (matriz[:, LONGITUD_PERIODO:] == 0).all(axis=1)
+        & ((digitos[:, posiciones_digitos] >= 0) & (digitos[:, posiciones_digitos] <= 9)).all(axis=1)
+        & (codigos[:, 2] == ord('/')) & (codigos[:, 5] == ord('/')) & (codigos[:, 10] == ord(' '))
+        & (codigos[:, 13] == ord(':')) & (codigos[:, 16] == ord(':')) & (codigos[:, 19] == ord(' '))
+        & ((meridiano == ord('a')) | (meridiano == ord('p'))) & ((codigos[:, 21] | 0x20) == ord('m'))
+    )
+
+    dia, mes, anio = numero(0, 1), numero(3, 4), numero(6, 7, 8, 9)
+    hora, minuto, segundo = numero(11, 12), numero(14, 15), numero(17, 18)
+    validos &= (mes >= 1) & (mes <= 12) & (dia >= 1) & (hora >= 1) & (hora <= 12) & (minuto <= 59) & (segundo <= 61)
+
+    # Primer día del mes y validación del día contra la duración del mes
+    meses = np.where(validos, (anio - 1970) * 12 + mes - 1, 0).astype('datetime64[M]')
+    inicio_mes = meses.astype('datetime64[D]')
+    dias_mes = ((meses + 1).astype('datetime64[D]') - inicio_mes).astype(np.int64)
+    validos &= dia <= dias_mes
+
+    hora24 = hora % 12 + 12 * (meridiano == ord('p'))
+    segundos = (hora24 * 60 + minuto) * 60 + segundo
+    fechas = inicio_mes.astype('datetime64[ns]') + ((dia - 1) * 86400 + segundos) * _NS_POR_SEGUNDO
+    return np.where(validos, fechas, _NAT), validos
+
+def _serie_excel(numeros):
+    """
+    Convierte números de serie de Excel a fechas, redondeadas al segundo
+    
+    Args:
+        numeros: Arreglo float con días desde 1899-12-30
+    
+    Returns:
+        Tupla con (fechas datetime64[ns], máscara de números válidos)
+    """
+    segundos = np.round(numeros * 86400)
+    validos = np.isfinite(segundos) & (segundos >= 0) & (segundos < 2_958_466 * 86400)  # Hasta 9999-12-31
+    fechas = ORIGEN_EXCEL + np.where(validos, segundos, 0).astype(np.int64) * _NS_POR_SEGUNDO
+    return np.where(validos, fechas, _NAT), validos
+
+def _parsear_valor(valor):
+    """Parsea un valor suelto en formato de periodo, número de serie o fecha; None si no es válido"""
+    if isinstance(valor, str):
+        texto = valor.strip()
+        try:
+            return np.datetime64(datetime.strptime(texto, FORMATO_PERIODO), 'ns')
+        except ValueError:
+            pass
+        try:
+            return np.datetime64(datetime.fromisoformat(texto), 'ns')
+        except ValueError:
+            pass
+        try:
+            valor = float(texto)
+        except ValueError:
+            return None
+    if isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, bool):
+        fecha, valido = _serie_excel(np.array([valor], dtype=float))
+        return fecha[0] if valido[0] else None
+    try:
+        return pd.Timestamp(valor).to_datetime64().astype('datetime64[ns]')
+    except (TypeError, ValueError):
+        return None
+
+def parsear_periodos(columna):
+    """
+    Convierte la columna 'Period start' a datetime64[ns] (int64 nanosegundos) en una sola pasada.
+    Acepta textos en FORMATO_PERIODO (o ISO), números de serie de Excel (también como
+    texto) y fechas ya convertidas. Los textos de ancho fijo y los números se parsean de
+    forma vectorial; el resto se parsea una vez por valor distinto. Las filas que no se pueden interpretar quedan como NaT y se
+    marcan como mal formadas en lugar de lanzar una excepción.
+    
+    Args:
+        columna: Serie o arreglo con los valores de la columna
+    
+    Returns:
+        Tupla con (fechas datetime64[ns], máscara booleana de filas mal formadas).
+        Las celdas vacías quedan como NaT sin marcarse como mal formadas.
+    """
+    serie = columna if isinstance(columna, pd.Series) else pd.Series(columna)
+    n = len(serie)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.to_numpy(dtype='datetime64[ns]'), np.zeros(n, dtype=bool)
+
+    valores = serie.to_numpy(dtype=object)
+    fechas = np.full(n, _NAT)
+    pendientes = ~pd.isna(valores)
+
+    # Textos de ancho fijo: ruta vectorial
+    tipo = pd.api.types.infer_dtype(valores, skipna=True)
+    if tipo in ('string', 'mixed'):
+        if tipo == 'string':
+            es_texto = pendientes.copy()
+        else:
+            es_texto = pendientes & np.array([isinstance(v, str) for v in valores], dtype=bool)
+        indices = np.flatnonzero(es_texto)
+        fechas_fijas, validos = _parsear_texto_fijo(valores[indices].astype(str))
+        fechas[indices[validos]] = fechas_fijas[validos]
+        pendientes[indices[validos]] = False
+
+        # Números de serie guardados como texto (por ejemplo desde la caché de hojas)
+        indices = indices[~validos]
+        numeros = pd.to_numeric(pd.Series(valores[indices], dtype=object), errors='coerce').to_numpy(dtype=float)
+        fechas_serie, validos = _serie_excel(numeros)
+        fechas[indices[validos]] = fechas_serie[validos]
+        pendientes[indices[validos]] = False
+
+    # Números de serie de Excel: ruta vectorial
+    if tipo in ('floating', 'integer', 'mixed-integer-float'):
+        fechas_serie, validos = _serie_excel(valores[pendientes].astype(float))
+        indices = np.flatnonzero(pendientes)
+        fechas[indices[validos]] = fechas_serie[validos]
+        pendientes[indices[validos]] = False
+
+    # Fechas ya convertidas (celdas con formato de fecha)
+    if tipo in ('datetime', 'datetime64', 'date'):
+        indices = np.flatnonzero(pendientes)
+        fechas[indices] = pd.to_datetime(valores[indices]).to_numpy(dtype='datetime64[ns]')
+        pendientes[indices] = False
+
+    # Resto (textos de otro ancho, mezclas): una vez por valor distinto
+    if pendientes.any():
+        cache = {}
+        for indice in np.flatnonzero(pendientes):
+            valor = valores[indice]
+            if isinstance(valor, str) and not valor.strip():
+                pendientes[indice] = False  # Celda vacía
+                continue
+            clave = (type(valor), valor)
+            if clave not in cache:
+                cache[clave] = _parsear_valor(valor)
+            if cache[clave] is not None:
+                fechas[indice] = cache[clave]
+                pendientes[indice] = False
+
+    return fechas, pendientes
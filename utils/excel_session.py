@@ -0,0 +1,93 @@
+import pandas as pd
+
+class WorkbookSession:
+    """
+    Sesión sobre un libro de Excel de entrada que abre el archivo una sola vez
+    y parsea cada hoja como máximo una vez por ejecución.
+
+    Las hojas parseadas se guardan en memoria y se entregan como copias para que
+    los llamadores puedan modificarlas sin alterar la caché. Los contadores de
+    aciertos y fallos permiten confirmar que cada hoja se lee una única vez.
+    Opcionalmente lleva una SheetCache en disco que los cargadores consultan
+    antes de parsear el XML del libro. También guarda el almacén de datos
+    meteorológicos del libro (processing.meteorology.WeatherStore), que se crea
+    al primer uso y comparten todas las estaciones procesadas con la sesión.
+    """
+
+    def __init__(self, file_path, cache=None):
+        """
+        Args:
+            file_path: Ruta del archivo Excel de entrada
+            cache: SheetCache opcional con hojas ya recortadas de ejecuciones anteriores
+        """
+        self.file_path = file_path
+        self.cache = cache
+        self._excel_file = None
+        self._cache = {}
+        self.weather_store = None
+        self.hits = 0
+        self.misses = 0
+
+    def _abrir(self):
+        """Abre el archivo Excel la primera vez que se necesita"""
+        if self._excel_file is None:
+            self._excel_file = pd.ExcelFile(self.file_path)
+        return self._excel_file
+
+    @property
+    def sheet_names(self):
+        """Lista de hojas disponibles en el libro"""
+        return self._abrir().sheet_names
+
+    def parse(self, sheet_name, header=0):
+        """
+        Devuelve una hoja del libro, parseándola solo si no está en caché
+
+        Args:
+            sheet_name: Nombre de la hoja
+            header: Fila de encabezados (None para leer la hoja sin encabezados)
+
+        Returns:
+            Copia del DataFrame parseado
+        """
+        key = (sheet_name, header)
+        if key in self._cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._cache[key] = self._abrir().parse(sheet_name, header=header)
+        return self._cache[key].copy()
+
+    def cache_info(self):
+        """
+        Resumen del uso de la caché
+
+        Returns:
+            Diccionario con aciertos, fallos y hojas parseadas
+        """
+        info = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sheets": [sheet for sheet, _ in self._cache]
+        }
+        if self.cache is not None:
+            info["disk"] = self.cache.cache_info()
+        return info
+
+    def close(self):
+        """Cierra el archivo y libera las hojas en memoria"""
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        self._cache.clear()
+        self.weather_store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return (f"WorkbookSession({self.file_path!r}, hits={self.hits}, "
+                f"misses={self.misses})")
@@ -6,6 +6,40 @@ from openpyxl.styles import Font, Border, PatternFill, Alignment, Protection
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.utils import get_column_letter
 
+# Columnas que se exportan como texto en notación científica con 2 decimales
+COLUMNAS_CIENTIFICAS = ['s_k^2', 's_k']
+
+def formatear_cientificos(df):
+    """
+    Convierte a texto en notación científica ('.2e') las columnas de COLUMNAS_CIENTIFICAS,
+    que se calculan en float64 y solo se formatean al exportar
+    
+    Args:
+        df: DataFrame a formatear
+    
+    Returns:
+        DataFrame con las columnas formateadas (el mismo si no tiene ninguna)
+    """
+    columnas = [columna for columna in COLUMNAS_CIENTIFICAS if columna in df.columns]
+    if not columnas:
+        return df
+    df = df.copy()
+    for columna in columnas:
+        df[columna] = [format(valor, '.2e') for valor in df[columna]]
+    return df
+
+def valores_cientificos(valores):
+    """
+    Valores tal como quedan en el texto '.2e' que se exporta (3 cifras significativas)
+
+    Args:
+        valores: Secuencia de números (NaN se conserva)
+
+    Returns:
+        Lista de float
+    """
+    return [float(format(valor, '.2e')) for valor in valores]
+
 def round_dataframe(df):
     """
     Redondea todos los valores numéricos en un DataFrame a 2 decimales
@@ -36,6 +70,18 @@ def is_merged_cell(sheet, row, col):
             return True
     return False
 
+def celdas_combinadas(sheet):
+    """
+    Construye el conjunto de celdas ocupadas por rangos combinados de una hoja
+    
+    Args:
+        sheet: Hoja de Excel
+    
+    Returns:
+        Conjunto de tuplas (fila, columna) que pertenecen a algún rango combinado
+    """
+    return {celda for rango in sheet.merged_cells.ranges for celda in rango.cells}
+
 def combine_excel_files(carpeta):
     """
     Combina todos los archivos Excel de una carpeta en uno solo, 
@@ -117,6 +163,9 @@ def combine_excel_files(carpeta):
                                 horizontal=celda.alignment.horizontal, vertical=celda.alignment.vertical, wrap_text=celda.alignment.wrap_text
                             )
                             nueva_celda.protection = Protection(locked=celda.protection.locked)
+                            # Formato de número de la plantilla (fechas diarias, porcentajes), igual que
+                            # en el libro consolidado que escribe LibroConsolidado
+                            nueva_celda.number_format = celda.number_format
 
                 libro_origen.close()
 
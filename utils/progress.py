@@ -0,0 +1,213 @@
+import time
+from collections import namedtuple
+
+# Etapas de procesar_hoja y su peso aproximado en el tiempo de una hoja (suman 1),
+# medido sobre Input/Met_Abr.xlsx con la salida por archivos
+ETAPAS_HOJA = [
+    ('carga', 0.46),
+    ('meteorologia', 0.25),
+    ('ponderacion_tonal', 0.01),
+    ('tabla', 0.01),
+    ('diario', 0.02),
+    ('estadisticos', 0.03),
+    ('incertidumbre', 0.01),
+    ('cumplimiento', 0.01),
+    ('exportacion', 0.20)
+]
+
+# Nombres de las etapas para mostrar
+NOMBRES_ETAPAS = {
+    'carga': 'Carga de datos',
+    'meteorologia': 'Datos meteorológicos',
+    'ponderacion_tonal': 'Ponderación A y ajuste tonal',
+    'tabla': 'Tabla procesada',
+    'diario': 'Agregación diaria',
+    'estadisticos': 'Estadísticos',
+    'incertidumbre': 'Incertidumbre',
+    'cumplimiento': 'Cumplimiento',
+    'exportacion': 'Exportación'
+}
+
+# Avance de una etapa de una hoja: fracción de la etapa, fracción de la hoja según
+# ETAPAS_HOJA y segundos transcurridos en la etapa
+EventoProgreso = namedtuple('EventoProgreso', ['hoja', 'etapa', 'fraccion_etapa', 'fraccion_hoja', 'segundos_etapa'])
+
+class ProcesoCancelado(Exception):
+    """Se pidió cancelar el procesamiento de una hoja"""
+
+class ProgresoHoja:
+    """
+    Token de progreso y cancelación que recorre las etapas de procesar_hoja.
+
+    Cada etapa se marca con etapa(nombre), que cierra la anterior, informa el cambio y
+    comprueba la cancelación. Los bucles largos dentro de una etapa (por ejemplo la
+    lectura por bloques) llaman a avance(fraccion), que informa como mucho cada
+    INTERVALO_REPORTE segundos pero comprueba la cancelación siempre. Si se canceló,
+    etapa, avance y verificar lanzan ProcesoCancelado.
+
+    Sin funciones de reporte ni de cancelación el token no hace nada, así que
+    procesar_hoja lo usa siempre.
+    """
+
+    INTERVALO_REPORTE = 0.25
+
+    def __init__(self, hoja=None, reportar=None, cancelado=None):
+        """
+        Args:
+            hoja: Nombre de la hoja
+            reportar: Función opcional reportar(EventoProgreso)
+            cancelado: Función opcional que devuelve True si hay que cancelar
+        """
+        self.hoja = hoja
+        self.reportar = reportar
+        self.cancelado = cancelado
+        self._etapa = None
+        self._inicio = None
+        self._ultimo_reporte = 0.0
+        self._pesos = dict(ETAPAS_HOJA)
+        self._anteriores = {}
+        acumulado = 0.0
+        for nombre, peso in ETAPAS_HOJA:
+            self._anteriores[nombre] = acumulado
+            acumulado += peso
+
+    def verificar(self):
+        """Lanza ProcesoCancelado si se pidió cancelar"""
+        if self.cancelado is not None and self.cancelado():
+            raise ProcesoCancelado(f"Se canceló el procesamiento de {self.hoja}")
+
+    def etapa(self, nombre):
+        """
+        Empieza una etapa (y termina la anterior)
+
+        Args:
+            nombre: Etapa de ETAPAS_HOJA
+        """
+        self._cerrar_etapa()
+        self._etapa = nombre
+        self._inicio = time.perf_counter()
+        self._emitir(0.0, forzar=True)
+        self.verificar()
+
+    def avance(self, fraccion):
+        """
+        Informa el avance dentro de la etapa actual
+
+        Args:
+            fraccion: Fracción completada de la etapa (0 a 1)
+        """
+        self._emitir(min(max(fraccion, 0.0), 1.0))
+        self.verificar()
+
+    def terminar(self):
+        """Termina la última etapa"""
+        self._cerrar_etapa()
+        self._etapa = None
+
+    def _cerrar_etapa(self):
+        if self._etapa is not None:
+            self._emitir(1.0, forzar=True)
+
+    def _emitir(self, fraccion, forzar=False):
+        if self.reportar is None or self._etapa is None:
+            return
+        ahora = time.perf_counter()
+        if not forzar and ahora - self._ultimo_reporte < self.INTERVALO_REPORTE:
+            return
+        self._ultimo_reporte = ahora
+        fraccion_hoja = self._anteriores.get(self._etapa, 0.0) + self._pesos.get(self._etapa, 0.0) * fraccion
+        self.reportar(EventoProgreso(self.hoja, self._etapa, fraccion, fraccion_hoja, ahora - self._inicio))
+
+class EstimadorETA:
+    """
+    Tiempo restante de la etapa en curso de cada hoja y del procesamiento completo.
+
+    Aprende la duración media de cada etapa de las que ya terminaron (en cualquier
+    hoja). Una etapa que informa su avance se estima por su propio ritmo; una que
+    todavía no terminó nunca se estima con su peso en ETAPAS_HOJA y el ritmo de las
+    etapas medidas.
+    """
+
+    def __init__(self, total_hojas, procesos=1):
+        """
+        Args:
+            total_hojas: Número de hojas a procesar
+            procesos: Hojas que se procesan a la vez
+        """
+        self.total_hojas = total_hojas
+        self.procesos = max(procesos, 1)
+        self.terminadas = 0
+        self._completas = 0
+        self._duraciones = {}
+        self._en_curso = {}
+
+    def registrar(self, evento):
+        """Incorpora un EventoProgreso"""
+        if evento.fraccion_etapa >= 1.0:
+            suma, n = self._duraciones.get(evento.etapa, (0.0, 0))
+            self._duraciones[evento.etapa] = (suma + evento.segundos_etapa, n + 1)
+        self._en_curso[evento.hoja] = evento
+
+    def hoja_terminada(self, hoja):
+        """Marca una hoja como terminada (correcta o con error)"""
+        ultimo = self._en_curso.pop(hoja, None)
+        if ultimo is not None and ultimo.etapa == ETAPAS_HOJA[-1][0] and ultimo.fraccion_etapa >= 1.0:
+            self._completas += 1
+        self.terminadas += 1
+
+    def _media(self, etapa):
+        suma, n = self._duraciones.get(etapa, (0.0, 0))
+        if n:
+            return suma / n
+        if self._completas:
+            # Ya se completó alguna hoja sin pasar por esta etapa (por ejemplo la ponderación
+            # y el ajuste tonal con la carga por bloques)
+            return 0.0
+        # Sin mediciones de la etapa: su peso al ritmo de las etapas medidas
+        pesos = dict(ETAPAS_HOJA)
+        medido = sum(pesos.get(nombre, 0.0) for nombre in self._duraciones)
+        if medido <= 0:
+            return None
+        segundos = sum(suma / n for suma, n in self._duraciones.values())
+        return pesos.get(etapa, 0.0) * segundos / medido
+
+    def restante_etapa(self, evento):
+        """
+        Args:
+            evento: Último EventoProgreso de una hoja
+
+        Returns:
+            Segundos estimados para terminar su etapa, o None si aún no hay datos
+        """
+        if 0.0 < evento.fraccion_etapa < 1.0 and evento.segundos_etapa > 0:
+            return evento.segundos_etapa * (1.0 - evento.fraccion_etapa) / evento.fraccion_etapa
+        media = self._media(evento.etapa)
+        return None if media is None else max(media - evento.segundos_etapa, 0.0)
+
+    def restante_total(self):
+        """Segundos estimados para terminar todas las hojas, o None si aún no hay datos"""
+        medias = [self._media(nombre) for nombre, _ in ETAPAS_HOJA]
+        if any(media is None for media in medias):
+            return None
+        por_hoja = sum(medias)
+        sin_empezar = max(self.total_hojas - self.terminadas - len(self._en_curso), 0)
+        en_curso = sum(por_hoja * (1.0 - evento.fraccion_hoja) for evento in self._en_curso.values())
+        return (en_curso + sin_empezar * por_hoja) / self.procesos
+
+    def fraccion_total(self):
+        """Fracción completada del procesamiento, contando el avance de las hojas en curso"""
+        if not self.total_hojas:
+            return 1.0
+        en_curso = sum(evento.fraccion_hoja for evento in self._en_curso.values())
+        return min((self.terminadas + en_curso) / self.total_hojas, 1.0)
+
+def formatear_duracion(segundos):
+    """Duración legible ('45 s', '3 min 20 s', '1 h 05 min'); '?' si no se conoce"""
+    if segundos is None:
+        return "?"
+    segundos = int(round(segundos))
+    if segundos < 60:
+        return f"{segundos} s"
+    if segundos < 3600:
+        return f"{segundos // 60} min {segundos % 60:02d} s"
+    return f"{segundos // 3600} h {segundos % 3600 // 60:02d} min"
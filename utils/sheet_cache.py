@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Versión del formato de las entradas: el recorte y los metadatos que guardan
+# leer_hoja_emri y read_weather_sheet. Un cambio en ellos obliga a subirla para que
+# las entradas anteriores se vuelvan a parsear
+VERSION_CACHE = 1
+
+class SheetCache:
+    """
+    Caché en disco de hojas ya parseadas y recortadas, en formato columnar binario.
+
+    Cada entrada guarda la columna de tiempo y la matriz numérica de una hoja como
+    archivos .npy (que se abren con memory-map en lecturas posteriores) junto con
+    un .json con los metadatos del encabezado. Las entradas se agrupan por el hash
+    del contenido del libro de origen, de modo que cualquier cambio en el archivo
+    invalida sus entradas anteriores, y cada .json lleva VERSION_CACHE, de modo que
+    las entradas de otro formato tampoco se usan. El tamaño total se limita con
+    desalojo LRU.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Carpeta donde se guardan las entradas
+            max_bytes: Tamaño máximo total de la caché en bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}
+
+    def hash_archivo(self, file_path):
+        """
+        Calcula (una vez por versión del archivo) el hash SHA-256 de su contenido
+
+        Args:
+            file_path: Ruta del libro de origen
+
+        Returns:
+            Cadena hexadecimal con el hash
+        """
+        stat = os.stat(file_path)
+        firma = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if firma not in self._hashes:
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(bloque)
+            self._hashes[firma] = sha.hexdigest()
+            self._invalidar_obsoletas(firma[0], self._hashes[firma])
+        return self._hashes[firma]
+
+    def _carpeta(self, file_path):
+        return os.path.join(self.cache_dir, self.hash_archivo(file_path))
+
+    @staticmethod
+    def _nombre(sheet):
+        return re.sub(r'[^\w\-]', '_', str(sheet))
+
+    def _rutas(self, file_path, sheet):
+        base = os.path.join(self._carpeta(file_path), self._nombre(sheet))
+        return base + '.json', base + '.tiempos.npy', base + '.valores.npy'
+
+    def get(self, file_path, sheet):
+        """
+        Recupera una hoja de la caché
+
+        Args:
+            file_path: Ruta del libro de origen
+            sheet: Nombre de la hoja
+
+        Returns:
+            Tupla (meta, tiempos, valores) con los arreglos en memory-map, o None si no
+            existe o es de otra VERSION_CACHE (put la reemplaza)
+        """
+        ruta_meta, ruta_tiempos, ruta_valores = self._rutas(file_path, sheet)
+        try:
+            with open(ruta_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != VERSION_CACHE:
+                raise ValueError(f"Entrada de caché con formato {meta.get('version')!r}")
+            tiempos = np.load(ruta_tiempos, mmap_mode='r', allow_pickle=False)
+            valores = np.load(ruta_valores, mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Marcar la entrada como usada recientemente (orden LRU)
+        os.utime(ruta_meta)
+        self.hits += 1
+        return meta, tiempos, valores
+
+    def put(self, file_path, sheet, meta, tiempos, valores):
+        """
+        Guarda una hoja en la caché y aplica el límite de tamaño
+
+        Args:
+            file_path: Ruta del libro de origen
+            sheet: Nombre de la hoja
+            meta: Diccionario serializable en JSON con los metadatos del encabezado
+            tiempos: Arreglo con la columna de tiempo (datetime64 o texto)
+            valores: Matriz float64 con los datos numéricos
+        """
+        ruta_meta, ruta_tiempos, ruta_valores = self._rutas(file_path, sheet)
+        os.makedirs(os.path.dirname(ruta_meta), exist_ok=True)
+        meta = dict(meta, origen=os.path.abspath(file_path), hoja=str(sheet), version=VERSION_CACHE)
+
+        # Escritura atómica: el .json se escribe al final y marca la entrada como completa
+        for ruta, arreglo in [(ruta_tiempos, tiempos), (ruta_valores, valores)]:
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as f:
+                np.save(f, np.ascontiguousarray(arreglo), allow_pickle=False)
+            os.replace(temporal, ruta)
+        temporal = f"{ruta_meta}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temporal, ruta_meta)
+
+        self._desalojar()
+
+    def _entradas(self):
+        """Lista (última_uso, tamaño, archivos) de cada entrada de la caché"""
+        entradas = []
+        if not os.path.isdir(self.cache_dir):
+            return entradas
+        for carpeta in os.listdir(self.cache_dir):
+            ruta_carpeta = os.path.join(self.cache_dir, carpeta)
+            if not os.path.isdir(ruta_carpeta):
+                continue
+            for archivo in os.listdir(ruta_carpeta):
+                if not archivo.endswith('.json'):
+                    continue
+                base = os.path.join(ruta_carpeta, archivo[:-len('.json')])
+                archivos = [base + '.json', base + '.tiempos.npy', base + '.valores.npy']
+                try:
+                    uso = os.path.getmtime(archivos[0])
+                    tamano = sum(os.path.getsize(a) for a in archivos if os.path.exists(a))
+                except OSError:
+                    continue
+                entradas.append((uso, tamano, archivos))
+        return entradas
+
+    def _desalojar(self):
+        """Elimina las entradas usadas hace más tiempo hasta respetar max_bytes"""
+        entradas = sorted(self._entradas(), key=lambda e: e[0])
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, archivos in entradas:
+            if total <= self.max_bytes:
+                break
+            for archivo in archivos:
+                try:
+                    os.remove(archivo)
+                except OSError:
+                    pass
+            total -= tamano
+
+    def _invalidar_obsoletas(self, origen, hash_actual):
+        """Borra las entradas de versiones anteriores del mismo libro de origen"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for carpeta in os.listdir(self.cache_dir):
+            ruta_carpeta = os.path.join(self.cache_dir, carpeta)
+            if carpeta == hash_actual or not os.path.isdir(ruta_carpeta):
+                continue
+            for archivo in os.listdir(ruta_carpeta):
+                if not archivo.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(ruta_carpeta, archivo), 'r', encoding='utf-8') as f:
+                        obsoleta = json.load(f).get('origen') == origen
+                except (OSError, ValueError):
+                    obsoleta = False
+                if obsoleta:
+                    shutil.rmtree(ruta_carpeta, ignore_errors=True)
+                break
+
+    def cache_info(self):
+        """
+        Resumen del uso de la caché en disco
+
+        Returns:
+            Diccionario con aciertos, fallos, tamaño usado y límite
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": sum(tamano for _, tamano, _ in self._entradas()),
+            "max_bytes": self.max_bytes
+        }
+
+def columna_tiempo(serie):
+    """
+    Convierte una columna de fechas a un arreglo apto para la caché
+
+    Args:
+        serie: Serie con fechas (datetime o texto)
+
+    Returns:
+        Arreglo datetime64[ns] si todos los valores son fechas, o arreglo de texto en caso contrario
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.to_numpy(dtype='datetime64[ns]')
+    if serie.map(lambda v: pd.isna(v) or isinstance(v, (pd.Timestamp, np.datetime64)) or hasattr(v, 'year')).all():
+        return pd.to_datetime(serie).to_numpy(dtype='datetime64[ns]')
+    return np.array(['' if pd.isna(v) else str(v) for v in serie], dtype=str)
+
+def matriz_numerica(df):
+    """
+    Convierte un bloque de columnas a una matriz float64 contigua
+
+    Args:
+        df: DataFrame con los valores numéricos (posiblemente de tipo object)
+
+    Returns:
+        Matriz numpy float64 (los valores no numéricos quedan como NaN)
+    """
+    return df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+def valor_json(valor):
+    """Convierte un valor de encabezado a un tipo serializable en JSON (NaN -> None)"""
+    if pd.isna(valor):
+        return None
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (int, float, str, bool)):
+        return valor
+    return str(valor)
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from data.constants import HORAS_REFERENCIA
+
+# Códigos de período de referencia de cada instante
+PERIODO_FUERA = -1  # Entre períodos (por ejemplo 20:00-21:00) o sin fecha
+PERIODO_DIURNO = 0
+PERIODO_NOCTURNO = 1
+
+# Códigos de tipo de día
+DIA_ORDINARIO = 0
+DIA_DOMINICAL = 1
+TIPOS_DIA = np.array(['Ordinario', 'Dominical'], dtype=object)
+
+# Ordinal de día para las filas sin fecha
+DIA_NULO = np.iinfo(np.int32).min
+
+def _desde_medianoche(instante):
+    """Tiempo transcurrido desde la medianoche de un pd.Timestamp, como timedelta64[ns]"""
+    return np.timedelta64(instante - instante.normalize(), 'ns')
+
+def codigos_tipo_dia(dias):
+    """
+    Clasifica días en ordinarios y dominicales
+
+    Args:
+        dias: Arreglo de ordinales de día (días desde 1970-01-01) o datetime64
+
+    Returns:
+        Arreglo int8 con DIA_DOMINICAL para los domingos y DIA_ORDINARIO para el resto
+    """
+    dias = np.asarray(dias)
+    if np.issubdtype(dias.dtype, np.datetime64):
+        dias = dias.astype('datetime64[D]').astype(np.int64)
+    # 1970-01-01 fue jueves (3 con lunes = 0), así que el domingo es (dia + 3) % 7 == 6
+    return ((dias.astype(np.int64) + 3) % 7 == 6).astype(np.int8)
+
+def tipos_dia(fechas):
+    """
+    Tipo de día ('Dominical' u 'Ordinario') de cada fecha
+
+    Args:
+        fechas: Fechas (datetime64, datetime.date o texto convertible)
+
+    Returns:
+        Arreglo de texto con el tipo de día
+    """
+    fechas = pd.to_datetime(pd.Series(fechas, dtype=object)).to_numpy(dtype='datetime64[D]')
+    return TIPOS_DIA[codigos_tipo_dia(fechas)]
+
+class IndiceTemporal:
+    """
+    Índice temporal de una estación, calculado una sola vez a partir de la columna
+    'Period start' (ya corregida al día de medición) y compartido por las etapas
+    que separan períodos diurno/nocturno, agrupan por día o clasifican el tipo de día.
+
+    Guarda, por fila, el minuto del día (int16), el código de período (int8), el
+    ordinal del día de medición (int32, días desde 1970-01-01) y el tipo de día
+    (int8). Las filas se identifican con las etiquetas del índice de la serie de
+    origen, de modo que los DataFrames filtrados después (por ejemplo por
+    precipitación) obtienen su subíndice con `para`.
+    """
+
+    def __init__(self, periodos):
+        """
+        Args:
+            periodos: Serie, DatetimeIndex o arreglo datetime64 con el inicio de cada intervalo
+        """
+        if isinstance(periodos, pd.Series):
+            self.filas = periodos.index
+        else:
+            self.filas = pd.RangeIndex(len(periodos))
+        valores = np.asarray(periodos, dtype='datetime64[ns]')
+        validos = ~np.isnat(valores)
+        dias = valores.astype('datetime64[D]')
+        hora = valores - dias
+
+        diurno = (hora >= _desde_medianoche(HORAS_REFERENCIA["diurna_inicio"])) & (hora <= _desde_medianoche(HORAS_REFERENCIA["diurna_fin"]))
+        nocturno = (hora >= _desde_medianoche(HORAS_REFERENCIA["nocturna_inicio"])) | (hora <= _desde_medianoche(HORAS_REFERENCIA["nocturna_fin"]))
+
+        self.dia = np.where(validos, dias.astype(np.int64), DIA_NULO).astype(np.int32)
+        self.minuto = np.where(validos, hora // np.timedelta64(1, 'm'), -1).astype(np.int16)
+        self.periodo = np.select(
+            [validos & diurno, validos & nocturno], [PERIODO_DIURNO, PERIODO_NOCTURNO], default=PERIODO_FUERA
+        ).astype(np.int8)
+        self.tipo_dia = codigos_tipo_dia(self.dia)
+
+    @classmethod
+    def _desde_arreglos(cls, filas, dia, minuto, periodo, tipo_dia):
+        indice = cls.__new__(cls)
+        indice.filas, indice.dia, indice.minuto, indice.periodo, indice.tipo_dia = filas, dia, minuto, periodo, tipo_dia
+        return indice
+
+    def __len__(self):
+        return len(self.filas)
+
+    def para(self, df):
+        """
+        Subíndice alineado con las filas de un DataFrame derivado de la serie de origen
+
+        Args:
+            df: DataFrame o Serie cuyas etiquetas de fila están en el índice de origen
+
+        Returns:
+            IndiceTemporal con una entrada por fila de df
+        """
+        if df.index.equals(self.filas):
+            return self
+        posiciones = self.filas.get_indexer(df.index)
+        if (posiciones < 0).any():
+            raise KeyError("Hay filas que no pertenecen al índice temporal de la estación")
+        return IndiceTemporal._desde_arreglos(
+            df.index, self.dia[posiciones], self.minuto[posiciones],
+            self.periodo[posiciones], self.tipo_dia[posiciones]
+        )
+
+    def mascara(self, periodo):
+        """
+        Args:
+            periodo: PERIODO_DIURNO o PERIODO_NOCTURNO
+
+        Returns:
+            Máscara booleana de las filas del período
+        """
+        return self.periodo == periodo
+
+    def fechas(self):
+        """Fecha del día de medición de cada fila como objetos datetime.date (None sin fecha)"""
+        dias = np.where(self.dia == DIA_NULO, np.iinfo(np.int64).min, self.dia).astype('datetime64[D]')
+        return dias.astype(object)
+
+    def tipos_dia(self):
+        """Tipo de día ('Dominical' u 'Ordinario') de cada fila"""
+        return TIPOS_DIA[self.tipo_dia]